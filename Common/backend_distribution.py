@@ -0,0 +1,144 @@
+"""
+Reader 엔드포인트 접속 분포 (백엔드 인스턴스별 집계)
+===================================================
+
+사용 목적:
+---------
+reader 엔드포인트는 DNS 로 reader 인스턴스를 돌려가며 알려주므로 접속이 인스턴스마다
+고르게 나뉜다는 보장이 없습니다. 한 인스턴스에 접속이 몰리면 그 인스턴스의 지연시간이
+전체 p99 를 결정합니다. 접속마다 실제로 붙은 인스턴스를 조회하여 인스턴스별
+접속 수, 접속 시간, 쿼리 수 / QPS, 쿼리 지연시간을 집계합니다.
+
+백엔드 식별:
+-----------
+- BACKEND_QUERIES 순서대로 시도: @@aurora_server_id (Aurora 인스턴스 식별자), 실패하면 @@hostname
+- 접속마다 1회만 조회하므로 측정 쿼리에는 영향 없음
+
+집계 값 (인스턴스별):
+-------------------
+- connections / share: 접속 수와 비율
+- connect: 접속 시간 히스토그램 (Common/latency_histogram.py, ns)
+- queries / qps: 쿼리 수와 QPS (워커별 queries / duration 의 합 - 워커가 동시에 실행되는 경우)
+- latency: 쿼리 지연시간 히스토그램 (워커 히스토그램 merge)
+
+사용 예:
+-------
+    distribution = BackendDistribution()
+    start = time.perf_counter()
+    conn = mysql.connector.connect(...)
+    connect_time = time.perf_counter() - start
+    backend = fetch_backend_id(conn)
+    ... 쿼리 실행 ...
+    distribution.record(backend, connect_time=connect_time, queries=count, duration=elapsed, histogram=histogram)
+    for line in distribution.format_summary():
+        print(line)
+
+참고:
+----
+- lock 이 없으므로 워커마다 하나씩 쓰고 merge() 하거나 한 쓰레드에서 record() 호출
+- pickle 가능 (multiprocessing 결과로 전달 가능)
+"""
+
+from latency_histogram import LatencyHistogram
+
+BACKEND_QUERIES = ['SELECT @@aurora_server_id', 'SELECT @@hostname']
+
+
+def fetch_backend_id(conn):
+    """현재 접속이 붙은 인스턴스 식별자 - Aurora 가 아니면 @@hostname, 모두 실패하면 None"""
+    for query in BACKEND_QUERIES:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            if rows and rows[0][0]:
+                return rows[0][0]
+        except Exception:
+            continue
+        finally:
+            cursor.close()
+    return None
+
+
+class BackendDistribution:
+    def __init__(self):
+        self.backends = {}
+
+    def _entry(self, backend):
+        backend = backend if backend is not None else 'unknown'
+        entry = self.backends.get(backend)
+        if entry is None:
+            entry = self.backends[backend] = {
+                'connections': 0,
+                'connect': LatencyHistogram(),
+                'queries': 0,
+                'qps': 0.0,
+                'latency': LatencyHistogram()
+            }
+        return entry
+
+    def record(self, backend, connect_time=None, queries=0, duration=0.0, histogram=None):
+        """접속 1건 기록 - connect_time / duration 은 초, histogram 은 쿼리 지연시간(ns)"""
+        entry = self._entry(backend)
+        entry['connections'] += 1
+        if connect_time is not None:
+            entry['connect'].record(int(connect_time * 1e9))
+        entry['queries'] += queries
+        if duration > 0:
+            entry['qps'] += queries / duration
+        if histogram is not None:
+            entry['latency'].merge(histogram)
+
+    def merge(self, other):
+        for backend, other_entry in other.backends.items():
+            entry = self._entry(backend)
+            entry['connections'] += other_entry['connections']
+            entry['connect'].merge(other_entry['connect'])
+            entry['queries'] += other_entry['queries']
+            entry['qps'] += other_entry['qps']
+            entry['latency'].merge(other_entry['latency'])
+
+    def total_connections(self):
+        return sum(entry['connections'] for entry in self.backends.values())
+
+    def imbalance(self, key='connections'):
+        """인스턴스 간 최대 / 최소 비율 (key: 'connections' 또는 'qps'), 인스턴스가 2개 미만이면 None"""
+        values = [entry[key] for entry in self.backends.values() if entry[key] > 0]
+        if len(values) < 2:
+            return None
+        return max(values) / min(values)
+
+    def format_summary(self):
+        """출력용 인스턴스별 표 - 접속 비율 / QPS 치우침(최대 / 최소)과 p99 가 가장 높은 인스턴스"""
+        total = self.total_connections()
+        lines = ["\nBackend distribution (@@aurora_server_id, @@hostname if not Aurora):"]
+        if not total:
+            lines.append("No backend recorded")
+            return lines
+        lines.append("Backend                        |  Conns |   Share | Connect P50 (ms) | Connect P99 (ms) "
+                     "|     Queries |        QPS | Query P50 (ms) | Query P99 (ms)")
+        lines.append("-" * 150)
+        ordered = sorted(self.backends.items(), key=lambda item: -item[1]['connections'])
+        for backend, entry in ordered:
+            connect = entry['connect']
+            latency = entry['latency']
+            connect_p50 = f"{connect.percentile(50) / 1e6:.3f}" if connect.total_count else '-'
+            connect_p99 = f"{connect.percentile(99) / 1e6:.3f}" if connect.total_count else '-'
+            query_p50 = f"{latency.percentile(50) / 1e6:.3f}" if latency.total_count else '-'
+            query_p99 = f"{latency.percentile(99) / 1e6:.3f}" if latency.total_count else '-'
+            lines.append(f"{str(backend):<30} | {entry['connections']:>6,} | {entry['connections'] / total * 100:>6.2f}% | "
+                         f"{connect_p50:>16} | {connect_p99:>16} | {entry['queries']:>11,} | {entry['qps']:>10.2f} | "
+                         f"{query_p50:>14} | {query_p99:>14}")
+        if len(ordered) > 1:
+            lines.append(f"Connection imbalance (max / min): {self.imbalance('connections'):.2f}x")
+            if self.imbalance('qps') is not None:
+                lines.append(f"QPS imbalance (max / min): {self.imbalance('qps'):.2f}x")
+            slowest = [(entry['latency'].percentile(99), backend) for backend, entry in ordered
+                       if entry['latency'].total_count]
+            if not slowest:
+                slowest = [(entry['connect'].percentile(99), backend) for backend, entry in ordered
+                           if entry['connect'].total_count]
+            if slowest:
+                p99, backend = max(slowest)
+                lines.append(f"Highest P99 backend: {backend} ({p99 / 1e6:.3f} ms)")
+        return lines
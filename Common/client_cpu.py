@@ -0,0 +1,176 @@
+"""
+클라이언트 CPU 사용량 측정
+=========================
+
+사용 목적:
+---------
+초당 접속 수가 더 이상 오르지 않을 때 서버가 아닌 클라이언트가 RSA / ECDHE 연산으로
+CPU 를 다 쓰고 있는지 확인합니다. 실행 동안 프로세스와 워커 쓰레드의 CPU 시간(user / sys)과
+컨텍스트 스위치를 샘플링하여 접속 1회당, 쿼리 1회당 CPU 마이크로초를 계산합니다.
+접속당 CPU 시간으로 코어 1개가 감당할 수 있는 초당 접속 수(접속을 반복하는 앱 pod 수 산정 기준)를
+추정할 수 있습니다.
+
+측정 값:
+-------
+- user / sys: CPU 시간(초) - getrusage(RUSAGE_SELF) 프로세스 전체, RUSAGE_THREAD 쓰레드 단위
+- voluntary_ctx: 자발적 컨텍스트 스위치 (I/O 대기 등)
+- involuntary_ctx: 비자발적 컨텍스트 스위치 (CPU 경쟁으로 선점됨 - 많으면 코어 부족)
+- util: CPU 시간 / 경과 시간 * 100 (코어 1개 = 100%)
+
+사용 예:
+-------
+    sampler = ClientCpuSampler(interval=1)
+    sampler.start()
+    ... 부하 실행 ...
+    sampler.stop()
+    for line in sampler.format_summary(connections=1000, queries=1000):
+        print(line)
+
+    # 워커 쓰레드 단위 측정
+    before = thread_snapshot()
+    ... 접속 반복 ...
+    worker_usage = usage_delta(before, thread_snapshot())
+
+참고:
+----
+- RUSAGE_THREAD 는 Linux 전용. 없는 OS 에서는 time.thread_time() 을 user 로 기록하고
+  sys / 컨텍스트 스위치는 0
+- CPython 쓰레드 엔진은 GIL 때문에 Python 코드가 코어 1개 이상을 쓰지 못함
+  (OpenSSL handshake 는 GIL 을 놓으므로 전체 util 은 100% 를 넘을 수 있음)
+"""
+
+import os
+import resource
+import threading
+import time
+
+RUSAGE_THREAD = getattr(resource, 'RUSAGE_THREAD', None)
+USAGE_FIELDS = ['user', 'sys', 'voluntary_ctx', 'involuntary_ctx']
+SATURATION_PCT = 90
+
+
+def _snapshot(usage):
+    return {
+        'time': time.perf_counter(),
+        'user': usage.ru_utime,
+        'sys': usage.ru_stime,
+        'voluntary_ctx': usage.ru_nvcsw,
+        'involuntary_ctx': usage.ru_nivcsw
+    }
+
+
+def process_snapshot():
+    """프로세스 전체(모든 쓰레드) CPU 시간과 컨텍스트 스위치"""
+    return _snapshot(resource.getrusage(resource.RUSAGE_SELF))
+
+
+def thread_snapshot():
+    """호출한 쓰레드의 CPU 시간과 컨텍스트 스위치"""
+    if RUSAGE_THREAD is not None:
+        return _snapshot(resource.getrusage(RUSAGE_THREAD))
+    return {'time': time.perf_counter(), 'user': time.thread_time(), 'sys': 0.0,
+            'voluntary_ctx': 0, 'involuntary_ctx': 0}
+
+
+def usage_delta(before, after):
+    """두 스냅샷 사이의 사용량 (wall / cpu 는 초)"""
+    delta = {field: after[field] - before[field] for field in USAGE_FIELDS}
+    delta['wall'] = after['time'] - before['time']
+    delta['cpu'] = delta['user'] + delta['sys']
+    return delta
+
+
+def add_usage(total, delta):
+    """쓰레드별 사용량 합산 (wall 은 가장 긴 값)"""
+    if total is None:
+        return dict(delta)
+    for field in USAGE_FIELDS + ['cpu']:
+        total[field] += delta[field]
+    total['wall'] = max(total['wall'], delta['wall'])
+    return total
+
+
+def cpu_us_per(usage, count):
+    return usage['cpu'] / count * 1e6 if count else 0.0
+
+
+class ClientCpuSampler:
+    """실행 동안 프로세스 CPU 사용률을 주기적으로 샘플링"""
+
+    def __init__(self, interval=1, verbose=False):
+        self.interval = interval
+        self.verbose = verbose
+        self.start_snapshot = None
+        self.usage = None
+        self.intervals = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        previous = self.start_snapshot
+        while not self._stop_event.wait(self.interval):
+            current = process_snapshot()
+            delta = usage_delta(previous, current)
+            if delta['wall'] > 0:
+                util = delta['cpu'] / delta['wall'] * 100
+                self.intervals.append(util)
+                if self.verbose:
+                    print(f"[client CPU] {util:6.1f}% (user {delta['user']:.3f}s, sys {delta['sys']:.3f}s, "
+                          f"ctx vol {delta['voluntary_ctx']}, invol {delta['involuntary_ctx']})")
+            previous = current
+
+    def start(self):
+        self.start_snapshot = process_snapshot()
+        self.intervals = []
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """샘플링을 멈추고 실행 전체의 프로세스 사용량 반환"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.usage = usage_delta(self.start_snapshot, process_snapshot())
+        return self.usage
+
+    def summary(self, connections, queries=None, thread_usage=None):
+        """접속 / 쿼리당 CPU 마이크로초, 평균 / 최대 사용률(%), 코어당 초당 접속 수 추정"""
+        usage = self.usage
+        avg_util = usage['cpu'] / usage['wall'] * 100 if usage['wall'] > 0 else 0.0
+        summary = {
+            'usage': usage,
+            'cores': os.cpu_count() or 1,
+            'avg_util': avg_util,
+            'peak_util': max(self.intervals) if self.intervals else avg_util,
+            'cpu_us_per_connection': cpu_us_per(usage, connections),
+            'cpu_us_per_query': cpu_us_per(usage, queries),
+            'connections_per_core_sec': connections / usage['cpu'] if usage['cpu'] > 0 else 0.0,
+            'thread_usage': thread_usage
+        }
+        if thread_usage is not None:
+            summary['thread_cpu_us_per_connection'] = cpu_us_per(thread_usage, connections)
+        return summary
+
+    def format_summary(self, connections, queries=None, thread_usage=None, unit='connection'):
+        """출력용 요약 - 커넥션 풀처럼 접속 대신 요청 단위로 볼 때는 unit='request'"""
+        summary = self.summary(connections, queries, thread_usage)
+        usage = summary['usage']
+        lines = ["\nClient CPU (process):"]
+        lines.append(f"CPU time: user {usage['user']:.3f}s, sys {usage['sys']:.3f}s over {usage['wall']:.2f}s wall")
+        lines.append(f"Utilization (100% = one core, {summary['cores']} cores): "
+                     f"avg {summary['avg_util']:.1f}%, peak {summary['peak_util']:.1f}%")
+        lines.append(f"Context switches: voluntary {usage['voluntary_ctx']:,}, involuntary {usage['involuntary_ctx']:,}")
+        lines.append(f"CPU per {unit}: {summary['cpu_us_per_connection']:.1f}us")
+        if queries:
+            lines.append(f"CPU per query: {summary['cpu_us_per_query']:.1f}us")
+        if thread_usage is not None:
+            lines.append(f"Worker threads CPU: user {thread_usage['user']:.3f}s, sys {thread_usage['sys']:.3f}s "
+                         f"({summary['thread_cpu_us_per_connection']:.1f}us per {unit})")
+        lines.append(f"One core sustains about {summary['connections_per_core_sec']:.1f} {unit}s/sec at this CPU cost")
+        if summary['peak_util'] >= SATURATION_PCT * summary['cores']:
+            lines.append(f"WARNING: client CPU saturated on all cores - {unit}s/sec is client-bound")
+        elif summary['avg_util'] >= SATURATION_PCT:
+            lines.append("WARNING: client used about one full core on average - Python threads may be GIL-bound")
+        return lines
@@ -0,0 +1,227 @@
+"""
+MySQL 접속 단계별 시간 측정 (mysql.connector pure python 연결)
+===============================================================
+
+사용 목적:
+---------
+create_connection() + 쿼리를 하나의 시간으로만 재면 TLSv1.3 이 TLSv1.2 보다 빠른 이유가
+handshake 인지 인증인지 구분할 수 없습니다. 이 모듈은 mysql.connector 의 pure python
+MySQLConnection 을 상속하여 접속 과정을 단계별로 기록합니다.
+
+측정 단계 (초):
+-------------
+- dns: 이름 해석 (스크립트가 dns_resolver 로 직접 해석하여 IP 로 접속할 때 기록)
+- tcp_connect: 이름 해석(getaddrinfo, host 가 IP 이면 생략) + TCP 3-way handshake
+- greeting: 서버 초기 handshake 패킷 수신
+- tls_handshake: SSL 요청 패킷 전송 후 TLS handshake (SSL 미사용 시 없음)
+- auth: 인증 패킷 교환 (tls_handshake 제외)
+- first_query: 접속 후 첫 쿼리 왕복 (스크립트에서 time_first_query 로 기록)
+
+인증 경로 (auth_path):
+--------------------
+- caching_sha2_password 는 서버 AuthMoreData 패킷의 상태 값으로 구분
+  * 'fast': 0x03 fast auth success (서버 캐시 hit)
+  * 'full': 0x04 perform full authentication (TLS 위에서 평문 비밀번호 전송)
+- 그 외 플러그인은 플러그인 이름 (예: 'mysql_native_password')
+
+사용 예:
+-------
+    conn = PhaseTimedConnection(host=..., user=..., password=..., ssl_ca=..., tls_versions=['TLSv1.3'])
+    time_first_query(conn, 'SELECT 1')
+    print(conn.phases, conn.auth_path, conn.tls_version)
+
+TLS 세션 재사용 (TLSSessionCache):
+---------------------------------
+- mysql.connector 는 접속마다 SSLContext 를 새로 만들고 ssl_ca 를 다시 읽으며 항상 full handshake 수행
+- TLSSessionCache 를 넘기면 하나의 SSLContext 를 모든 접속이 공유하고, 직전 접속의 TLS 세션
+  (TLSv1.2 session id / TLSv1.3 session ticket) 으로 resumption 을 시도
+- conn.tls_resumed 로 실제 resumption 여부 확인 (서버가 ticket / session cache 를 지원해야 함)
+- resume_session=False 로 접속하면 같은 SSLContext 에서 세션 없이 full handshake
+  (같은 조건에서 full / resumed 를 번갈아 측정할 때 사용, 새 세션은 캐시에 반영됨)
+
+    cache = TLSSessionCache(ssl_context)
+    conn = PhaseTimedConnection(tls_session_cache=cache, host=..., ssl_ca=..., tls_versions=['TLSv1.3'])
+
+참고:
+----
+- C extension(CMySQLConnection) 은 내부 단계에 접근할 수 없으므로 pure python 연결을 사용
+- mysql-connector-python 8.0 의 MySQLConnection 내부 메서드(_get_connection, _do_handshake,
+  _do_auth) 를 재정의하므로 드라이버 메이저 버전이 바뀌면 확인 필요
+"""
+
+import math
+import os
+import threading
+import time
+
+from mysql.connector.connection import MySQLConnection
+from mysql.connector.network import MySQLTCPSocket
+
+PHASES = ['dns', 'tcp_connect', 'greeting', 'tls_handshake', 'auth', 'first_query']
+
+AUTH_MORE_DATA = 0x01
+FAST_AUTH_SUCCESS = 0x03
+PERFORM_FULL_AUTHENTICATION = 0x04
+
+
+class TLSSessionCache:
+    """접속 간에 공유하는 SSLContext 와 마지막 TLS 세션 (여러 스레드에서 공유 가능)"""
+
+    def __init__(self, context):
+        self.context = context
+        self.session = None
+        self._lock = threading.Lock()
+
+    def wrap(self, sock, server_hostname=None, resume=True):
+        with self._lock:
+            session = self.session if resume else None
+        return self.context.wrap_socket(sock, server_hostname=server_hostname, session=session)
+
+    def update(self, session):
+        """TLSv1.3 ticket 은 handshake 이후에 도착하므로 인증 완료 후 호출"""
+        if session is not None:
+            with self._lock:
+                self.session = session
+
+
+class PhaseTimedTCPSocket(MySQLTCPSocket):
+    """TCP 접속과 TLS handshake 시간, 인증 중 수신 패킷을 기록하는 소켓"""
+
+    def __init__(self, *args, tls_session_cache=None, resume_session=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.phases = {}
+        self.auth_result = None
+        self.tls_version = None
+        self.tls_resumed = None
+        self.tls_session_cache = tls_session_cache
+        self.resume_session = resume_session
+
+    def open_connection(self):
+        start = time.perf_counter()
+        super().open_connection()
+        self.phases['tcp_connect'] = time.perf_counter() - start
+
+    def switch_to_ssl(self, *args, **kwargs):
+        start = time.perf_counter()
+        if self.tls_session_cache is not None:
+            # 공유 SSLContext 사용 - ssl_ca 등 접속 옵션의 인증서 설정은 context 생성 시 반영되어 있어야 함
+            self.sock = self.tls_session_cache.wrap(self.sock, server_hostname=self.server_host,
+                                                    resume=self.resume_session)
+        else:
+            super().switch_to_ssl(*args, **kwargs)
+        self.phases['tls_handshake'] = time.perf_counter() - start
+        self.tls_version = self.sock.version()
+        self.tls_resumed = self.sock.session_reused
+
+    def trace_auth(self):
+        """인증 동안만 recv 를 가로챔 (클래스 속성 recv = recv_plain 을 인스턴스 속성으로 가림)"""
+        self.recv = self._recv_auth
+
+    def untrace_auth(self):
+        self.__dict__.pop('recv', None)
+
+    def _recv_auth(self):
+        packet = self.recv_plain()
+        if len(packet) > 5 and packet[4] == AUTH_MORE_DATA:
+            if packet[5] == FAST_AUTH_SUCCESS:
+                self.auth_result = 'fast'
+            elif packet[5] == PERFORM_FULL_AUTHENTICATION:
+                self.auth_result = 'full'
+        return packet
+
+
+class PhaseTimedConnection(MySQLConnection):
+    """접속 단계별 시간(phases), 인증 경로(auth_path), 협상된 TLS 버전을 기록하는 연결"""
+
+    def __init__(self, tls_session_cache=None, resume_session=True, **kwargs):
+        self.phases = {}
+        self.auth_path = None
+        self.tls_version = None
+        self.tls_resumed = None
+        self.tls_session_cache = tls_session_cache
+        self.resume_session = resume_session
+        super().__init__(**kwargs)
+
+    def _get_connection(self):
+        if self._unix_socket and os.name == 'posix':
+            return super()._get_connection()
+        conn = PhaseTimedTCPSocket(
+            host=self.server_host,
+            port=self.server_port,
+            force_ipv6=self._force_ipv6,
+            tls_session_cache=self.tls_session_cache,
+            resume_session=self.resume_session
+        )
+        conn.set_connection_timeout(self._connection_timeout)
+        return conn
+
+    def _do_handshake(self):
+        start = time.perf_counter()
+        super()._do_handshake()
+        self.phases['greeting'] = time.perf_counter() - start
+
+    def _do_auth(self, *args, **kwargs):
+        traced = isinstance(self._socket, PhaseTimedTCPSocket)
+        if traced:
+            self._socket.trace_auth()
+        start = time.perf_counter()
+        try:
+            return super()._do_auth(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if traced:
+                self._socket.untrace_auth()
+                self.phases.update(self._socket.phases)
+                elapsed -= self._socket.phases.get('tls_handshake', 0)
+                self.tls_version = self._socket.tls_version
+                self.tls_resumed = self._socket.tls_resumed
+                if self.tls_session_cache is not None and self._socket.tls_version:
+                    self.tls_session_cache.update(self._socket.sock.session)
+                self.auth_path = self._socket.auth_result or (self._handshake or {}).get('auth_plugin')
+            self.phases['auth'] = elapsed
+
+
+def time_first_query(conn, query):
+    """접속 직후 첫 쿼리 왕복 시간을 conn.phases['first_query'] 에 기록"""
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute(query)
+    cursor.fetchall()
+    cursor.close()
+    conn.phases['first_query'] = time.perf_counter() - start
+
+
+def phase_percentiles(phase_values, percentiles=(50, 95, 99)):
+    """단계별 값 목록(초) -> {phase: {'count', 'avg', 'max', p50, ...}} (nearest-rank, ms 단위)"""
+    summary = {}
+    for phase in PHASES:
+        values = sorted(phase_values.get(phase) or [])
+        if not values:
+            continue
+        stats = {
+            'count': len(values),
+            'avg': sum(values) / len(values) * 1000,
+            'max': values[-1] * 1000
+        }
+        for pct in percentiles:
+            stats[pct] = values[max(0, math.ceil(len(values) * pct / 100) - 1)] * 1000
+        summary[phase] = stats
+    return summary
+
+
+def phase_histogram_percentiles(phase_histograms, percentiles=(50, 95, 99)):
+    """phase_percentiles 의 LatencyHistogram(ns) 버전 - 값 목록을 저장하지 않는 장시간 실행용"""
+    summary = {}
+    for phase in PHASES:
+        histogram = phase_histograms.get(phase)
+        if histogram is None or not histogram.total_count:
+            continue
+        stats = {
+            'count': histogram.total_count,
+            'avg': histogram.mean() / 1e6,
+            'max': histogram.max_value / 1e6
+        }
+        for pct in percentiles:
+            stats[pct] = histogram.percentile(pct) / 1e6
+        summary[phase] = stats
+    return summary
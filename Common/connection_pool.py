@@ -0,0 +1,156 @@
+"""
+크기 제한 커넥션 풀 (checkout 대기 시간 측정)
+============================================
+
+사용 목적:
+---------
+애플리케이션 커넥션 풀 크기를 데이터로 정하기 위한 벤치마크용 풀입니다.
+mysql.connector.pooling 은 풀이 비어 있으면 기다리지 않고 바로 PoolError 를 내므로
+checkout 대기 시간과 풀 고갈 상황을 측정할 수 없습니다. 이 풀은 최대 size 개의 커넥션을
+필요할 때 생성하고, 모두 사용 중이면 checkout_timeout 초까지 기다립니다.
+
+기록 값 (stats()):
+-----------------
+- checkouts: 성공한 checkout 수
+- created / create_time: 생성한 커넥션 수 (최대 size, 오류로 버린 커넥션을 다시 만들면 증가) 와 총 생성 시간(초)
+- discarded: 오류로 풀에 돌려놓지 않고 닫은 커넥션 수
+- exhausted: checkout 시점에 풀이 모두 사용 중이라 기다려야 했던 횟수
+- timeouts: checkout_timeout 안에 커넥션을 얻지 못한 횟수 (PoolTimeout)
+- peak_in_use: 동시에 사용 중이던 최대 커넥션 수
+- resets / reset_time: 반납 시 세션 초기화 횟수와 총 소요시간(초)
+
+세션 초기화 (reset_session=True):
+-------------------------------
+반납할 때 conn.reset_session() (COM_RESET_CONNECTION) 으로 세션 변수, 임시 테이블,
+트랜잭션 상태를 초기화합니다. mysql.connector.pooling 의 pool_reset_session 과 같은 동작이며
+반납마다 round trip 이 1회 추가됩니다.
+
+checkout 시간 구분:
+-----------------
+checkout() 은 (커넥션, 대기 시간, 생성 시간) 을 반환합니다. 대기 시간은 빈 슬롯 / 유휴 커넥션을
+기다린 시간만이며, 유휴 커넥션이 없어 새로 접속한 경우의 접속 시간(TCP + TLS + 인증)은
+생성 시간으로 따로 반환합니다 (풀 크기 부족과 접속 비용을 구분하기 위함).
+
+사용 예:
+-------
+    pool = BoundedConnectionPool(lambda: mysql.connector.connect(**config), size=10, checkout_timeout=5)
+    conn, wait, create_time = pool.checkout()
+    try:
+        ... 쿼리 ...
+    except Exception:
+        pool.release(conn, discard=True)
+        raise
+    pool.release(conn)
+    pool.close()
+"""
+
+import queue
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class BoundedConnectionPool:
+    def __init__(self, create_connection, size, checkout_timeout=5, reset_session=True):
+        self.create_connection = create_connection
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.reset_session = reset_session
+        # 최근 반납한 커넥션부터 재사용 (LIFO) - 사용하지 않는 커넥션은 서버에서 idle 로 남음
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._all = set()
+        self._in_use = 0
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'discarded': 0,
+            'exhausted': 0,
+            'timeouts': 0,
+            'peak_in_use': 0,
+            'resets': 0,
+            'reset_time': 0.0,
+            'create_time': 0.0
+        }
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self._stats[key] += value
+
+    def checkout(self):
+        """커넥션 1개, 대기 시간(초), 새 커넥션 생성 시간(초, 재사용이면 0) 반환 - 시간 안에 얻지 못하면 PoolTimeout"""
+        start = time.perf_counter()
+        create_time = 0.0
+        if not self._slots.acquire(blocking=False):
+            self._count('exhausted')
+            if not self._slots.acquire(timeout=self.checkout_timeout):
+                self._count('timeouts')
+                raise PoolTimeout(f"no connection available within {self.checkout_timeout}s (pool size {self.size})")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                create_start = time.perf_counter()
+                conn = self.create_connection()
+                create_time = time.perf_counter() - create_start
+                with self._lock:
+                    self._all.add(conn)
+                    self._stats['created'] += 1
+                    self._stats['create_time'] += create_time
+        except Exception:
+            self._slots.release()
+            raise
+        wait = time.perf_counter() - start - create_time
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._in_use += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+        return conn, wait, create_time
+
+    def release(self, conn, discard=False):
+        """커넥션 반납 - discard=True 이거나 세션 초기화에 실패하면 닫고 풀에서 제거"""
+        try:
+            if not discard and self.reset_session:
+                start = time.perf_counter()
+                try:
+                    conn.reset_session()
+                    self._count('resets')
+                    self._count('reset_time', time.perf_counter() - start)
+                except Exception:
+                    discard = True
+            if discard:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def _discard(self, conn):
+        with self._lock:
+            self._all.discard(conn)
+            self._stats['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """풀의 모든 커넥션 종료"""
+        with self._lock:
+            connections = list(self._all)
+            self._all.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
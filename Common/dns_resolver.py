@@ -0,0 +1,163 @@
+"""
+접속용 이름 해석 캐시와 엔드포인트 IP 고정
+==========================================
+
+사용 목적:
+---------
+mysql.connector.connect(host=클러스터 엔드포인트) 는 접속마다 getaddrinfo 로 이름을 다시 해석합니다.
+초당 수천 번 접속하면 resolver 지연과 failover 중 TTL 만료로 바뀌는 레코드가 접속 시간에 섞입니다.
+이 모듈은 스크립트가 접속 전에 직접 이름을 해석하여 IP 로 접속하도록 하고,
+접속마다 이름 해석 시간과 사용한 IP 를 기록합니다.
+
+모드 (mode):
+-----------
+- 'system': 접속마다 getaddrinfo (기존 mysql.connector 동작과 같음, 해석 시간만 따로 측정)
+- 'cache': 프로세스 안에서 ttl 초 동안 해석 결과 재사용 (Aurora 엔드포인트 DNS TTL 은 5초)
+- 'pin': 처음 pin_samples 번 해석하여 모은 IP 들에 고정하고 접속마다 돌아가며 사용 (DNS 조회 없음)
+  * reader 엔드포인트는 조회할 때마다 reader 인스턴스 IP 하나를 돌려주므로 여러 번 해석하여 수집
+  * failover / reader 추가, 삭제 후에도 예전 IP 로 접속하므로 장애 테스트에서는 사용하지 않음
+
+기록 값 (stats()):
+-----------------
+- lookups: resolve() 호출 수
+- resolver_calls: 실제 getaddrinfo 호출 수 (cache hit / pin 은 제외)
+- cache_hits: 캐시 / 고정 IP 로 응답한 수
+- changes: 같은 이름의 해석 결과에 이전에 본 적 없는 IP 가 나온 횟수 (failover, 인스턴스 추가/교체)
+- rotations: 이미 본 IP 들 안에서 결과 / 순서만 바뀐 횟수 (reader 엔드포인트 round-robin, TTL flip)
+- ip_counts: IP 별 반환 횟수 (reader 엔드포인트 부하 분산 치우침 확인)
+
+사용 예:
+-------
+    resolver = CachingResolver(mode='cache', ttl=5)
+    ip, dns_time = resolver.resolve(host, 3306)
+    conn = mysql.connector.connect(host=ip, ...)
+    for line in resolver.format_summary():
+        print(line)
+
+참고:
+----
+- getaddrinfo 는 레코드의 실제 TTL 을 알려주지 않으므로 ttl 은 설정 값을 사용
+- IP 로 접속하므로 ssl_verify_identity=True (인증서 호스트 이름 검증) 와 함께 사용할 수 없음
+"""
+
+import itertools
+import socket
+import threading
+import time
+
+MODES = ('system', 'cache', 'pin')
+
+
+class CachingResolver:
+    def __init__(self, mode='system', ttl=5, pin_samples=10):
+        if mode not in MODES:
+            raise ValueError(f"dns mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self.ttl = ttl
+        self.pin_samples = pin_samples
+        self._lock = threading.Lock()
+        self._pin_lock = threading.Lock()
+        self._cache = {}
+        self._pinned = {}
+        self._last = {}
+        self._seen = {}
+        self._stats = {
+            'lookups': 0,
+            'resolver_calls': 0,
+            'cache_hits': 0,
+            'changes': 0,
+            'rotations': 0
+        }
+        self._ip_counts = {}
+
+    def _getaddrinfo(self, host, port):
+        """IPv4/IPv6 TCP 주소 목록 (getaddrinfo 순서 유지, 중복 제거)"""
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = []
+        for info in infos:
+            address = info[4][0]
+            if address not in addresses:
+                addresses.append(address)
+        with self._lock:
+            self._stats['resolver_calls'] += 1
+            previous = self._last.get((host, port))
+            seen = self._seen.setdefault((host, port), set())
+            if previous is not None and previous != addresses:
+                # round-robin 으로 돌아가며 나오는 IP 는 레코드 변경으로 세지 않음
+                if seen.issuperset(addresses):
+                    self._stats['rotations'] += 1
+                else:
+                    self._stats['changes'] += 1
+            seen.update(addresses)
+            self._last[(host, port)] = addresses
+        return addresses
+
+    def _pin(self, host, port):
+        """pin_samples 번 해석하여 나온 IP 전체를 순환 대상으로 고정"""
+        addresses = []
+        for _ in range(max(1, self.pin_samples)):
+            for address in self._getaddrinfo(host, port):
+                if address not in addresses:
+                    addresses.append(address)
+        return {'addresses': addresses, 'cycle': itertools.cycle(addresses)}
+
+    def resolve(self, host, port=3306):
+        """접속할 IP 와 이름 해석에 걸린 시간(초) 반환"""
+        key = (host, port)
+        start = time.perf_counter()
+        cached = True
+        if self.mode == 'pin':
+            with self._pin_lock:
+                pinned = self._pinned.get(key)
+                if pinned is None:
+                    # 첫 호출에서 한 번만 수집 (다른 쓰레드는 lock 에서 대기)
+                    pinned = self._pinned[key] = self._pin(host, port)
+                    cached = False
+                address = next(pinned['cycle'])
+        elif self.mode == 'cache':
+            with self._lock:
+                entry = self._cache.get(key)
+            if entry is None or entry[1] <= start:
+                address = self._getaddrinfo(host, port)[0]
+                with self._lock:
+                    self._cache[key] = (address, time.perf_counter() + self.ttl)
+                cached = False
+            else:
+                address = entry[0]
+        else:
+            address = self._getaddrinfo(host, port)[0]
+            cached = False
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats['lookups'] += 1
+            if cached:
+                self._stats['cache_hits'] += 1
+            self._ip_counts[address] = self._ip_counts.get(address, 0) + 1
+        return address, elapsed
+
+    def pinned_addresses(self, host, port=3306):
+        pinned = self._pinned.get((host, port))
+        return list(pinned['addresses']) if pinned else []
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['ip_counts'] = dict(self._ip_counts)
+        return stats
+
+    def format_summary(self):
+        """출력용 요약 - 캐시 hit 비율, 레코드 변경 / 순환 횟수, IP 별 분포와 치우침(최대 / 최소 비율)"""
+        stats = self.stats()
+        lines = [f"\nDNS resolution (mode {self.mode}" + (f", ttl {self.ttl}s" if self.mode == 'cache' else '') + "):"]
+        lookups = stats['lookups']
+        lines.append(f"Lookups: {lookups:,}, resolver calls: {stats['resolver_calls']:,}, "
+                     f"cache hits: {stats['cache_hits']:,} ({stats['cache_hits'] / lookups * 100 if lookups else 0:.2f}%)")
+        lines.append(f"Record changes observed (new IPs): {stats['changes']}, rotations among known IPs: {stats['rotations']}")
+        ip_counts = stats['ip_counts']
+        if ip_counts:
+            lines.append("Connections by resolved IP:")
+            for address, count in sorted(ip_counts.items(), key=lambda item: -item[1]):
+                lines.append(f"  {address:<39} {count:>8,} ({count / lookups * 100:.2f}%)")
+            if len(ip_counts) > 1:
+                lines.append(f"Skew (max / min share): {max(ip_counts.values()) / min(ip_counts.values()):.2f}x")
+        return lines
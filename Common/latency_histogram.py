@@ -0,0 +1,126 @@
+"""
+고정 메모리 로그 버킷 지연시간 히스토그램
+==========================================
+
+사용 목적:
+---------
+HdrHistogram 과 같은 방식(log-linear bucket)으로 지연시간을 기록하여
+수백만 건의 쿼리를 개별 샘플 저장 없이 집계합니다.
+
+특징:
+----
+- 기록 단위: 나노초 (time.perf_counter_ns() 차이값)
+- 상대 오차: 2 ** -(SUB_BUCKET_BITS - 1) 이하 (기본 약 0.8%)
+- 메모리: 최대 추적 값과 무관하게 수천 개의 정수 카운터로 고정
+- 평균/표준편차는 버킷이 아닌 실제 기록 값의 합과 제곱합으로 계산
+- merge() 로 워커(스레드/프로세스)별 히스토그램을 합산 가능
+- pickle 가능하므로 multiprocessing 결과로 그대로 전달 가능
+
+사용 예:
+-------
+    histogram = LatencyHistogram()
+    start = time.perf_counter_ns()
+    cursor.execute("SELECT 1")
+    cursor.fetchall()
+    histogram.record(time.perf_counter_ns() - start)
+
+    total = LatencyHistogram()
+    total.merge(histogram)
+    print(total.percentile(99) / 1e6, "ms")
+"""
+
+from array import array
+
+SUB_BUCKET_BITS = 8                 # 2^8 = 256 개 sub bucket, 상대 오차 1/128
+MAX_TRACKABLE_NS = 3600 * 10 ** 9   # 1시간, 이보다 큰 값은 마지막 버킷에 기록
+
+
+class LatencyHistogram:
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS, max_trackable_ns=MAX_TRACKABLE_NS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.max_trackable_ns = max_trackable_ns
+        self.counts = array('Q', [0]) * (self._index_of(max_trackable_ns) + 1)
+        self.total_count = 0
+        self.total_sum = 0
+        self.total_sum_sq = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def _index_of(self, value):
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return (self.sub_bucket_count
+                + (shift - 1) * self.sub_bucket_half
+                + (value >> shift) - self.sub_bucket_half)
+
+    def _highest_equivalent_value(self, index):
+        """버킷 index 에 속하는 가장 큰 값 (HdrHistogram 과 같은 보고 기준)"""
+        if index < self.sub_bucket_count:
+            return index
+        offset = index - self.sub_bucket_count
+        shift = offset // self.sub_bucket_half + 1
+        mantissa = offset % self.sub_bucket_half + self.sub_bucket_half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value_ns, count=1):
+        """지연시간(나노초) 기록"""
+        value_ns = int(value_ns)
+        if value_ns < 0:
+            value_ns = 0
+        index = self._index_of(min(value_ns, self.max_trackable_ns))
+        self.counts[index] += count
+        self.total_count += count
+        self.total_sum += value_ns * count
+        self.total_sum_sq += value_ns * value_ns * count
+        if self.min_value is None or value_ns < self.min_value:
+            self.min_value = value_ns
+        if value_ns > self.max_value:
+            self.max_value = value_ns
+
+    def merge(self, other):
+        """다른 히스토그램의 카운트를 합산 (같은 설정이어야 함)"""
+        if (other.sub_bucket_bits != self.sub_bucket_bits
+                or len(other.counts) != len(self.counts)):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total_count += other.total_count
+        self.total_sum += other.total_sum
+        self.total_sum_sq += other.total_sum_sq
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        if other.max_value > self.max_value:
+            self.max_value = other.max_value
+        return self
+
+    def percentile(self, pct):
+        """백분위 값(나노초). 기록이 없으면 0"""
+        if self.total_count == 0:
+            return 0
+        target = max(1, -(-self.total_count * pct // 100))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                if index == len(self.counts) - 1:
+                    return self.max_value
+                return min(self._highest_equivalent_value(index), self.max_value)
+        return self.max_value
+
+    def mean(self):
+        """평균(나노초). 기록이 없으면 0"""
+        if self.total_count == 0:
+            return 0
+        return self.total_sum / self.total_count
+
+    def stdev(self):
+        """표본 표준편차(나노초) - 버킷이 아닌 실제 기록 값 기준. 기록이 2건 미만이면 0"""
+        if self.total_count < 2:
+            return 0
+        n = self.total_count
+        return ((n * self.total_sum_sq - self.total_sum * self.total_sum) / (n * (n - 1))) ** 0.5
@@ -0,0 +1,31 @@
+"""
+프로세스 파일 디스크립터 한도 올리기
+==================================
+
+사용 목적:
+---------
+커넥션 하나가 소켓(파일 디스크립터) 하나를 쓰므로 asyncio 엔진 / 대량 idle 커넥션 테스트처럼
+수천 개 커넥션을 여는 스크립트는 기본 soft limit(보통 1024)에서 "Too many open files" 로 실패합니다.
+접속을 시작하기 전에 RLIMIT_NOFILE soft limit 을 hard limit 까지 올립니다.
+
+사용 예:
+-------
+    raise_open_files_limit()
+    raise_open_files_limit(log=log_message)   # 스크립트의 로그 함수로 실패 메시지 출력
+
+참고:
+----
+- hard limit 보다 높게는 올릴 수 없음 (필요하면 ulimit -Hn / systemd LimitNOFILE 로 먼저 조정)
+- resource 모듈이 없는 OS(Windows) 에서는 메시지만 출력하고 그대로 진행
+"""
+
+
+def raise_open_files_limit(log=print):
+    """수천 개 커넥션을 위해 프로세스 파일 디스크립터 soft limit 을 hard limit 까지 올림"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard == resource.RLIM_INFINITY or soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError) as e:
+        log(f"Could not raise open files limit: {e}")
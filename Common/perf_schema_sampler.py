@@ -0,0 +1,208 @@
+"""
+Performance Schema 구간 delta 샘플러
+====================================
+
+사용 목적:
+---------
+performance_schema 요약 테이블을 TRUNCATE 하면 같은 클러스터를 사용하는 다른 팀의 데이터도
+함께 사라집니다. 이 샘플러는 테이블을 비우지 않고 일정 간격으로 스냅샷을 읽어
+클라이언트에서 delta 를 계산하므로, 구간별 서버 측 지연시간과 wait/stage 분포를
+다른 사용자에게 영향 없이 얻을 수 있습니다.
+
+대상 테이블:
+-----------
+- events_statements_summary_by_digest
+- events_waits_summary_global_by_event_name
+- events_stages_summary_global_by_event_name
+
+사용 예:
+-------
+    sampler = PerformanceSchemaSampler(
+        lambda: mysql.connector.connect(**MYSQL_CONFIG),
+        interval=5, schema='test', query='SELECT 1'
+    )
+    sampler.start()
+    ... 부하 실행 ...
+    sampler.stop()
+    run_delta = sampler.delta(sampler.snapshots[0], sampler.snapshots[-1])
+
+참고:
+----
+- 누적 카운터가 줄어든 경우(다른 사용자가 TRUNCATE 한 경우) 현재 값을 delta 로 사용
+- QUANTILE_* 컬럼은 누적 값이라 delta 계산이 불가능하므로 샘플링하지 않음
+- TIMER 값은 피코초 단위
+"""
+
+import threading
+import time
+
+PICO_TO_MS = 1e-9
+
+
+class PerformanceSchemaSampler:
+    def __init__(self, connect, interval=5, schema=None, query=None, top_n=5, verbose=True):
+        self.connect = connect
+        self.interval = interval
+        self.schema = schema
+        self.query = query
+        self.top_n = top_n
+        self.verbose = verbose
+        self.digest = None
+        self.snapshots = []
+        self.interval_deltas = []
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def open(self):
+        """샘플러 전용 커넥션을 열고 대상 쿼리의 digest 를 확인"""
+        self._conn = self.connect()
+        if self.query:
+            cursor = self._conn.cursor()
+            try:
+                # MySQL 8.0+: 대상 쿼리의 digest 를 정확히 계산
+                cursor.execute("SELECT STATEMENT_DIGEST(%s)", (self.query,))
+                self.digest = cursor.fetchone()[0]
+            except Exception as e:
+                print(f"STATEMENT_DIGEST() not available, reporting top digests instead: {e}")
+                self.digest = None
+            finally:
+                cursor.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def snapshot(self):
+        """세 요약 테이블의 현재 누적 값을 읽어 스냅샷으로 저장하고 반환"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                digest_sql = """
+                    SELECT SCHEMA_NAME, DIGEST, DIGEST_TEXT, COUNT_STAR, SUM_TIMER_WAIT
+                    FROM performance_schema.events_statements_summary_by_digest
+                    WHERE COUNT_STAR > 0
+                """
+                params = ()
+                if self.schema is not None:
+                    digest_sql += " AND SCHEMA_NAME = %s"
+                    params = (self.schema,)
+                cursor.execute(digest_sql, params)
+                digests = {
+                    (row[0], row[1]): {'text': row[2], 'count': int(row[3]), 'sum': int(row[4])}
+                    for row in cursor.fetchall()
+                }
+
+                cursor.execute("""
+                    SELECT EVENT_NAME, COUNT_STAR, SUM_TIMER_WAIT
+                    FROM performance_schema.events_waits_summary_global_by_event_name
+                    WHERE COUNT_STAR > 0
+                """)
+                waits = {row[0]: {'count': int(row[1]), 'sum': int(row[2])} for row in cursor.fetchall()}
+
+                cursor.execute("""
+                    SELECT EVENT_NAME, COUNT_STAR, SUM_TIMER_WAIT
+                    FROM performance_schema.events_stages_summary_global_by_event_name
+                    WHERE COUNT_STAR > 0
+                """)
+                stages = {row[0]: {'count': int(row[1]), 'sum': int(row[2])} for row in cursor.fetchall()}
+            finally:
+                cursor.close()
+
+            snapshot = {
+                'time': time.time(),
+                'digests': digests,
+                'waits': waits,
+                'stages': stages
+            }
+            self.snapshots.append(snapshot)
+            return snapshot
+
+    @staticmethod
+    def _delta_rows(before, after):
+        rows = {}
+        for key, cur in after.items():
+            prev = before.get(key)
+            if prev is None or cur['count'] < prev['count']:
+                count, total = cur['count'], cur['sum']
+            else:
+                count, total = cur['count'] - prev['count'], cur['sum'] - prev['sum']
+            if count > 0:
+                row = dict(cur)
+                row['count'] = count
+                row['sum'] = total
+                rows[key] = row
+        return rows
+
+    def delta(self, before, after):
+        """두 스냅샷 사이의 delta (테이블별 key -> count, sum)"""
+        return {
+            'seconds': after['time'] - before['time'],
+            'digests': self._delta_rows(before['digests'], after['digests']),
+            'waits': self._delta_rows(before['waits'], after['waits']),
+            'stages': self._delta_rows(before['stages'], after['stages'])
+        }
+
+    def digest_summary(self, delta):
+        """delta 에서 대상 쿼리 digest 의 (실행 수, 평균 ms) - digest 를 모르면 모든 digest 합계"""
+        count = 0
+        total = 0
+        for (schema, digest), row in delta['digests'].items():
+            if self.digest is None or digest == self.digest:
+                count += row['count']
+                total += row['sum']
+        avg_ms = total / count * PICO_TO_MS if count else 0
+        return count, avg_ms
+
+    def top(self, rows, n=None):
+        """sum 기준 상위 n 개 (key, count, 평균 ms, 합계 ms)"""
+        ordered = sorted(rows.items(), key=lambda item: item[1]['sum'], reverse=True)[:n or self.top_n]
+        return [
+            (key, row['count'], row['sum'] / row['count'] * PICO_TO_MS, row['sum'] * PICO_TO_MS)
+            for key, row in ordered
+        ]
+
+    def print_interval(self, index, delta):
+        count, avg_ms = self.digest_summary(delta)
+        seconds = delta['seconds'] or 1
+        print(f"[PS interval {index}] {delta['seconds']:.1f}s | statements: {count:,} "
+              f"({count / seconds:.1f}/s) | avg latency: {avg_ms:.6f}ms")
+        for name, event_count, event_avg, event_total in self.top(delta['waits']):
+            print(f"  wait  {name:<60} count {event_count:>10,} avg {event_avg:>10.6f}ms total {event_total:>12.3f}ms")
+        for name, event_count, event_avg, event_total in self.top(delta['stages']):
+            print(f"  stage {name:<60} count {event_count:>10,} avg {event_avg:>10.6f}ms total {event_total:>12.3f}ms")
+
+    def _run(self):
+        index = 1
+        while not self._stop_event.wait(self.interval):
+            try:
+                previous = self.snapshots[-1]
+                current = self.snapshot()
+                delta = self.delta(previous, current)
+                self.interval_deltas.append(delta)
+                if self.verbose:
+                    self.print_interval(index, delta)
+                index += 1
+            except Exception as e:
+                print(f"Performance schema sampling failed: {e}")
+
+    def start(self):
+        """기준 스냅샷을 찍고 주기적 샘플링 스레드 시작"""
+        self.open()
+        self.snapshot()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """샘플링을 멈추고 마지막 스냅샷을 찍은 뒤 커넥션 종료"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        try:
+            self.snapshot()
+        finally:
+            self.close()
@@ -0,0 +1,168 @@
+"""
+processlist 일괄 스냅샷 (connection id 색인)
+============================================
+
+사용 목적:
+---------
+커넥션마다 information_schema.processlist 를 WHERE ID = %s 로 조회하면 조회마다 서버가
+전체 세션 목록을 만들고(MySQL 8 에서 LOCK_thd_list / 세션별 mutex) 추적 커넥션 수만큼
+반복되므로 세션 수가 늘면 조회 자체가 부하가 됩니다.
+이 모듈은 interval 마다 한 번의 쿼리로 전체 foreground 세션을 읽어 connection id 로 색인해 두고,
+추적 중인 커넥션 수와 관계없이 메모리에서 O(1) 로 조회합니다.
+
+조회 대상 (SOURCES 순서대로, 처음 성공한 것을 계속 사용):
+--------------------------------------------------------
+- performance_schema.threads (TYPE = 'FOREGROUND', 서버 mutex 없이 읽음, THREAD_ID 포함)
+- performance_schema.processlist (MySQL 8.0.22 이상)
+- information_schema.processlist (performance_schema 가 꺼져 있는 경우)
+
+행 형식 (get_process_info 와 같은 key):
+-------------------------------------
+ID, USER, HOST, DB, COMMAND, TIME, STATE, INFO, THREAD_ID (information_schema 는 None)
+
+사용 예:
+-------
+    # 한 번만 조회
+    rows = fetch_processlist(cursor)
+    process_info = rows.get(connection_id)
+
+    # 주기적 스냅샷 (별도 커넥션, 백그라운드 쓰레드)
+    snapshot = ProcesslistSnapshot(lambda: mysql.connector.connect(**MYSQL_CONFIG), interval=1)
+    snapshot.start()
+    info = snapshot.get(connection_id)   # 최근 스냅샷 기준, 없으면 None
+    snapshot.stop()
+
+참고:
+----
+- 값은 최대 interval 초 전 상태 (snapshot.age() 로 확인)
+- on_refresh(rows, taken_at) 를 지정하면 스냅샷마다 호출 (세션이 목록에서 사라진 시각 추적 등)
+- refresh() 는 lock 으로 직렬화되므로 갱신 쓰레드가 도는 중에 다른 쓰레드에서 호출해도 됨
+  (스냅샷 커넥션 하나를 공유하므로 동시에 쿼리하면 프로토콜 스트림이 섞임)
+"""
+
+import threading
+import time
+
+FIELDS = ['ID', 'USER', 'HOST', 'DB', 'COMMAND', 'TIME', 'STATE', 'INFO', 'THREAD_ID']
+SOURCES = [
+    ('performance_schema.threads', """
+        SELECT PROCESSLIST_ID, PROCESSLIST_USER, PROCESSLIST_HOST, PROCESSLIST_DB,
+               PROCESSLIST_COMMAND, PROCESSLIST_TIME, PROCESSLIST_STATE, PROCESSLIST_INFO, THREAD_ID
+        FROM performance_schema.threads
+        WHERE TYPE = 'FOREGROUND' AND PROCESSLIST_ID IS NOT NULL
+    """),
+    ('performance_schema.processlist', """
+        SELECT ID, USER, HOST, DB, COMMAND, TIME, STATE, INFO, NULL
+        FROM performance_schema.processlist
+    """),
+    ('information_schema.processlist', """
+        SELECT ID, USER, HOST, DB, COMMAND, TIME, STATE, INFO, NULL
+        FROM information_schema.processlist
+    """)
+]
+
+
+def fetch_processlist(cursor, sources=None):
+    """전체 세션을 한 번에 읽어 {connection id: 행} 반환 - sources 를 순서대로 시도"""
+    last_error = None
+    for name, sql in sources or SOURCES:
+        try:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+        except Exception as e:
+            last_error = e
+            continue
+        return {int(row[0]): dict(zip(FIELDS, row)) for row in rows}
+    raise last_error
+
+
+class ProcesslistSnapshot:
+    def __init__(self, connect, interval=1, on_refresh=None):
+        self.connect = connect
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self.source = None
+        self.rows = {}
+        self.taken_at = None
+        self.refreshes = 0
+        self.last_refresh_ms = 0.0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def open(self):
+        self._conn = self.connect()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def refresh(self):
+        """스냅샷 1회 - 처음에는 SOURCES 를 순서대로 시도하고 이후 성공한 대상만 조회"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        sources = [self.source] if self.source else SOURCES
+        start = time.perf_counter()
+        cursor = self._conn.cursor()
+        try:
+            last_error = None
+            for source in sources:
+                try:
+                    rows = fetch_processlist(cursor, [source])
+                except Exception as e:
+                    last_error = e
+                    continue
+                self.source = source
+                break
+            else:
+                raise last_error
+        finally:
+            cursor.close()
+        # dict 를 통째로 바꾸므로 다른 쓰레드의 get() 은 lock 없이 이전 또는 새 스냅샷을 봄
+        self.rows = rows
+        self.taken_at = time.time()
+        self.refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        if self.on_refresh is not None:
+            self.on_refresh(rows, self.taken_at)
+        return rows
+
+    def get(self, connection_id):
+        """최근 스냅샷에서 connection id 의 행 - 목록에 없으면 None"""
+        return self.rows.get(connection_id)
+
+    def age(self):
+        """최근 스냅샷 이후 경과 시간(초)"""
+        return time.time() - self.taken_at if self.taken_at else None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Processlist snapshot failed: {e}")
+
+    def start(self):
+        """첫 스냅샷을 찍고 주기적 갱신 쓰레드 시작"""
+        self.open()
+        self.refresh()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self.close()
+
+    def format_summary(self):
+        name = self.source[0] if self.source else 'none'
+        return [f"Processlist snapshots: {self.refreshes} from {name}, {len(self.rows)} sessions in last, "
+                f"last refresh {self.last_refresh_ms:.1f}ms"]
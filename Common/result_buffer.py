@@ -0,0 +1,138 @@
+"""
+고정 메모리 결과 버퍼
+====================
+
+사용 목적:
+---------
+접속 테스트 워커가 반복마다 ISO 시각 문자열이 들어간 dict 를 results 목록에 쌓고
+분석 단계에서 다시 목록을 만들어 statistics.stdev 를 호출하면 수 시간 실행 시 메모리가
+GB 단위로 늘어납니다. 이 버퍼는 결과를 저장하지 않고 바로 집계하여 실행 시간과 관계없이
+메모리를 일정하게 유지합니다.
+
+구성:
+----
+- 메트릭별 LatencyHistogram (Common/latency_histogram.py, ns)
+  * 평균 / 표준편차: 실제 값의 합과 제곱합으로 스트리밍 계산 (정확)
+  * 분위수: 로그 버킷 (상대 오차 약 0.8%)
+- 카운터: 인증 경로 등 이름별 건수
+- 최근 recent 건의 원시 샘플: array 기반 ring buffer
+  (종료 시각 time.perf_counter_ns(), 지연시간 ns, 쓰레드 id, 상태 코드)
+  * 종료 시 write_recent_samples() 로 CSV 저장 - 마지막 구간의 지연시간 추이 / 오류 시점 확인용
+
+사용 예:
+-------
+    buffer = ResultBuffer(recent=1000)
+    # 워커 (여러 쓰레드에서 같은 버퍼 사용 가능)
+    buffer.add(thread_id, latency_ns, STATUS_OK,
+               values={'total_time': 0.012, 'phase.auth': 0.003}, counters=['auth_path.fast'])
+    buffer.add(thread_id, latency_ns, STATUS_ERROR)
+    # 분석
+    histogram = buffer.histogram('total_time')
+    print(histogram.percentile(99) / 1e9, "s")
+    buffer.write_recent_samples('recent_samples.csv')
+
+참고:
+----
+- 워커마다 히스토그램을 두면 메트릭당 수십 KB 씩 늘어나므로 (asyncio 엔진 수천 개 태스크)
+  모든 워커가 하나의 버퍼를 lock 으로 공유 - add() 한 번에 lock 한 번
+- 메모리: 메트릭 수 x 히스토그램 크기 + recent x 21 byte
+"""
+
+import csv
+import threading
+import time
+from array import array
+
+from latency_histogram import LatencyHistogram
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+class ResultBuffer:
+    def __init__(self, recent=1000):
+        self.recent = recent
+        self.histograms = {}
+        self.counters = {}
+        self.samples = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._end_ns = array('q')
+        self._latency_ns = array('q')
+        self._thread_id = array('l')
+        self._status = array('b')
+        self._next = 0
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def _ring_append(self, end_ns, latency_ns, thread_id, status):
+        if not self.recent:
+            return
+        if len(self._end_ns) < self.recent:
+            self._end_ns.append(end_ns)
+            self._latency_ns.append(latency_ns)
+            self._thread_id.append(thread_id)
+            self._status.append(status)
+            return
+        index = self._next
+        self._end_ns[index] = end_ns
+        self._latency_ns[index] = latency_ns
+        self._thread_id[index] = thread_id
+        self._status[index] = status
+        self._next = (index + 1) % self.recent
+
+    def add(self, thread_id, latency_ns, status=STATUS_OK, end_ns=None, values=None, counters=None):
+        """결과 1건 - 원시 샘플은 ring 에, values({이름: 초}) 는 히스토그램에, counters(이름 목록) 는 카운터에 반영"""
+        end_ns = time.perf_counter_ns() if end_ns is None else end_ns
+        with self._lock:
+            self.samples += 1
+            if status != STATUS_OK:
+                self.errors += 1
+            self._ring_append(end_ns, int(latency_ns), thread_id, status)
+            if values:
+                for name, seconds in values.items():
+                    self._histogram(name).record(int(seconds * 1e9))
+            if counters:
+                for name in counters:
+                    self.counters[name] = self.counters.get(name, 0) + 1
+
+    def record(self, name, seconds):
+        """원시 샘플 없이 히스토그램에만 값(초) 기록"""
+        with self._lock:
+            self._histogram(name).record(int(seconds * 1e9))
+
+    def histogram(self, name):
+        """이름별 히스토그램 - 기록이 없으면 빈 히스토그램"""
+        return self.histograms.get(name) or LatencyHistogram()
+
+    def names(self, prefix):
+        """prefix 로 시작하는 히스토그램 이름 -> prefix 를 뺀 이름 목록"""
+        return [name[len(prefix):] for name in self.histograms if name.startswith(prefix)]
+
+    def counters_with(self, prefix):
+        return {name[len(prefix):]: count for name, count in self.counters.items() if name.startswith(prefix)}
+
+    def recent_samples(self):
+        """보관 중인 원시 샘플 (end_ns, latency_ns, thread_id, status) - 오래된 것부터"""
+        with self._lock:
+            order = list(range(self._next, len(self._end_ns))) + list(range(0, self._next))
+            return [(self._end_ns[i], self._latency_ns[i], self._thread_id[i], self._status[i]) for i in order]
+
+    def write_recent_samples(self, path):
+        """보관 중인 원시 샘플을 종료 시각 순으로 CSV 저장 (가장 이른 종료 시각 기준 offset) - 저장한 건수 반환"""
+        # steady-state 필터를 거친 샘플은 쓰레드마다 늦게 반영될 수 있어 추가 순서가 아닌 종료 시각으로 정렬
+        samples = sorted(self.recent_samples())
+        if not samples:
+            return 0
+        first_end_ns = samples[0][0]
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['end_offset_ms', 'latency_ms', 'thread_id', 'status'])
+            for end_ns, latency_ns, thread_id, status in samples:
+                writer.writerow([f"{(end_ns - first_end_ns) / 1e6:.3f}", f"{latency_ns / 1e6:.3f}", thread_id,
+                                 'ok' if status == STATUS_OK else 'error'])
+        return len(samples)
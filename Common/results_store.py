@@ -0,0 +1,390 @@
+"""
+벤치마크 결과 저장소 (SQLite) 및 실행 간 회귀 비교
+=================================================
+
+사용 목적:
+---------
+각 테스트 스크립트가 stdout 이나 임시 텍스트 파일에만 결과를 남기면 지난주 실행과
+오늘 실행의 QPS / 접속 지연시간을 비교할 수 없습니다. 이 모듈은 모든 하네스
+(contention, SSL, HLL, OOM, partition) 가 같은 로컬 SQLite 파일에 실행 설정, 엔진 버전,
+측정값을 기록하고, 두 실행을 비교해 통계적으로 유의한 회귀를 표시합니다.
+
+저장 구조:
+---------
+- runs: 실행 단위 (스크립트명, 라벨, 시작/종료 시각, 대상 호스트, 엔진 버전, 설정 JSON)
+- metrics: 실행별 측정값 (이름, 단위, 좋은 방향, 표본 수, 평균, 표준편차, min/max, p50/p99)
+- 설정 중 password, secret 등이 포함된 키는 저장하지 않음
+
+비교 방식:
+---------
+- 두 실행의 같은 이름 metric 에 대해 평균/표준편차/표본 수로 Welch t-test 수행
+- p < alpha 이면서 상대 변화가 threshold(%) 이상일 때만 REGRESSION / IMPROVEMENT 로 표시
+  (표본이 수백만 개면 무의미한 차이도 유의하게 나오므로 최소 변화량을 함께 적용)
+- 표본이 1개인 metric(qps 등)은 검정할 수 없으므로 변화율이 threshold 이상이면 CHANGED (no test) 로만 표시
+  (회귀 수 / compare 종료 코드에는 포함하지 않음 - 회귀 판단이 필요하면 반복 표본으로 기록)
+
+사용 예:
+-------
+    store = ResultsStore()
+    store.record_run(
+        'select1_contention_concurrent',
+        config=TEST_CONFIG,
+        metrics=[
+            metric_from_values('qps_per_worker', per_thread_qps, unit='qps', better='higher'),
+            metric_from_histogram('latency', histogram)
+        ],
+        host=MYSQL_CONFIG['host'],
+        server_version=fetch_server_version(conn)
+    )
+
+명령줄:
+------
+    python3 results_store.py list [--script NAME] [--limit N]
+    python3 results_store.py show RUN_ID
+    python3 results_store.py compare BASE_RUN_ID NEW_RUN_ID [--alpha 0.05] [--threshold 2]
+    (--db 로 파일 지정, 기본값은 환경변수 BENCH_RESULTS_DB 또는 ~/mysql_bench_results.db)
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import sqlite3
+import statistics
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.environ.get('BENCH_RESULTS_DB', os.path.expanduser('~/mysql_bench_results.db'))
+SENSITIVE_KEYWORDS = ('password', 'passwd', 'secret', 'token')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    label TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    host TEXT,
+    server_version TEXT,
+    client_host TEXT,
+    config_json TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    name TEXT NOT NULL,
+    unit TEXT,
+    better TEXT,
+    count INTEGER,
+    mean REAL,
+    stddev REAL,
+    min REAL,
+    max REAL,
+    p50 REAL,
+    p99 REAL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+METRIC_FIELDS = ['name', 'unit', 'better', 'count', 'mean', 'stddev', 'min', 'max', 'p50', 'p99']
+
+
+def metric_value(name, value, unit='', better='higher'):
+    """단일 값 metric (표본 1개 - 유의성 검정 없이 변화율만 비교)"""
+    return {'name': name, 'unit': unit, 'better': better, 'count': 1,
+            'mean': value, 'stddev': 0.0, 'min': value, 'max': value, 'p50': value, 'p99': value}
+
+
+def metric_from_values(name, values, unit='', better='lower'):
+    """표본 목록으로부터 metric 요약"""
+    values = list(values)
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        'name': name,
+        'unit': unit,
+        'better': better,
+        'count': len(values),
+        'mean': statistics.mean(values),
+        'stddev': statistics.stdev(values) if len(values) > 1 else 0.0,
+        'min': ordered[0],
+        'max': ordered[-1],
+        'p50': ordered[max(0, math.ceil(len(ordered) * 0.50) - 1)],
+        'p99': ordered[max(0, math.ceil(len(ordered) * 0.99) - 1)]
+    }
+
+
+def metric_from_histogram(name, histogram, unit='ms', scale=1e-6, better='lower'):
+    """LatencyHistogram(나노초) 으로부터 metric 요약 - 기본은 ms 로 변환"""
+    if not histogram.total_count:
+        return None
+    return {
+        'name': name,
+        'unit': unit,
+        'better': better,
+        'count': histogram.total_count,
+        'mean': histogram.mean() * scale,
+        'stddev': histogram.stdev() * scale,
+        'min': histogram.min_value * scale,
+        'max': histogram.max_value * scale,
+        'p50': histogram.percentile(50) * scale,
+        'p99': histogram.percentile(99) * scale
+    }
+
+
+def fetch_server_version(conn):
+    """엔진 버전 문자열 - Aurora 이면 Aurora 버전을 함께 기록"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT VERSION()")
+        version = cursor.fetchall()[0][0]
+        try:
+            cursor.execute("SELECT AURORA_VERSION()")
+            version = f"{version} (Aurora {cursor.fetchall()[0][0]})"
+        except Exception:
+            pass
+        return version
+    finally:
+        cursor.close()
+
+
+def _redact(config):
+    if isinstance(config, dict):
+        return {
+            key: _redact(value) for key, value in config.items()
+            if not any(word in str(key).lower() for word in SENSITIVE_KEYWORDS)
+        }
+    if isinstance(config, (list, tuple)):
+        return [_redact(value) for value in config]
+    return config
+
+
+class ResultsStore:
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_DB_PATH
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, script, config, metrics, host=None, server_version=None,
+                   label=None, started_at=None, finished_at=None):
+        """실행 1건과 metric 목록을 저장하고 run_id 반환 (None metric 은 건너뜀)"""
+        finished_at = finished_at or datetime.now()
+        with self.conn:
+            cursor = self.conn.execute(
+                """INSERT INTO runs (script, label, started_at, finished_at, host, server_version,
+                                     client_host, config_json)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    script,
+                    label,
+                    started_at.isoformat() if started_at else None,
+                    finished_at.isoformat(),
+                    host,
+                    server_version,
+                    socket.gethostname(),
+                    json.dumps(_redact(config), default=str, sort_keys=True)
+                )
+            )
+            run_id = cursor.lastrowid
+            for metric in metrics:
+                if metric is None:
+                    continue
+                self.conn.execute(
+                    f"INSERT OR REPLACE INTO metrics (run_id, {', '.join(METRIC_FIELDS)}) "
+                    f"VALUES (?, {', '.join('?' for _ in METRIC_FIELDS)})",
+                    [run_id] + [metric.get(field) for field in METRIC_FIELDS]
+                )
+        return run_id
+
+    def runs(self, script=None, limit=20):
+        sql = "SELECT * FROM runs"
+        params = []
+        if script:
+            sql += " WHERE script = ?"
+            params.append(script)
+        sql += " ORDER BY run_id DESC LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    def run(self, run_id):
+        return self.conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+
+    def metrics(self, run_id):
+        rows = self.conn.execute("SELECT * FROM metrics WHERE run_id = ? ORDER BY name", (run_id,)).fetchall()
+        return {row['name']: dict(row) for row in rows}
+
+
+def _betacf(a, b, x):
+    """정규화 불완전 베타 함수의 연분수 전개 (Lentz 방법)"""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+
+def _betainc(a, b, x):
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def welch_t_test(mean1, stddev1, n1, mean2, stddev2, n2):
+    """요약 통계로 Welch t-test - (t, 자유도, 양측 p-value), 검정 불가 시 None"""
+    if n1 < 2 or n2 < 2:
+        return None
+    var1 = (stddev1 or 0.0) ** 2 / n1
+    var2 = (stddev2 or 0.0) ** 2 / n2
+    if var1 + var2 == 0:
+        return None
+    t = (mean2 - mean1) / math.sqrt(var1 + var2)
+    df = (var1 + var2) ** 2 / (
+        (var1 ** 2 / (n1 - 1) if var1 else 0.0) + (var2 ** 2 / (n2 - 1) if var2 else 0.0)
+    )
+    p = _betainc(df / 2.0, 0.5, df / (df + t * t))
+    return t, df, p
+
+
+def compare_runs(store, base_id, new_id, alpha=0.05, threshold=2.0):
+    """두 실행의 metric 비교 결과 목록 (name, base, new, 변화율 %, p-value, 판정)"""
+    base = store.metrics(base_id)
+    new = store.metrics(new_id)
+    results = []
+    for name in sorted(set(base) & set(new)):
+        b, n = base[name], new[name]
+        change = (n['mean'] - b['mean']) / b['mean'] * 100 if b['mean'] else 0.0
+        test = welch_t_test(b['mean'], b['stddev'], b['count'], n['mean'], n['stddev'], n['count'])
+        p_value = test[2] if test else None
+        verdict = ''
+        if abs(change) >= threshold:
+            if p_value is None:
+                verdict = 'CHANGED (no test)'   # 표본 1개 - 유의성 판단 불가, 회귀로 세지 않음
+            elif p_value < alpha:
+                worse = change < 0 if n['better'] == 'higher' else change > 0
+                verdict = 'REGRESSION' if worse else 'IMPROVEMENT'
+        results.append((name, b, n, change, p_value, verdict))
+    return results
+
+
+def print_runs(store, script=None, limit=20):
+    print("Run | Script | Label | Finished | Host | Server version")
+    print("-" * 120)
+    for row in store.runs(script, limit):
+        print(f"{row['run_id']:>3} | {row['script']} | {row['label'] or ''} | {row['finished_at']} | "
+              f"{row['host'] or ''} | {row['server_version'] or ''}")
+
+
+def print_run(store, run_id):
+    run = store.run(run_id)
+    if run is None:
+        print(f"Run {run_id} not found")
+        return
+    print(f"Run {run['run_id']}: {run['script']} {run['label'] or ''}")
+    print(f"Started: {run['started_at']}, finished: {run['finished_at']}")
+    print(f"Host: {run['host']}, server version: {run['server_version']}, client: {run['client_host']}")
+    print(f"Config: {run['config_json']}")
+    print("\nMetric | Unit | Count | Mean | StdDev | Min | P50 | P99 | Max")
+    print("-" * 120)
+    for metric in store.metrics(run_id).values():
+        print(f"{metric['name']} | {metric['unit']} | {metric['count']:,} | {metric['mean']:.6f} | "
+              f"{metric['stddev']:.6f} | {metric['min']:.6f} | {metric['p50']:.6f} | "
+              f"{metric['p99']:.6f} | {metric['max']:.6f}")
+
+
+def print_comparison(store, base_id, new_id, alpha=0.05, threshold=2.0):
+    base_run, new_run = store.run(base_id), store.run(new_id)
+    if base_run is None or new_run is None:
+        print(f"Run {base_id if base_run is None else new_id} not found")
+        return
+    if base_run['script'] != new_run['script']:
+        print(f"Warning: comparing different scripts ({base_run['script']} vs {new_run['script']})")
+    if base_run['config_json'] != new_run['config_json']:
+        print("Warning: run configurations differ")
+        base_connector = json.loads(base_run['config_json'] or '{}').get('connector')
+        new_connector = json.loads(new_run['config_json'] or '{}').get('connector')
+        if base_connector != new_connector:
+            print(f"Warning: different connectors ({base_connector} vs {new_connector}) - "
+                  f"connect latency and client CPU are not comparable")
+    print(f"Base run {base_id}: {base_run['finished_at']} {base_run['server_version'] or ''}")
+    print(f"New run  {new_id}: {new_run['finished_at']} {new_run['server_version'] or ''}")
+    print(f"Welch t-test, alpha {alpha}, minimum change {threshold}%\n")
+    print("Metric | Unit | Base mean | New mean | Change | p-value | Verdict")
+    print("-" * 120)
+    regressions = untested = 0
+    for name, b, n, change, p_value, verdict in compare_runs(store, base_id, new_id, alpha, threshold):
+        p_text = f"{p_value:.4g}" if p_value is not None else 'n/a'
+        print(f"{name} | {n['unit']} | {b['mean']:.6f} | {n['mean']:.6f} | {change:+.2f}% | {p_text} | {verdict}")
+        if verdict == 'REGRESSION':
+            regressions += 1
+        elif verdict.startswith('CHANGED'):
+            untested += 1
+    print(f"\n{regressions} regression(s) flagged")
+    if untested:
+        print(f"{untested} single-sample metric(s) changed beyond {threshold}% without a significance test")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark results store")
+    parser.add_argument('--db', default=None, help=f"SQLite file (default: {DEFAULT_DB_PATH})")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = sub.add_parser('list', help="list recorded runs")
+    list_parser.add_argument('--script')
+    list_parser.add_argument('--limit', type=int, default=20)
+
+    show_parser = sub.add_parser('show', help="show metrics of a run")
+    show_parser.add_argument('run_id', type=int)
+
+    compare_parser = sub.add_parser('compare', help="compare two runs")
+    compare_parser.add_argument('base_run_id', type=int)
+    compare_parser.add_argument('new_run_id', type=int)
+    compare_parser.add_argument('--alpha', type=float, default=0.05)
+    compare_parser.add_argument('--threshold', type=float, default=2.0, help="minimum relative change (%%)")
+
+    args = parser.parse_args()
+    store = ResultsStore(args.db)
+    try:
+        if args.command == 'list':
+            print_runs(store, args.script, args.limit)
+        elif args.command == 'show':
+            print_run(store, args.run_id)
+        else:
+            regressions = print_comparison(store, args.base_run_id, args.new_run_id, args.alpha, args.threshold)
+            if regressions:
+                raise SystemExit(1)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
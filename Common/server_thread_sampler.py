@@ -0,0 +1,308 @@
+"""
+서버 커넥션 쓰레드 / idle 세션 정리 비용 샘플러
+===============================================
+
+사용 목적:
+---------
+풀에서 만든 수천 개 커넥션이 같은 시각에 wait_timeout 으로 만료되면(정각 CPU spike)
+서버는 짧은 시간에 그만큼의 세션을 정리합니다. 이 샘플러는 별도 커넥션 1개로
+interval(기본 1초)마다 서버 쓰레드 상태를 읽어 만료 전후의 곡선을 남깁니다.
+wait_timeout 테스트 스크립트와 함께(같은 프로세스 또는 다른 터미널에서) 실행합니다.
+
+샘플 값:
+-------
+- SHOW GLOBAL STATUS: Threads_connected / Threads_cached / Threads_running (현재 값)
+  Threads_created / Connections / Aborted_clients (누적 -> 구간 초당 값)
+  * wait_timeout 으로 끊긴 세션은 Aborted_clients 로 집계됨
+- processlist 크기: performance_schema.threads 의 FOREGROUND 쓰레드 수와 그중 Sleep 수
+  (performance_schema 가 꺼져 있으면 information_schema.processlist)
+- 서버 CPU (SQL 로 얻을 수 있는 값):
+  * statement_cpu_pct: events_statements_summary_global_by_event_name.SUM_CPU_TIME 구간 증가량
+    / 구간 길이 * 100 (코어 1개 = 100%, MySQL 8.0.28 이상 - 없으면 기록하지 않음)
+  * teardown_wait_ms: 세션 생성 / 정리 시 잡는 mutex 와 클라이언트 소켓 wait 시간 구간 증가량(ms/s)
+    (TEARDOWN_WAITS, setup_instruments 에서 해당 instrument 가 켜져 있어야 값이 나옴)
+  * RDS / Aurora 호스트 CPU 는 SQL 로 얻을 수 없으므로 Enhanced Monitoring(1초) 과 시각으로 맞춰 봄
+
+사용 예:
+-------
+    sampler = ServerThreadSampler(lambda: mysql.connector.connect(**MYSQL_CONFIG), interval=1,
+                                  csv_path='server_threads.csv')
+    sampler.start()
+    ... 커넥션 만료 대기 ...
+    sampler.stop()
+    for line in sampler.format_summary():
+        print(line)
+
+    # 단독 실행 (다른 테스트와 병렬로)
+    python3 server_thread_sampler.py --host HOST --user USER --password PW --seconds 600 --csv out.csv
+
+참고:
+----
+- 샘플러 커넥션은 interval 마다 쿼리하므로 wait_timeout 으로 끊기지 않음
+- 구간 값은 직전 샘플과의 차이 / 실제 경과 시간 (샘플 쿼리가 늦어져도 초당 값 유지)
+"""
+
+import argparse
+import csv
+import threading
+import time
+from datetime import datetime
+
+STATUS_GAUGES = ['Threads_connected', 'Threads_cached', 'Threads_running']
+STATUS_COUNTERS = ['Threads_created', 'Connections', 'Aborted_clients']
+TEARDOWN_WAITS = [
+    'wait/synch/mutex/sql/LOCK_thd_list',
+    'wait/synch/mutex/sql/LOCK_thread_cache',
+    'wait/synch/mutex/sql/LOCK_connection_count',
+    'wait/synch/mutex/sql/THD::LOCK_thd_data',
+    'wait/io/socket/sql/client_connection'
+]
+PICO_TO_MS = 1e-9
+CSV_FIELDS = (['timestamp', 'elapsed_s'] + STATUS_GAUGES + ['processlist', 'sleeping']
+              + [f"{name}_per_sec" for name in STATUS_COUNTERS] + ['statement_cpu_pct', 'teardown_wait_ms'])
+
+
+class ServerThreadSampler:
+    def __init__(self, connect, interval=1, csv_path=None, verbose=False):
+        self.connect = connect
+        self.interval = interval
+        self.csv_path = csv_path
+        self.verbose = verbose
+        self.snapshots = []
+        self.rows = []
+        self.statement_cpu_available = True
+        self._conn = None
+        self._csv_file = None
+        self._csv_writer = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def open(self):
+        self._conn = self.connect()
+        if self.csv_path:
+            self._csv_file = open(self.csv_path, 'w', newline='')
+            self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=CSV_FIELDS)
+            self._csv_writer.writeheader()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+
+    def _processlist(self, cursor):
+        """(전체 foreground 쓰레드 수, Sleep 수)"""
+        try:
+            cursor.execute("""
+                SELECT COUNT(*), SUM(PROCESSLIST_COMMAND = 'Sleep')
+                FROM performance_schema.threads
+                WHERE TYPE = 'FOREGROUND'
+            """)
+        except Exception:
+            cursor.execute("SELECT COUNT(*), SUM(COMMAND = 'Sleep') FROM information_schema.processlist")
+        total, sleeping = cursor.fetchone()
+        return int(total or 0), int(sleeping or 0)
+
+    def _statement_cpu(self, cursor):
+        """누적 statement CPU 시간(피코초) - SUM_CPU_TIME 컬럼이 없으면 None"""
+        if not self.statement_cpu_available:
+            return None
+        try:
+            cursor.execute("SELECT SUM(SUM_CPU_TIME) FROM performance_schema.events_statements_summary_global_by_event_name")
+            value = cursor.fetchone()[0]
+            return int(value or 0)
+        except Exception:
+            self.statement_cpu_available = False
+            return None
+
+    def _teardown_wait(self, cursor):
+        """TEARDOWN_WAITS 의 누적 wait 시간(피코초) 합"""
+        placeholders = ', '.join(['%s'] * len(TEARDOWN_WAITS))
+        try:
+            cursor.execute(f"""
+                SELECT SUM(SUM_TIMER_WAIT)
+                FROM performance_schema.events_waits_summary_global_by_event_name
+                WHERE EVENT_NAME IN ({placeholders})
+            """, TEARDOWN_WAITS)
+            value = cursor.fetchone()[0]
+            return int(value or 0)
+        except Exception:
+            return None
+
+    def snapshot(self):
+        """상태 변수, processlist 크기, 누적 CPU / wait 값을 읽어 스냅샷으로 저장하고 반환"""
+        cursor = self._conn.cursor()
+        try:
+            names = STATUS_GAUGES + STATUS_COUNTERS
+            placeholders = ', '.join(['%s'] * len(names))
+            cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})", names)
+            status = {name: int(value) for name, value in cursor.fetchall()}
+            processlist, sleeping = self._processlist(cursor)
+            statement_cpu = self._statement_cpu(cursor)
+            teardown_wait = self._teardown_wait(cursor)
+        finally:
+            cursor.close()
+        snapshot = {
+            'time': time.time(),
+            'status': status,
+            'processlist': processlist,
+            'sleeping': sleeping,
+            'statement_cpu': statement_cpu,
+            'teardown_wait': teardown_wait
+        }
+        self.snapshots.append(snapshot)
+        return snapshot
+
+    def interval_row(self, previous, current):
+        """두 스냅샷 사이 구간의 곡선 한 점 (현재 값 + 누적 값의 초당 증가량)"""
+        seconds = current['time'] - previous['time'] or 1
+        row = {
+            'timestamp': datetime.fromtimestamp(current['time']).isoformat(),
+            'elapsed_s': round(current['time'] - self.snapshots[0]['time'], 3),
+            'processlist': current['processlist'],
+            'sleeping': current['sleeping']
+        }
+        for name in STATUS_GAUGES:
+            row[name] = current['status'].get(name)
+        for name in STATUS_COUNTERS:
+            if name in current['status'] and name in previous['status']:
+                row[f"{name}_per_sec"] = round(max(0, current['status'][name] - previous['status'][name]) / seconds, 2)
+            else:
+                row[f"{name}_per_sec"] = None
+        if current['statement_cpu'] is not None and previous['statement_cpu'] is not None:
+            cpu = max(0, current['statement_cpu'] - previous['statement_cpu'])
+            row['statement_cpu_pct'] = round(cpu * PICO_TO_MS / 1000 / seconds * 100, 2)
+        else:
+            row['statement_cpu_pct'] = None
+        if current['teardown_wait'] is not None and previous['teardown_wait'] is not None:
+            wait = max(0, current['teardown_wait'] - previous['teardown_wait'])
+            row['teardown_wait_ms'] = round(wait * PICO_TO_MS / seconds, 3)
+        else:
+            row['teardown_wait_ms'] = None
+        return row
+
+    def print_row(self, row):
+        cpu = f"{row['statement_cpu_pct']:.1f}%" if row['statement_cpu_pct'] is not None else '-'
+        wait = f"{row['teardown_wait_ms']:.3f}ms/s" if row['teardown_wait_ms'] is not None else '-'
+        print(f"[server threads] {row['elapsed_s']:>8.1f}s | connected {row['Threads_connected']} "
+              f"| cached {row['Threads_cached']} | running {row['Threads_running']} "
+              f"| processlist {row['processlist']} (sleep {row['sleeping']}) "
+              f"| aborted/s {row['Aborted_clients_per_sec']} | created/s {row['Threads_created_per_sec']} "
+              f"| stmt CPU {cpu} | teardown wait {wait}")
+
+    def sample(self):
+        """스냅샷 1회 - 직전 스냅샷이 있으면 구간 값을 rows / CSV 에 추가"""
+        current = self.snapshot()
+        if len(self.snapshots) < 2:
+            return None
+        row = self.interval_row(self.snapshots[-2], current)
+        self.rows.append(row)
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(row)
+            self._csv_file.flush()
+        if self.verbose:
+            self.print_row(row)
+        return row
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"Server thread sampling failed: {e}")
+
+    def start(self):
+        """기준 스냅샷을 찍고 주기적 샘플링 스레드 시작"""
+        self.open()
+        self.snapshot()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """샘플링을 멈추고 마지막 구간을 기록한 뒤 커넥션 / CSV 종료"""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        try:
+            self.sample()
+        except Exception as e:
+            print(f"Server thread sampling failed: {e}")
+        finally:
+            self.close()
+
+    def format_summary(self):
+        """출력용 요약 - 시작 / 최대 / 종료 값과 초당 끊김(Aborted_clients) 최대 구간의 서버 비용"""
+        lines = ["\nServer threads (sampled every "
+                 f"{self.interval}s, {len(self.rows)} intervals):"]
+        if not self.rows:
+            lines.append("No samples")
+            return lines
+        first, last = self.snapshots[0], self.snapshots[-1]
+        for name in STATUS_GAUGES:
+            if name in first['status']:
+                peak = max(row[name] for row in self.rows if row[name] is not None)
+                lines.append(f"{name}: start {first['status'][name]}, peak {peak}, end {last['status'].get(name)}")
+        lines.append(f"Processlist: start {first['processlist']} (sleep {first['sleeping']}), "
+                     f"peak {max(row['processlist'] for row in self.rows)}, "
+                     f"end {last['processlist']} (sleep {last['sleeping']})")
+        for name in STATUS_COUNTERS:
+            if name in first['status'] and name in last['status']:
+                lines.append(f"{name} increase: {last['status'][name] - first['status'][name]:,}")
+        spike = max(self.rows, key=lambda row: row['Aborted_clients_per_sec'] or 0)
+        if spike['Aborted_clients_per_sec']:
+            lines.append(f"Peak disconnects: {spike['Aborted_clients_per_sec']:.1f} aborted clients/sec "
+                         f"at {spike['timestamp']} (+{spike['elapsed_s']:.1f}s)")
+            cost = []
+            if spike['statement_cpu_pct'] is not None:
+                cost.append(f"statement CPU {spike['statement_cpu_pct']:.1f}%")
+            if spike['teardown_wait_ms'] is not None:
+                cost.append(f"teardown wait {spike['teardown_wait_ms']:.3f}ms/s")
+            cost.append(f"threads running {spike['Threads_running']}")
+            lines.append("At peak: " + ', '.join(cost))
+        cpu_rows = [row['statement_cpu_pct'] for row in self.rows if row['statement_cpu_pct'] is not None]
+        if cpu_rows:
+            lines.append(f"Statement CPU (100% = one core): avg {sum(cpu_rows) / len(cpu_rows):.1f}%, "
+                         f"peak {max(cpu_rows):.1f}%")
+        else:
+            lines.append("Statement CPU: not available (performance_schema SUM_CPU_TIME needs MySQL 8.0.28+)")
+        wait_rows = [row['teardown_wait_ms'] for row in self.rows if row['teardown_wait_ms'] is not None]
+        if wait_rows and max(wait_rows) > 0:
+            lines.append(f"Teardown mutex / socket wait: avg {sum(wait_rows) / len(wait_rows):.3f}ms/s, "
+                         f"peak {max(wait_rows):.3f}ms/s")
+        return lines
+
+
+def main():
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description="Sample server thread state while idle connections expire")
+    parser.add_argument('--host', required=True)
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', required=True)
+    parser.add_argument('--password', default='')
+    parser.add_argument('--interval', type=float, default=1)
+    parser.add_argument('--seconds', type=float, default=600, help="how long to sample")
+    parser.add_argument('--csv', default=None, help="write one row per interval to this CSV file")
+    args = parser.parse_args()
+
+    sampler = ServerThreadSampler(
+        lambda: mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password),
+        interval=args.interval, csv_path=args.csv, verbose=True
+    )
+    sampler.start()
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.stop()
+    for line in sampler.format_summary():
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
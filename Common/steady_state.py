@@ -0,0 +1,134 @@
+"""
+Warm-up 구간 제외와 steady-state 감지
+=====================================
+
+사용 목적:
+---------
+첫 반복에는 DNS 조회, 비어 있는 TLS / 서버 캐시, 커넥터 import 비용이 포함되어
+최대값과 표준편차를 부풀립니다. 이 필터는 워커마다 샘플을 순서대로 받아
+1) 설정한 warm-up(횟수 또는 시간) 동안의 샘플을 버리고
+2) 슬라이딩 윈도우의 변동계수(CV = 표준편차 / 평균)가 기준 이하로 내려간 시점부터
+   steady-state 로 보고 그 이후 샘플만 통계에 반영합니다.
+
+동작:
+----
+- 최근 window 개 샘플만 보관 (메모리 고정) - steady-state 가 감지되면 윈도우 안의 샘플도 함께 반영
+- max_transient_windows * window 개를 버려도 steady-state 에 도달하지 못하면
+  그 시점부터 강제로 반영 (forced) 하여 측정 샘플이 모두 버려지지 않도록 함
+- window 가 0 또는 None 이면 warm-up 만 적용
+
+사용 예:
+-------
+    steady = SteadyStateFilter(warmup_iterations=10, window=50, cv_threshold=0.3)
+    for ...:
+        latency = ...
+        for value in steady.add(latency):
+            histogram.record(value)
+    summary = steady.summary()
+
+    # 여러 워커 요약 합산 후 출력
+    print(format_steady_state(merge_steady_state([summary, ...])))
+"""
+
+import time
+from collections import deque
+
+
+class SteadyStateFilter:
+    def __init__(self, warmup_iterations=0, warmup_seconds=0, window=50, cv_threshold=0.3,
+                 max_transient_windows=10):
+        self.warmup_iterations = warmup_iterations or 0
+        self.warmup_seconds = warmup_seconds or 0
+        self.window = window or 0
+        self.cv_threshold = cv_threshold
+        self.max_transient = self.window * max_transient_windows
+        self.started = time.perf_counter()
+        self.seen = 0
+        self.warmup_discarded = 0
+        self.transient_discarded = 0
+        self.kept = 0
+        self.steady = False
+        self.forced = False
+        self._values = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def in_warmup(self):
+        return (self.seen < self.warmup_iterations
+                or time.perf_counter() - self.started < self.warmup_seconds)
+
+    def _window_cv(self):
+        n = len(self._values)
+        mean = self._sum / n
+        if mean <= 0:
+            return 0.0
+        variance = max(0.0, (self._sum_sq - self._sum * mean) / (n - 1)) if n > 1 else 0.0
+        return variance ** 0.5 / mean
+
+    def add(self, value, item=None):
+        """샘플 1개 추가 - 통계에 반영할 항목 목록 반환 (item 을 주지 않으면 value 자체)"""
+        item = value if item is None else item
+        if self.in_warmup():
+            self.seen += 1
+            self.warmup_discarded += 1
+            return []
+        self.seen += 1
+        if self.steady or not self.window:
+            self.steady = True
+            self.kept += 1
+            return [item]
+
+        self._values.append((value, item))
+        self._sum += value
+        self._sum_sq += value * value
+        if len(self._values) > self.window:
+            old, _ = self._values.popleft()
+            self._sum -= old
+            self._sum_sq -= old * old
+            self.transient_discarded += 1
+        if len(self._values) < self.window:
+            return []
+
+        if self._window_cv() <= self.cv_threshold or self.transient_discarded >= self.max_transient:
+            self.steady = True
+            self.forced = self.transient_discarded >= self.max_transient and self._window_cv() > self.cv_threshold
+            items = [entry[1] for entry in self._values]
+            self.kept += len(items)
+            self._values.clear()
+            return items
+        return []
+
+    def finish(self):
+        """끝까지 윈도우가 채워지지 않았거나 steady-state 에 도달하지 못한 경우 남은 샘플은 버린 것으로 집계"""
+        self.transient_discarded += len(self._values)
+        self._values.clear()
+
+    def summary(self):
+        self.finish()
+        return {
+            'workers': 1,
+            'steady': 1 if self.steady and not self.forced else 0,
+            'forced': 1 if self.forced else 0,
+            'samples': self.seen,
+            'warmup_discarded': self.warmup_discarded,
+            'transient_discarded': self.transient_discarded,
+            'kept': self.kept
+        }
+
+
+def merge_steady_state(summaries):
+    """워커별 summary 합산 (None 은 건너뜀)"""
+    total = {'workers': 0, 'steady': 0, 'forced': 0, 'samples': 0,
+             'warmup_discarded': 0, 'transient_discarded': 0, 'kept': 0}
+    for summary in summaries:
+        if summary is None:
+            continue
+        for key in total:
+            total[key] += summary[key]
+    return total
+
+
+def format_steady_state(summary):
+    return (f"Steady-state samples: {summary['kept']:,} of {summary['samples']:,} "
+            f"(warm-up discarded {summary['warmup_discarded']:,}, transient discarded {summary['transient_discarded']:,}; "
+            f"workers steady {summary['steady']}/{summary['workers']}, forced {summary['forced']})")
@@ -0,0 +1,134 @@
+"""
+구간별 처리량 타임라인 (lock-free ring buffer)
+==============================================
+
+사용 목적:
+---------
+테스트 종료 후 한 번 계산하는 평균 QPS 대신, 일정 간격(기본 1초)마다의 처리량을
+테스트 도중 CSV 또는 JSON lines 파일로 기록하여 Aurora 이벤트(failover, stall 등)와
+클라이언트 QPS 변화를 시간축으로 맞춰 볼 수 있도록 합니다.
+
+구조:
+----
+- 워커마다 capacity 개 구간 슬롯을 가진 카운터 행을 미리 할당 (공유 메모리 RawArray)
+- 워커는 자신의 행에만 쓰기 (single writer) 하므로 lock 이 필요 없음
+- writer 스레드는 끝난 구간의 슬롯을 모든 워커 행에서 합산해 기록한 뒤 0 으로 비워 재사용
+- RawArray 를 사용하므로 process 엔진에서도 자식 프로세스 생성 시 전달하여 그대로 공유 가능
+
+출력 컬럼:
+---------
+- timestamp: 구간 시작 시각 (로컬 시간, ISO 형식)
+- elapsed_s: 테스트 시작 후 경과 시간(초)
+- queries: 구간 내 완료된 쿼리 수
+- qps: 구간 QPS
+- avg_latency_ms: 구간 내 완료된 요청의 평균 지연시간
+- active_workers: 구간 내 한 건 이상 완료한 워커 수
+"""
+
+import csv
+import json
+import multiprocessing
+import threading
+import time
+from datetime import datetime
+
+
+class ThroughputTimeline:
+    def __init__(self, num_workers, interval=1.0, capacity=120, ctx=None):
+        ctx = ctx or multiprocessing
+        self.num_workers = num_workers
+        self.interval_ns = int(interval * 1e9)
+        self.capacity = capacity
+        # 워커 행 x 구간 슬롯 x (완료 수, 지연시간 합)
+        self.counters = ctx.RawArray('Q', num_workers * capacity * 2)
+        self.origin = ctx.RawValue('q', 0)
+        self.origin_wall = None
+        self._writer = None
+        self._stop_event = None
+
+    def start(self, origin_ns):
+        """테스트 시작 기준 시각(perf_counter_ns) 설정 - 워커 시작 신호 전에 호출"""
+        self.origin.value = origin_ns
+        self.origin_wall = time.time() - (time.perf_counter_ns() - origin_ns) / 1e9
+
+    def record(self, worker_index, end_ns, latency_ns, count=1):
+        """워커가 요청 완료 시 호출 - 자신의 행에만 기록"""
+        slot = ((end_ns - self.origin.value) // self.interval_ns) % self.capacity
+        base = (worker_index * self.capacity + slot) * 2
+        self.counters[base] += count
+        self.counters[base + 1] += latency_ns
+
+    def _collect(self, interval_index):
+        """구간 interval_index 를 모든 워커 행에서 합산하고 슬롯을 비움"""
+        slot = interval_index % self.capacity
+        queries = 0
+        latency_sum = 0
+        active_workers = 0
+        counters = self.counters
+        for worker_index in range(self.num_workers):
+            base = (worker_index * self.capacity + slot) * 2
+            count = counters[base]
+            if count:
+                queries += count
+                latency_sum += counters[base + 1]
+                active_workers += 1
+                counters[base] = 0
+                counters[base + 1] = 0
+        interval_s = self.interval_ns / 1e9
+        return {
+            'timestamp': datetime.fromtimestamp(self.origin_wall + interval_index * interval_s).isoformat(),
+            'elapsed_s': round(interval_index * interval_s, 3),
+            'queries': queries,
+            'qps': round(queries / interval_s, 2),
+            'avg_latency_ms': round(latency_sum / queries / 1e6, 6) if queries else 0,
+            'active_workers': active_workers
+        }
+
+    def start_writer(self, path, output_format='csv'):
+        """끝난 구간을 주기적으로 파일에 기록하는 writer 스레드 시작"""
+        self._stop_event = threading.Event()
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            args=(path, output_format),
+            daemon=True
+        )
+        self._writer.start()
+
+    def stop_writer(self):
+        """writer 스레드를 멈추고 마지막 구간까지 기록"""
+        if self._writer is None:
+            return
+        self._stop_event.set()
+        self._writer.join()
+        self._writer = None
+
+    def _write_loop(self, path, output_format):
+        fields = ['timestamp', 'elapsed_s', 'queries', 'qps', 'avg_latency_ms', 'active_workers']
+        with open(path, 'w', newline='') as f:
+            writer = None
+            if output_format == 'csv':
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+
+            next_interval = 0
+            while True:
+                stopping = self._stop_event.is_set()
+                elapsed_ns = time.perf_counter_ns() - self.origin.value
+                # 늦게 끝난 기록을 위해 구간 종료 후 반 구간의 여유를 둠
+                if stopping:
+                    completed = elapsed_ns // self.interval_ns + 1
+                else:
+                    completed = (elapsed_ns - self.interval_ns // 2) // self.interval_ns
+
+                while next_interval < completed:
+                    row = self._collect(next_interval)
+                    if writer is not None:
+                        writer.writerow(row)
+                    else:
+                        f.write(json.dumps(row) + '\n')
+                    next_interval += 1
+                f.flush()
+
+                if stopping:
+                    break
+                self._stop_event.wait(self.interval_ns / 1e9 / 4)
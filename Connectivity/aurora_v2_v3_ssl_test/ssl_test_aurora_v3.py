@@ -1,8 +1,29 @@
+import asyncio
 import mysql.connector
+import os
+import ssl
+import statistics
+import sys
 import time
+from collections import deque
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
-import statistics
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from client_cpu import ClientCpuSampler, add_usage, thread_snapshot, usage_delta
+from connection_pool import BoundedConnectionPool
+from dns_resolver import CachingResolver
+from latency_histogram import LatencyHistogram
+from open_files_limit import raise_open_files_limit
+from connection_phases import PHASES, PhaseTimedConnection, TLSSessionCache, phase_histogram_percentiles, time_first_query
+from result_buffer import STATUS_ERROR, STATUS_OK, ResultBuffer
+from results_store import ResultsStore, fetch_server_version, metric_from_histogram, metric_value
+from steady_state import SteadyStateFilter, format_steady_state, merge_steady_state
+
+try:
+    import aiomysql   # engine = 'asyncio' 에서만 사용
+except ImportError:
+    aiomysql = None
 
 # MySQL 8.0 설정
 MYSQL_CONFIG = {
@@ -12,7 +33,7 @@ MYSQL_CONFIG = {
     'database': 'test',
     'version': '8.0',
     'ssl_ca': '~/ap-northeast-2-bundle.pem',
-    'tls_versions': ['TLSv1.3'] 
+    'tls_versions': ['TLSv1.3']     # 여러 개 지정 시 버전별로 순서대로 테스트 (예: ['TLSv1.2', 'TLSv1.3'])
 }
 
 # 테스트 설정
@@ -20,22 +41,95 @@ TEST_CONFIG = {
     'num_threads': 1,        # 동시 실행할 쓰레드 수
     'iterations': 100,        # 각 쓰레드당 반복 횟수
     'query': 'SELECT 1',      # 실행할 쿼리
-    'sleep_time': 0.1        # 반복 사이의 대기 시간(초)
+    'sleep_time': 0.1,        # 반복 사이의 대기 시간(초)
+    'warmup_iterations': 1,   # 쓰레드별 warm-up 접속 횟수 (DNS 조회, 첫 TLS handshake 등 - 통계 제외)
+    'warmup_seconds': 0,      # 쓰레드별 warm-up 시간(초)
+    'steady_window': 10,      # steady-state 감지 윈도우(접속 수), 0 이면 warm-up 만 적용
+    'steady_cv': 0.5,         # 윈도우 변동계수가 이 값 이하가 되면 steady-state 로 판단
+    'engine': 'thread',       # 'thread': 쓰레드당 커넥션, 'asyncio': 단일 이벤트 루프에서 aiomysql 로 구동
+    'phase_timing': False,    # thread 엔진: TCP / TLS handshake / 인증 / 첫 쿼리 단계별 시간 측정
+                              # (pure python 연결 사용 - 접속 시간 / CPU 가 기본 C extension 연결과 달라 같은 connector 끼리만 비교)
+    'cpu_sample_interval': 1,     # 클라이언트 CPU 사용률 샘플링 간격(초)
+    'tls_session_reuse': False,   # True: SSLContext 하나를 공유하고 반복마다 full handshake / resumption 을 번갈아 실행 (full vs resumed 비교)
+    'connection_mode': 'connect', # 'connect': 반복마다 접속/종료, 'pool': 커넥션 풀에서 빌려 쓰기, 'both': 두 방식 비교 (pool 은 thread 엔진만)
+    'mode_rounds': 3,             # both: 두 방식을 회차마다 순서를 바꿔 번갈아 실행 (회차마다 iterations 회, sleep_time 은 0 으로 실행)
+    'pool_size': 10,              # pool 모드: 최대 커넥션 수 (num_threads 보다 작으면 checkout 대기 발생)
+    'pool_checkout_timeout': 5,   # pool 모드: 커넥션을 기다리는 최대 시간(초)
+    'pool_reset_session': True,   # pool 모드: 반납 시 세션 초기화 (COM_RESET_CONNECTION)
+    'dns_mode': 'system',         # 'system': 접속마다 이름 해석, 'cache': dns_cache_ttl 초 동안 재사용, 'pin': 수집한 IP 에 고정 (순환)
+    'dns_cache_ttl': 5,           # cache 모드: 해석 결과 재사용 시간(초) - Aurora 엔드포인트 DNS TTL 과 같음
+    'dns_pin_samples': 10,        # pin 모드: IP 수집을 위해 처음에 해석하는 횟수 (reader 엔드포인트는 조회마다 IP 가 바뀜)
+    'recent_samples': 1000,       # 원시 샘플(종료 시각, 지연시간, 쓰레드, 상태)은 최근 N 건만 보관 (종료 시 CSV 저장) - 나머지는 히스토그램으로 집계
+    'failure_details': 100,       # 오류 메시지는 최근 N 건만 보관
+    'record_results': True,   # 결과를 Common/results_store.py 저장소(SQLite)에 기록
+    'results_label': None     # 실행 구분용 라벨 (예: 'before-upgrade')
 }
 
+TLS_VERSION_MAP = {
+    'TLSv1.2': ssl.TLSVersion.TLSv1_2,
+    'TLSv1.3': ssl.TLSVersion.TLSv1_3
+}
+
+def latency_summary_ms(histogram):
+    """히스토그램(ns) 의 avg / P50 / P99 / max 를 ms 로 표시"""
+    return (f"avg {histogram.mean() / 1e6:.3f}, P50 {histogram.percentile(50) / 1e6:.3f}, "
+            f"P99 {histogram.percentile(99) / 1e6:.3f}, max {histogram.max_value / 1e6:.3f}")
+
 class ConnectionTester:
     def __init__(self, db_config):
         self.db_config = db_config
-        self.results = []
-        self.connection_stats = {
+        # 모든 워커가 공유하는 고정 메모리 결과 버퍼 (실행 시간과 관계없이 메모리 일정)
+        self.buffer = ResultBuffer(TEST_CONFIG['recent_samples'])
+        self.connection_stats = self.new_stats()
+        self.actual_tls_version = None
+        self.server_version = None
+        self.test_start = None
+        self.tls_version = db_config.get('tls_versions', ['TLSv1.2'])[0]
+        self.tls_session_cache = None
+        self.phase_summaries = {}
+        self.cpu_sampler = None
+        self.steady_summary = None
+        self.worker_cpu = None
+        self.connection_mode = 'connect'
+        self.mode_round = 1
+        self.pool = None
+        self.pool_stats = None
+        self.mode_summaries = []
+        self.resolver = None
+
+    def new_stats(self):
+        return {
             'total_attempts': 0,
             'successful': 0,
             'failed': 0,
-            'failures': []
+            'failures': deque(maxlen=TEST_CONFIG['failure_details'])
         }
-        self.actual_tls_version = None
-        # 초기화 시점에 TLS 버전 확인
-        self.check_tls_version()
+
+    def absorb(self, result):
+        """steady-state 샘플 1건을 결과 버퍼에 반영 - 원시 값은 최근 일부만 남고 나머지는 히스토그램 / 카운터로 집계"""
+        values = {'total_time': result['total_time']}
+        for key in ('dns_time', 'checkout_wait', 'pool_create'):
+            if key in result:
+                values[key] = result[key]
+        for phase, value in result.get('phases', {}).items():
+            values[f"phase.{phase}"] = value
+        if 'resumption' in result:
+            kind, connect_time, connect_cpu = result['resumption']
+            values[f"resumption.{kind}.connect_time"] = connect_time
+            values[f"resumption.{kind}.cpu_time"] = connect_cpu
+        counters = [f"auth_path.{result['auth_path']}"] if 'auth_path' in result else None
+        self.buffer.add(result['thread_id'], result['total_time'] * 1e9, STATUS_OK, result['end_ns'],
+                        values=values, counters=counters)
+
+    def record_failure(self, local_stats, thread_id, iteration, elapsed, error):
+        local_stats['failed'] += 1
+        local_stats['failures'].append({
+            'thread_id': thread_id,
+            'iteration': iteration,
+            'error': str(error),
+            'timestamp': datetime.now().isoformat()
+        })
+        self.buffer.add(thread_id, elapsed * 1e9, STATUS_ERROR)
 
     def check_tls_version(self):
         """초기 TLS 버전 확인"""
@@ -46,7 +140,7 @@ class ConnectionTester:
                 password=self.db_config['password'],
                 database=self.db_config['database'],
                 ssl_ca=self.db_config['ssl_ca'],
-                tls_versions=[self.db_config.get('tls_versions', ['TLSv1.2'])[0]]
+                tls_versions=[self.tls_version]
             )
             cursor = conn.cursor()
             cursor.execute("SHOW SESSION STATUS LIKE 'Ssl_version'")
@@ -54,148 +148,585 @@ class ConnectionTester:
             self.actual_tls_version = ssl_version[1]
             print(f"Connected using TLS version: {self.actual_tls_version}")
             cursor.close()
+            self.server_version = fetch_server_version(conn)
             conn.close()
         except Exception as e:
             print(f"Error checking TLS version: {e}")
             self.actual_tls_version = "Unknown"
 
-    def create_connection(self):
-        """SSL을 사용하는 기본 연결 생성"""
-        return mysql.connector.connect(
-            host=self.db_config['host'],
+    def resolve_host(self):
+        """접속할 IP 와 이름 해석 시간(초) - dns_mode 에 따라 매번 해석 / 캐시 / 고정 IP"""
+        return self.resolver.resolve(self.db_config['host'], self.db_config.get('port', 3306))
+
+    def create_connection(self, host=None, resume_session=True):
+        """SSL을 사용하는 기본 연결 생성 - phase_timing 이면 단계별 시간을 기록하는 pure python 연결"""
+        if host is None:
+            host, _ = self.resolve_host()
+        options = dict(
+            host=host,
             user=self.db_config['user'],
             password=self.db_config['password'],
             database=self.db_config['database'],
             ssl_ca=self.db_config['ssl_ca'],
-            tls_versions=[self.db_config.get('tls_versions', ['TLSv1.2'])[0]]
+            tls_versions=[self.tls_version]
+        )
+        if TEST_CONFIG['phase_timing'] or self.tls_session_cache is not None:
+            return PhaseTimedConnection(tls_session_cache=self.tls_session_cache,
+                                        resume_session=resume_session, **options)
+        return mysql.connector.connect(**options)
+
+    def connector_name(self):
+        """접속에 사용하는 드라이버 - 출력과 결과 저장소에 기록하여 같은 connector 실행끼리만 비교"""
+        if TEST_CONFIG['engine'] == 'asyncio':
+            return 'aiomysql'
+        if TEST_CONFIG['phase_timing'] or self.tls_session_cache is not None:
+            return 'mysql.connector pure python (PhaseTimedConnection)'
+        return 'mysql.connector C extension' if mysql.connector.HAVE_CEXT else 'mysql.connector pure python'
+
+    def create_ssl_context(self):
+        """asyncio 엔진 / tls_session_reuse 용 SSLContext - mysql.connector 와 같이 CA 만 로드하고 인증서 검증은 하지 않음"""
+        tls_version = TLS_VERSION_MAP[self.tls_version]
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        context.load_verify_locations(os.path.expanduser(self.db_config['ssl_ca']))
+        context.minimum_version = tls_version
+        context.maximum_version = tls_version
+        return context
+
+    async def async_create_connection(self, host):
+        """SSL을 사용하는 aiomysql 연결 생성"""
+        return await aiomysql.connect(
+            host=host,
+            port=self.db_config.get('port', 3306),
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            db=self.db_config['database'],
+            ssl=self.tls_session_cache.context if self.tls_session_cache else self.create_ssl_context()
         )
 
     def connection_worker(self, thread_id, iterations, query):
-        local_results = []
-        local_stats = {
-            'total_attempts': 0,
-            'successful': 0,
-            'failed': 0,
-            'failures': []
-        }
+        local_stats = self.new_stats()
+        thread_cpu_start = thread_snapshot()
+        steady = self.create_steady_filter()
         
         for i in range(iterations):
             local_stats['total_attempts'] += 1
             try:
                 start_time = time.time()
-                conn = self.create_connection()
+                cpu_start = time.thread_time()
+                host, dns_time = self.resolve_host()
+                # tls_session_reuse: 같은 쓰레드, 같은 SSLContext 에서 full handshake 와 resumption 을 번갈아 실행
+                # (첫 접속 / warm-up 의 cold-start 비용이 full 쪽에만 섞이지 않도록)
+                conn = self.create_connection(host, resume_session=i % 2 == 1)
+                connect_time = time.time() - start_time
+                connect_cpu = time.thread_time() - cpu_start
                 
-                cursor = conn.cursor()
-                cursor.execute(query)
-                cursor.fetchall()
-                cursor.close()
+                if TEST_CONFIG['phase_timing']:
+                    time_first_query(conn, query)
+                else:
+                    cursor = conn.cursor()
+                    cursor.execute(query)
+                    cursor.fetchall()
+                    cursor.close()
                 conn.close()
                 
                 end_time = time.time()
                 
                 local_stats['successful'] += 1
-                local_results.append({
-                    'timestamp': datetime.now().isoformat(),
+                result = {
                     'thread_id': thread_id,
-                    'iteration': i + 1,
-                    'total_time': end_time - start_time
-                })
+                    'end_ns': time.perf_counter_ns(),
+                    'total_time': end_time - start_time,
+                    'dns_time': dns_time
+                }
+                if TEST_CONFIG['phase_timing']:
+                    result['phases'] = dict(conn.phases, dns=dns_time)
+                    result['auth_path'] = conn.auth_path
+                if self.tls_session_cache is not None:
+                    # 실제 협상 결과로 분류, warm-up 이후(steady-state 필터 통과) 샘플만 absorb() 에서 기록
+                    result['resumption'] = ('resumed' if conn.tls_resumed else 'full', connect_time, connect_cpu)
+                for item in steady.add(result['total_time'], result):
+                    self.absorb(item)
                 
             except Exception as e:
-                local_stats['failed'] += 1
-                error_detail = {
+                self.record_failure(local_stats, thread_id, i + 1, time.time() - start_time, e)
+                print(f"Thread {thread_id}, Iteration {i+1} error: {e}")
+            
+            time.sleep(TEST_CONFIG['sleep_time'])
+        
+        local_stats['cpu'] = usage_delta(thread_cpu_start, thread_snapshot())
+        local_stats['steady'] = steady.summary()
+        return local_stats
+
+    async def async_connection_worker(self, thread_id, iterations, query):
+        local_stats = self.new_stats()
+        steady = self.create_steady_filter()
+        
+        for i in range(iterations):
+            local_stats['total_attempts'] += 1
+            try:
+                start_time = time.time()
+                # getaddrinfo 는 블로킹이므로 이벤트 루프 밖에서 해석
+                host, dns_time = await asyncio.get_running_loop().run_in_executor(None, self.resolve_host)
+                conn = await self.async_create_connection(host)
+                
+                cursor = await conn.cursor()
+                await cursor.execute(query)
+                await cursor.fetchall()
+                await cursor.close()
+                await conn.ensure_closed()
+                
+                end_time = time.time()
+                
+                local_stats['successful'] += 1
+                for item in steady.add(end_time - start_time, {
+                    'thread_id': thread_id,
+                    'end_ns': time.perf_counter_ns(),
+                    'total_time': end_time - start_time,
+                    'dns_time': dns_time
+                }):
+                    self.absorb(item)
+                
+            except Exception as e:
+                self.record_failure(local_stats, thread_id, i + 1, time.time() - start_time, e)
+                print(f"Task {thread_id}, Iteration {i+1} error: {e}")
+            
+            await asyncio.sleep(TEST_CONFIG['sleep_time'])
+        
+        local_stats['steady'] = steady.summary()
+        return local_stats
+
+    def pool_worker(self, thread_id, iterations, query):
+        """pool 모드: 요청마다 풀에서 커넥션을 빌려 쿼리 실행 후 반납"""
+        local_stats = self.new_stats()
+        thread_cpu_start = thread_snapshot()
+        steady = self.create_steady_filter()
+        
+        for i in range(iterations):
+            local_stats['total_attempts'] += 1
+            try:
+                start_time = time.time()
+                conn, checkout_wait, create_time = self.pool.checkout()
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(query)
+                    cursor.fetchall()
+                    cursor.close()
+                except Exception:
+                    self.pool.release(conn, discard=True)
+                    raise
+                self.pool.release(conn)
+                end_time = time.time()
+                
+                local_stats['successful'] += 1
+                result = {
                     'thread_id': thread_id,
-                    'iteration': i + 1,
-                    'error': str(e),
-                    'timestamp': datetime.now().isoformat()
+                    'end_ns': time.perf_counter_ns(),
+                    'total_time': end_time - start_time,
+                    'checkout_wait': checkout_wait
                 }
-                local_stats['failures'].append(error_detail)
+                # 풀에 유휴 커넥션이 없어 새로 접속한 경우 접속 시간은 대기와 따로 기록
+                if create_time:
+                    result['pool_create'] = create_time
+                for item in steady.add(end_time - start_time, result):
+                    self.absorb(item)
+                
+            except Exception as e:
+                self.record_failure(local_stats, thread_id, i + 1, time.time() - start_time, e)
                 print(f"Thread {thread_id}, Iteration {i+1} error: {e}")
             
             time.sleep(TEST_CONFIG['sleep_time'])
         
-        return local_results, local_stats
+        local_stats['cpu'] = usage_delta(thread_cpu_start, thread_snapshot())
+        local_stats['steady'] = steady.summary()
+        return local_stats
+
+    def create_steady_filter(self):
+        return SteadyStateFilter(
+            warmup_iterations=TEST_CONFIG['warmup_iterations'],
+            warmup_seconds=TEST_CONFIG['warmup_seconds'],
+            window=TEST_CONFIG['steady_window'],
+            cv_threshold=TEST_CONFIG['steady_cv']
+        )
+
+    def run_thread_workers(self):
+        with ThreadPoolExecutor(max_workers=TEST_CONFIG['num_threads']) as executor:
+            futures = [
+                executor.submit(
+                    self.pool_worker if self.pool is not None else self.connection_worker, 
+                    i, 
+                    TEST_CONFIG['iterations'],
+                    TEST_CONFIG['query']
+                ) for i in range(TEST_CONFIG['num_threads'])
+            ]
+            return [future.result() for future in futures]
+
+    async def run_async_workers(self):
+        return await asyncio.gather(*[
+            self.async_connection_worker(
+                i,
+                TEST_CONFIG['iterations'],
+                TEST_CONFIG['query']
+            ) for i in range(TEST_CONFIG['num_threads'])
+        ])
 
     def run_test(self):
+        """설정된 TLS 버전마다 순서대로 테스트 실행"""
+        if TEST_CONFIG['engine'] == 'asyncio' and aiomysql is None:
+            print("engine 'asyncio' requires aiomysql (pip install aiomysql)")
+            return
+        if TEST_CONFIG['engine'] == 'asyncio' and TEST_CONFIG['phase_timing']:
+            print("Phase timing is only available with the thread engine, measuring total time only")
+            TEST_CONFIG['phase_timing'] = False
+        modes = ['connect', 'pool'] if TEST_CONFIG['connection_mode'] == 'both' else [TEST_CONFIG['connection_mode']]
+        if TEST_CONFIG['engine'] == 'asyncio' and 'pool' in modes:
+            print("Pool mode is only available with the thread engine, skipping pool runs")
+            modes = [mode for mode in modes if mode != 'pool']
+        rounds = 1
+        if len(modes) > 1:
+            # 대기 시간이 있으면 두 방식 모두 sleep 이 대부분이라 차이가 묻히므로 비교는 쉬지 않고 실행
+            if TEST_CONFIG['sleep_time']:
+                print(f"Mode comparison runs without sleep_time (was {TEST_CONFIG['sleep_time']}s)")
+                TEST_CONFIG['sleep_time'] = 0
+            rounds = max(1, TEST_CONFIG['mode_rounds'])
+        
+        for tls_version in self.db_config.get('tls_versions', ['TLSv1.2']):
+            self.tls_version = tls_version
+            # 테스트 시작 전 실제 협상되는 TLS 버전 확인
+            self.check_tls_version()
+            # 회차마다 순서를 바꿔 (connect, pool, pool, connect, ...) 시간에 따른 서버 상태 변화가 한쪽에 몰리지 않도록 함
+            schedule = [(round_no, mode) for round_no in range(1, rounds + 1)
+                        for mode in (modes if round_no % 2 else modes[::-1])]
+            for round_no, mode in schedule:
+                self.connection_mode = mode
+                self.mode_round = round_no
+                if rounds > 1:
+                    print(f"\nMode comparison round {round_no}/{rounds}: {mode}")
+                self.buffer = ResultBuffer(TEST_CONFIG['recent_samples'])
+                self.connection_stats = self.new_stats()
+                # 버전마다 새 세션 캐시 - 반복마다 full handshake / resumption 을 번갈아 시도
+                self.tls_session_cache = TLSSessionCache(self.create_ssl_context()) if TEST_CONFIG['tls_session_reuse'] else None
+                # 실행마다 새 resolver - 캐시 / 고정 IP / IP 별 분포를 실행 단위로 집계
+                self.resolver = CachingResolver(TEST_CONFIG['dns_mode'], ttl=TEST_CONFIG['dns_cache_ttl'],
+                                                pin_samples=TEST_CONFIG['dns_pin_samples'])
+                if mode == 'pool':
+                    self.pool = BoundedConnectionPool(
+                        self.create_connection,
+                        TEST_CONFIG['pool_size'],
+                        checkout_timeout=TEST_CONFIG['pool_checkout_timeout'],
+                        reset_session=TEST_CONFIG['pool_reset_session']
+                    )
+                try:
+                    self.run_tls_version()
+                finally:
+                    if self.pool is not None:
+                        self.pool.close()
+                        self.pool = None
+        
+        if len(self.phase_summaries) > 1:
+            self.print_phase_comparison()
+        if len(modes) > 1:
+            self.print_mode_comparison()
+
+    def run_tls_version(self):
         test_start = datetime.now()
+        self.test_start = test_start
         print(f"\nStarting test for MySQL {self.db_config['version']}")
         print(f"Start time: {test_start.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Engine: {TEST_CONFIG['engine']}")
+        print(f"Connector: {self.connector_name()}")
         print(f"Threads: {TEST_CONFIG['num_threads']}")
         print(f"Iterations per thread: {TEST_CONFIG['iterations']}")
         print(f"Query: {TEST_CONFIG['query']}")
-        print(f"Configured TLS version: {self.db_config.get('tls_versions', ['Not specified'])[0]}")
+        print(f"Configured TLS version: {self.tls_version}")
+        print(f"TLS session reuse: {'on (shared SSLContext)' if self.tls_session_cache else 'off'}")
+        if self.pool is not None:
+            print(f"Connection mode: pool (size {self.pool.size}, checkout timeout {self.pool.checkout_timeout}s, "
+                  f"reset session {'on' if self.pool.reset_session else 'off'})")
+        else:
+            print("Connection mode: connect per iteration")
+        print(f"DNS mode: {self.resolver.mode}")
         
         start_time = time.time()
+        self.cpu_sampler = ClientCpuSampler(TEST_CONFIG['cpu_sample_interval'])
+        self.cpu_sampler.start()
         
-        with ThreadPoolExecutor(max_workers=TEST_CONFIG['num_threads']) as executor:
-            futures = [
-                executor.submit(
-                    self.connection_worker, 
-                    i, 
-                    TEST_CONFIG['iterations'],
-                    TEST_CONFIG['query']
-                ) for i in range(TEST_CONFIG['num_threads'])
-            ]
-            
-            for future in futures:
-                results, stats = future.result()
-                self.results.extend(results)
-                self.connection_stats['total_attempts'] += stats['total_attempts']
-                self.connection_stats['successful'] += stats['successful']
-                self.connection_stats['failed'] += stats['failed']
-                self.connection_stats['failures'].extend(stats['failures'])
+        if TEST_CONFIG['engine'] == 'asyncio':
+            raise_open_files_limit()
+            worker_results = asyncio.run(self.run_async_workers())
+        else:
+            worker_results = self.run_thread_workers()
+        self.cpu_sampler.stop()
+        self.pool_stats = self.pool.stats() if self.pool is not None else None
+        
+        self.worker_cpu = None
+        self.steady_summary = merge_steady_state(stats['steady'] for stats in worker_results)
+        for stats in worker_results:
+            if 'cpu' in stats:
+                self.worker_cpu = add_usage(self.worker_cpu, stats['cpu'])
+            self.connection_stats['total_attempts'] += stats['total_attempts']
+            self.connection_stats['successful'] += stats['successful']
+            self.connection_stats['failed'] += stats['failed']
+            self.connection_stats['failures'].extend(stats['failures'])
         
         end_time = time.time()
         self.analyze_results(end_time - start_time)
 
     def analyze_results(self, total_duration):
-        if not self.results:
+        total_times = self.buffer.histogram('total_time')
+        if not total_times.total_count:
             print("No results to analyze")
+            if self.steady_summary:
+                print(format_steady_state(self.steady_summary))
             return
             
-        total_times = [r['total_time'] for r in self.results]
+        # pool 모드는 접속 대신 요청(checkout + 쿼리 + 반납) 단위로 집계
+        unit = 'request' if self.pool_stats else 'connection'
         
         result_text = []
         result_text.append(f"\nResults for MySQL {self.db_config['version']}:")
-        result_text.append(f"Configured TLS version: {self.db_config.get('tls_versions', ['Not specified'])[0]}")
+        result_text.append(f"Configured TLS version: {self.tls_version}")
         result_text.append(f"Actual TLS version used: {self.actual_tls_version}")
+        result_text.append(f"Connection mode: {self.connection_mode}")
+        result_text.append(f"Connector: {self.connector_name()}")
         
-        result_text.append("\nConnection Statistics:")
-        result_text.append(f"Total connection attempts: {self.connection_stats['total_attempts']}")
-        result_text.append(f"Successful connections: {self.connection_stats['successful']}")
-        result_text.append(f"Failed connections: {self.connection_stats['failed']}")
+        result_text.append(f"\n{unit.capitalize()} Statistics:")
+        result_text.append(f"Total {unit} attempts: {self.connection_stats['total_attempts']}")
+        result_text.append(f"Successful {unit}s: {self.connection_stats['successful']}")
+        result_text.append(f"Failed {unit}s: {self.connection_stats['failed']}")
         result_text.append(f"Success rate: {(self.connection_stats['successful'] / self.connection_stats['total_attempts']) * 100:.2f}%")
         
+        queries_per_second = self.connection_stats['successful'] / total_duration
         result_text.append(f"\nTest duration: {total_duration:.2f} seconds")
-        result_text.append(f"Connections per second: {self.connection_stats['successful'] / total_duration:.2f}")
-        
-        if self.results:
-            result_text.append("\nSuccessful Connection times (seconds):")
-            result_text.append(f"Min: {min(total_times):.6f}")
-            result_text.append(f"Max: {max(total_times):.6f}")
-            if len(total_times) > 1:
-                result_text.append(f"Avg: {statistics.mean(total_times):.6f}")
-                result_text.append(f"Median: {statistics.median(total_times):.6f}")
-                result_text.append(f"StdDev: {statistics.stdev(total_times):.6f}")
-            else:
-                result_text.append(f"Single connection time: {total_times[0]:.6f}")
+        result_text.append(f"{unit.capitalize()}s per second: {queries_per_second:.2f}")
+        # 두 모드 모두 1회당 쿼리 1번
+        result_text.append(f"Queries per second: {queries_per_second:.2f}")
+        # 아래 접속 시간 / 단계별 통계는 warm-up 이후 steady-state 샘플만 사용
+        result_text.append(format_steady_state(self.steady_summary))
+        
+        # 평균 / 표준편차는 정확한 값, 중앙값은 히스토그램 버킷 기준 (상대 오차 1% 미만)
+        result_text.append(f"\nSuccessful {unit.capitalize()} times (seconds, steady-state):")
+        result_text.append(f"Min: {total_times.min_value / 1e9:.6f}")
+        result_text.append(f"Max: {total_times.max_value / 1e9:.6f}")
+        if total_times.total_count > 1:
+            result_text.append(f"Avg: {total_times.mean() / 1e9:.6f}")
+            result_text.append(f"Median: {total_times.percentile(50) / 1e9:.6f}")
+            result_text.append(f"StdDev: {total_times.stdev() / 1e9:.6f}")
+        else:
+            result_text.append(f"Single connection time: {total_times.max_value / 1e9:.6f}")
+        
+        phase_histograms = {phase: self.buffer.histogram(f"phase.{phase}") for phase in self.buffer.names('phase.')}
+        if phase_histograms:
+            summary = phase_histogram_percentiles(phase_histograms)
+            self.phase_summaries[self.tls_version] = summary
+            result_text.append("\nConnection phase breakdown (ms):")
+            result_text.append("Phase         |   Count |        Avg |        P50 |        P95 |        P99 |        Max")
+            result_text.append("-" * 95)
+            for phase, stats in summary.items():
+                result_text.append(f"{phase:<13} | {stats['count']:>7} | {stats['avg']:>10.3f} | {stats[50]:>10.3f} | "
+                                   f"{stats[95]:>10.3f} | {stats[99]:>10.3f} | {stats['max']:>10.3f}")
+            auth_paths = self.buffer.counters_with('auth_path.')
+            result_text.append("\nAuthentication path:")
+            for path, count in sorted(auth_paths.items(), key=lambda item: -item[1]):
+                result_text.append(f"{path}: {count} ({count / total_times.total_count * 100:.2f}%)")
+        
+        dns_times = self.buffer.histogram('dns_time')
+        if dns_times.total_count:
+            result_text.append(f"\nDNS resolution per connect (ms, steady-state): {latency_summary_ms(dns_times)}")
+        result_text.extend(self.resolver.format_summary())
+        pinned = self.resolver.pinned_addresses(self.db_config['host'], self.db_config.get('port', 3306))
+        if pinned:
+            result_text.append(f"Pinned addresses: {', '.join(pinned)}")
+        
+        checkout_waits = self.buffer.histogram('checkout_wait')
+        if self.pool_stats:
+            pool = self.pool_stats
+            result_text.append(f"\nConnection pool (size {TEST_CONFIG['pool_size']}, checkout timeout {TEST_CONFIG['pool_checkout_timeout']}s, "
+                               f"reset session {'on' if TEST_CONFIG['pool_reset_session'] else 'off'}):")
+            if checkout_waits.total_count:
+                result_text.append(f"Checkout wait (ms, steady-state, excluding connection creation): {latency_summary_ms(checkout_waits)}")
+            pool_creates = self.buffer.histogram('pool_create')
+            if pool_creates.total_count:
+                result_text.append(f"New connection on checkout (ms, steady-state): {pool_creates.total_count} times, "
+                                   f"{latency_summary_ms(pool_creates)}")
+            result_text.append(f"Exhaustion events (checkout had to wait): {pool['exhausted']} of {pool['checkouts'] + pool['timeouts']} "
+                               f"({pool['exhausted'] / max(1, pool['checkouts'] + pool['timeouts']) * 100:.2f}%)")
+            result_text.append(f"Checkout timeouts: {pool['timeouts']}")
+            result_text.append(f"Connections created: {pool['created']} (avg {pool['create_time'] / max(1, pool['created']) * 1000:.3f} ms), "
+                               f"discarded: {pool['discarded']}, peak in use: {pool['peak_in_use']}")
+            if pool['resets']:
+                result_text.append(f"Session reset: {pool['resets']} resets, avg {pool['reset_time'] / pool['resets'] * 1000:.3f} ms")
+        
+        # 접속(또는 요청)마다 쿼리 1회 실행
+        result_text.extend(self.cpu_sampler.format_summary(
+            self.connection_stats['successful'], self.connection_stats['successful'], self.worker_cpu, unit=unit))
+        
+        resumption = self.collect_resumption_values()
+        if resumption:
+            result_text.append("\nTLS session resumption (connect = TCP + TLS + auth, CPU = client thread CPU per connect):")
+            result_text.append("Handshake |   Count | Connect Avg (ms) | Connect P50 (ms) | Connect P99 (ms) | CPU Avg (ms)")
+            result_text.append("-" * 95)
+            for kind, histograms in resumption.items():
+                connect = histograms['connect_time']
+                result_text.append(
+                    f"{kind:<9} | {connect.total_count:>7} | {connect.mean() / 1e6:>16.3f} | "
+                    f"{connect.percentile(50) / 1e6:>16.3f} | "
+                    f"{connect.percentile(99) / 1e6:>16.3f} | "
+                    f"{histograms['cpu_time'].mean() / 1e6:>12.3f}")
         
         if self.connection_stats['failures']:
             result_text.append("\nRecent Connection Failures (last 5):")
-            for failure in self.connection_stats['failures'][-5:]:
+            for failure in list(self.connection_stats['failures'])[-5:]:
                 result_text.append(f"Thread {failure['thread_id']}, "
                                  f"Iteration {failure['iteration']}: {failure['error']}")
         
         print('\n'.join(result_text))
         
-        filename = f"mysql_57_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        mode_suffix = '_pool' if self.pool_stats else ''
+        filename = f"mysql_57_results_{self.tls_version}{mode_suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         with open(filename, 'w') as f:
             f.write('\n'.join(result_text))
         print(f"\nResults saved to {filename}")
+        samples_filename = f"mysql_57_recent_samples_{self.tls_version}{mode_suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        saved = self.buffer.write_recent_samples(samples_filename)
+        if saved:
+            print(f"Last {saved} raw samples saved to {samples_filename}")
+        
+        self.mode_summaries.append({
+            'tls_version': self.tls_version,
+            'mode': self.connection_mode,
+            'qps': queries_per_second,
+            'total_times': total_times,
+            'checkout_waits': checkout_waits,
+            'pool_creates': self.buffer.histogram('pool_create'),
+            'exhausted': self.pool_stats['exhausted'] if self.pool_stats else None,
+            'timeouts': self.pool_stats['timeouts'] if self.pool_stats else None
+        })
+        
+        if TEST_CONFIG['record_results']:
+            self.record_results(total_duration, phase_histograms, resumption)
         
         test_end = datetime.now()
         print(f"Test end time: {test_end.strftime('%Y-%m-%d %H:%M:%S')}")
 
+    def collect_resumption_values(self):
+        """tls_session_reuse 모드에서 full / resumed 접속별 접속 시간과 CPU 시간 히스토그램"""
+        resumption = {}
+        for kind in ('full', 'resumed'):
+            connect = self.buffer.histogram(f"resumption.{kind}.connect_time")
+            if connect.total_count:
+                resumption[kind] = {'connect_time': connect,
+                                    'cpu_time': self.buffer.histogram(f"resumption.{kind}.cpu_time")}
+        return resumption
+
+    def print_phase_comparison(self):
+        """TLS 버전별 단계 P50 / P99 비교"""
+        versions = list(self.phase_summaries)
+        print("\nPhase comparison by TLS version (ms, P50 / P99):")
+        print("Phase         | " + " | ".join(f"{v:>21}" for v in versions))
+        print("-" * (16 + 24 * len(versions)))
+        for phase in PHASES:
+            cells = []
+            for version in versions:
+                stats = self.phase_summaries[version].get(phase)
+                cells.append(f"{stats[50]:>9.3f} / {stats[99]:>9.3f}" if stats else f"{'-':>21}")
+            print(f"{phase:<13} | " + " | ".join(cells))
+
+    def print_mode_comparison(self):
+        """TLS 버전별 반복 접속 vs 커넥션 풀 QPS / 지연시간 비교 - 회차별 QPS 는 평균 ± 표준편차, 지연시간은 전 회차 합산"""
+        groups = {}
+        for summary in self.mode_summaries:
+            groups.setdefault((summary['tls_version'], summary['mode']), []).append(summary)
+        rounds = max(len(summaries) for summaries in groups.values())
+        print(f"\nConnection mode comparison ({rounds} round(s), sleep {TEST_CONFIG['sleep_time']}s, modes interleaved):")
+        header = (f"{'TLS':<8} | {'Mode':<7} | {'QPS (avg ± sd)':>19} | {'P50 (ms)':>8} | {'P99 (ms)':>8} | "
+                  f"{'Checkout wait P99 (ms)':>22} | {'Create P99 (ms)':>15} | {'Exhausted':>9} | {'Timeouts':>8} | {'QPS vs connect':>14}")
+        print(header)
+        print("-" * len(header))
+        baseline = {}
+        for (tls_version, mode), summaries in groups.items():
+            if mode == 'connect':
+                baseline[tls_version] = statistics.mean(summary['qps'] for summary in summaries)
+        for (tls_version, mode), summaries in groups.items():
+            qps_values = [summary['qps'] for summary in summaries]
+            qps = statistics.mean(qps_values)
+            qps_sd = statistics.stdev(qps_values) if len(qps_values) > 1 else 0.0
+            merged = {}
+            for key in ('total_times', 'checkout_waits', 'pool_creates'):
+                merged[key] = LatencyHistogram()
+                for summary in summaries:
+                    merged[key].merge(summary[key])
+            base = baseline.get(tls_version)
+            gain = f"{qps / base:.2f}x" if base and mode != 'connect' else '-'
+            checkout = f"{merged['checkout_waits'].percentile(99) / 1e6:.3f}" if merged['checkout_waits'].total_count else '-'
+            create = f"{merged['pool_creates'].percentile(99) / 1e6:.3f}" if merged['pool_creates'].total_count else '-'
+            exhausted = sum(summary['exhausted'] for summary in summaries) if mode == 'pool' else '-'
+            timeouts = sum(summary['timeouts'] for summary in summaries) if mode == 'pool' else '-'
+            print(f"{tls_version:<8} | {mode:<7} | {qps:>10.2f} ± {qps_sd:>6.2f} | "
+                  f"{merged['total_times'].percentile(50) / 1e6:>8.3f} | {merged['total_times'].percentile(99) / 1e6:>8.3f} | "
+                  f"{checkout:>22} | {create:>15} | {exhausted:>9} | {timeouts:>8} | {gain:>14}")
+
+    def record_results(self, total_duration, phase_histograms, resumption):
+        """접속(요청) 시간 분포, 단계별 시간 분포, resumption 별 접속/CPU 시간, 풀 checkout 대기, 클라이언트 CPU 사용량과 초당 처리량을 결과 저장소에 기록"""
+        config = dict(TEST_CONFIG)
+        config['connection_mode'] = self.connection_mode
+        config['mode_round'] = self.mode_round
+        config['tls_version'] = self.tls_version
+        config['actual_tls_version'] = self.actual_tls_version
+        config['connector'] = self.connector_name()
+        cpu = self.cpu_sampler.summary(self.connection_stats['successful'], self.connection_stats['successful'])
+        dns = self.resolver.stats()
+        dns_metrics = [
+            metric_from_histogram('dns_time', self.buffer.histogram('dns_time')),
+            metric_value('dns.cache_hit_rate', dns['cache_hits'] / dns['lookups'] * 100 if dns['lookups'] else 0.0,
+                         unit='%', better='higher'),
+            metric_value('dns.record_changes', dns['changes'], unit='count', better='lower')
+        ]
+        pool_metrics = []
+        if self.pool_stats:
+            pool_metrics = [
+                metric_from_histogram('pool.checkout_wait', self.buffer.histogram('checkout_wait')),
+                metric_from_histogram('pool.connection_create', self.buffer.histogram('pool_create')),
+                metric_value('pool.exhaustion_events', self.pool_stats['exhausted'], unit='count', better='lower'),
+                metric_value('pool.timeouts', self.pool_stats['timeouts'], unit='count', better='lower')
+            ]
+        try:
+            store = ResultsStore()
+            run_id = store.record_run(
+                'ssl_test_aurora_v3',
+                config=config,
+                metrics=[
+                    # pool 모드는 접속 없이 checkout + 쿼리 + 반납 시간
+                    metric_from_histogram('request_time' if self.pool_stats else 'connect_time',
+                                          self.buffer.histogram('total_time')),
+                    None if self.pool_stats else metric_value(
+                        'connections_per_second', self.connection_stats['successful'] / total_duration,
+                        unit='conn/s', better='higher'),
+                    metric_value('queries_per_second', self.connection_stats['successful'] / total_duration,
+                                 unit='qps', better='higher'),
+                    metric_value('success_rate', self.connection_stats['successful'] / self.connection_stats['total_attempts'] * 100,
+                                 unit='%', better='higher'),
+                    metric_value('client_cpu_us_per_connection', cpu['cpu_us_per_connection'], unit='us', better='lower'),
+                    metric_value('client_cpu_util', cpu['avg_util'], unit='%', better='lower')
+                ] + [
+                    metric_from_histogram(f"phase.{phase}", histogram)
+                    for phase, histogram in phase_histograms.items()
+                ] + [
+                    metric_from_histogram(f"{name}.{kind}", histograms[name])
+                    for kind, histograms in resumption.items()
+                    for name in ('connect_time', 'cpu_time')
+                ] + dns_metrics + pool_metrics,
+                host=self.db_config['host'],
+                server_version=self.server_version,
+                label=TEST_CONFIG['results_label'],
+                started_at=self.test_start
+            )
+            store.close()
+            print(f"Results recorded as run {run_id} in {store.path}")
+        except Exception as e:
+            print(f"Failed to record results: {e}")
+
 def main():
     start_datetime = datetime.now()
     print(f"Test started at: {start_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -1,8 +1,16 @@
 import mysql.connector
+import os
+import sys
 import time
+from collections import deque
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
-import statistics
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from dns_resolver import CachingResolver
+from result_buffer import STATUS_ERROR, ResultBuffer
+from results_store import ResultsStore, fetch_server_version, metric_from_histogram, metric_value
+from steady_state import SteadyStateFilter, format_steady_state, merge_steady_state
 
 # MySQL 설정
 MYSQL_CONFIG = {
@@ -18,47 +26,68 @@ MYSQL_CONFIG = {
 TEST_CONFIG = {
     'num_threads': 1,        # 동시 실행할 쓰레드 수
     'iterations': 1,        # 각 쓰레드당 반복 횟수
-    'sleep_time': 0        # 반복 사이의 대기 시간(초)
+    'sleep_time': 0,        # 반복 사이의 대기 시간(초)
+    # warm-up / steady-state 는 iterations 가 warm-up + 윈도우보다 클 때만 의미 있음 (예: iterations 100, warm-up 1, window 10)
+    'warmup_iterations': 0,   # 쓰레드별 warm-up 접속 횟수 (통계 제외)
+    'warmup_seconds': 0,      # 쓰레드별 warm-up 시간(초)
+    'steady_window': 0,       # steady-state 감지 윈도우(접속 수), 0 이면 warm-up 만 적용
+    'steady_cv': 0.5,         # 윈도우 변동계수가 이 값 이하가 되면 steady-state 로 판단
+    'dns_mode': 'system',     # 'system': 접속마다 이름 해석, 'cache': dns_cache_ttl 초 동안 재사용, 'pin': 수집한 IP 에 고정 (순환)
+    'dns_cache_ttl': 5,       # cache 모드: 해석 결과 재사용 시간(초) - Aurora 엔드포인트 DNS TTL 과 같음
+    'dns_pin_samples': 10,    # pin 모드: IP 수집을 위해 처음에 해석하는 횟수 (reader 엔드포인트는 조회마다 IP 가 바뀜)
+    'recent_samples': 1000,   # 원시 샘플은 최근 N 건만 보관 (종료 시 CSV 저장) - 나머지는 히스토그램으로 집계
+    'failure_details': 100,   # 오류 메시지는 최근 N 건만 보관
+    'record_results': True,   # 결과를 Common/results_store.py 저장소(SQLite)에 기록
+    'results_label': None     # 실행 구분용 라벨 (예: 'before-upgrade')
 }
 
 class ConnectionTester:
     def __init__(self, db_config):
         self.db_config = db_config
-        self.results = []
-        self.connection_stats = {
+        # 모든 워커가 공유하는 고정 메모리 결과 버퍼
+        self.buffer = ResultBuffer(TEST_CONFIG['recent_samples'])
+        self.steady_summaries = []
+        self.connection_stats = self.new_stats()
+        self.test_start = None
+        # 접속 전에 직접 이름 해석 - 해석 시간 / IP 별 분포를 접속 시간과 따로 집계
+        self.resolver = CachingResolver(TEST_CONFIG['dns_mode'], ttl=TEST_CONFIG['dns_cache_ttl'],
+                                        pin_samples=TEST_CONFIG['dns_pin_samples'])
+
+    def new_stats(self):
+        return {
             'total_attempts': 0,
             'successful': 0,
             'failed': 0,
-            'failures': []
+            'failures': deque(maxlen=TEST_CONFIG['failure_details'])
         }
 
-    def create_connection(self):
-        """기본 연결 생성"""
-        return mysql.connector.connect(**self.db_config)
+    def create_connection(self, host):
+        """기본 연결 생성 - host 는 resolver 가 돌려준 IP"""
+        return mysql.connector.connect(**dict(self.db_config, host=host))
 
     def connection_worker(self, thread_id, iterations):
-        local_results = []
-        local_stats = {
-            'total_attempts': 0,
-            'successful': 0,
-            'failed': 0,
-            'failures': []
-        }
+        local_stats = self.new_stats()
+        steady = SteadyStateFilter(
+            warmup_iterations=TEST_CONFIG['warmup_iterations'],
+            warmup_seconds=TEST_CONFIG['warmup_seconds'],
+            window=TEST_CONFIG['steady_window'],
+            cv_threshold=TEST_CONFIG['steady_cv']
+        )
         
         for i in range(iterations):
             local_stats['total_attempts'] += 1
             try:
                 start_time = time.time()
-                conn = self.create_connection()
+                host, dns_time = self.resolver.resolve(self.db_config['host'], self.db_config.get('port', 3306))
+                conn = self.create_connection(host)
                 end_time = time.time()
                 conn.close()
                 
                 local_stats['successful'] += 1
-                local_results.append({
-                    'thread_id': thread_id,
-                    'iteration': i + 1,
-                    'total_time': end_time - start_time
-                })
+                for item in steady.add(end_time - start_time, (time.perf_counter_ns(), end_time - start_time, dns_time)):
+                    end_ns, total_time, dns_time = item
+                    self.buffer.add(thread_id, total_time * 1e9, end_ns=end_ns,
+                                    values={'total_time': total_time, 'dns_time': dns_time})
                 
             except Exception as e:
                 local_stats['failed'] += 1
@@ -68,13 +97,16 @@ class ConnectionTester:
                     'error': str(e)
                 }
                 local_stats['failures'].append(error_detail)
+                self.buffer.add(thread_id, (time.time() - start_time) * 1e9, STATUS_ERROR)
                 print(f"Thread {thread_id}, Iteration {i+1} error: {e}")
             
             time.sleep(TEST_CONFIG['sleep_time'])
         
-        return local_results, local_stats
+        local_stats['steady'] = steady.summary()
+        return local_stats
 
     def run_test(self):
+        self.test_start = datetime.now()
         print(f"\nStarting connection test")
         print(f"Threads: {TEST_CONFIG['num_threads']}")
         print(f"Iterations per thread: {TEST_CONFIG['iterations']}")
@@ -91,22 +123,22 @@ class ConnectionTester:
             ]
             
             for future in futures:
-                results, stats = future.result()
-                self.results.extend(results)
+                stats = future.result()
                 self.connection_stats['total_attempts'] += stats['total_attempts']
                 self.connection_stats['successful'] += stats['successful']
                 self.connection_stats['failed'] += stats['failed']
                 self.connection_stats['failures'].extend(stats['failures'])
+                self.steady_summaries.append(stats['steady'])
         
         end_time = time.time()
         self.analyze_results(end_time - start_time)
 
     def analyze_results(self, total_duration):
-        if not self.results:
+        total_times = self.buffer.histogram('total_time')
+        if not total_times.total_count:
             print("No results to analyze")
+            print(format_steady_state(merge_steady_state(self.steady_summaries)))
             return
-            
-        total_times = [r['total_time'] for r in self.results]
         
         result_text = []
         result_text.append("\nConnection Statistics:")
@@ -117,26 +149,80 @@ class ConnectionTester:
         
         result_text.append(f"\nTest duration: {total_duration:.2f} seconds")
         result_text.append(f"Connections per second: {self.connection_stats['successful'] / total_duration:.2f}")
+        result_text.append(format_steady_state(merge_steady_state(self.steady_summaries)))
         
-        if self.results:
-            result_text.append("\nSuccessful Connection times (seconds):")
-            result_text.append(f"Min: {min(total_times):.6f}")
-            result_text.append(f"Max: {max(total_times):.6f}")
-            if len(total_times) > 1:
-                result_text.append(f"Avg: {statistics.mean(total_times):.6f}")
-                result_text.append(f"Median: {statistics.median(total_times):.6f}")
-                result_text.append(f"StdDev: {statistics.stdev(total_times):.6f}")
-            else:
-                result_text.append(f"Single connection time: {total_times[0]:.6f}")
+        result_text.append("\nSuccessful Connection times (seconds, steady-state):")
+        result_text.append(f"Min: {total_times.min_value / 1e9:.6f}")
+        result_text.append(f"Max: {total_times.max_value / 1e9:.6f}")
+        if total_times.total_count > 1:
+            result_text.append(f"Avg: {total_times.mean() / 1e9:.6f}")
+            result_text.append(f"Median: {total_times.percentile(50) / 1e9:.6f}")
+            result_text.append(f"StdDev: {total_times.stdev() / 1e9:.6f}")
+        else:
+            result_text.append(f"Single connection time: {total_times.max_value / 1e9:.6f}")
+        
+        dns_times = self.buffer.histogram('dns_time')
+        if dns_times.total_count:
+            result_text.append(f"\nDNS resolution per connect (seconds, steady-state): avg {dns_times.mean() / 1e9:.6f}, "
+                               f"P99 {dns_times.percentile(99) / 1e9:.6f}, max {dns_times.max_value / 1e9:.6f}")
+        result_text.extend(self.resolver.format_summary())
         
         if self.connection_stats['failures']:
             result_text.append("\nRecent Connection Failures (last 5):")
-            for failure in self.connection_stats['failures'][-5:]:
+            for failure in list(self.connection_stats['failures'])[-5:]:
                 result_text.append(f"Thread {failure['thread_id']}, "
                                  f"Iteration {failure['iteration']}: {failure['error']}")
         
         print('\n'.join(result_text))
 
+        samples_filename = f"nocursor_recent_samples_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        saved = self.buffer.write_recent_samples(samples_filename)
+        if saved:
+            print(f"\nLast {saved} raw samples saved to {samples_filename}")
+
+        if TEST_CONFIG['record_results']:
+            self.record_results(total_duration)
+
+    def record_results(self, total_duration):
+        """steady-state 접속 / 이름 해석 시간 분포와 초당 접속 수, 성공률, DNS 캐시 hit 비율을 결과 저장소에 기록"""
+        config = dict(TEST_CONFIG)
+        config['tls_versions'] = self.db_config.get('tls_versions')
+        config['connector'] = 'mysql.connector C extension' if mysql.connector.HAVE_CEXT else 'mysql.connector pure python'
+        server_version = None
+        try:
+            conn = mysql.connector.connect(**self.db_config)
+            server_version = fetch_server_version(conn)
+            conn.close()
+        except Exception as e:
+            print(f"Failed to get server version: {e}")
+        dns = self.resolver.stats()
+
+        try:
+            store = ResultsStore()
+            run_id = store.record_run(
+                'ssl_test_aurora_v3_nocursor',
+                config=config,
+                metrics=[
+                    metric_from_histogram('connect_time', self.buffer.histogram('total_time')),
+                    metric_value('connections_per_second', self.connection_stats['successful'] / total_duration,
+                                 unit='conn/s', better='higher'),
+                    metric_value('success_rate', self.connection_stats['successful'] / self.connection_stats['total_attempts'] * 100,
+                                 unit='%', better='higher'),
+                    metric_from_histogram('dns_time', self.buffer.histogram('dns_time')),
+                    metric_value('dns.cache_hit_rate', dns['cache_hits'] / dns['lookups'] * 100 if dns['lookups'] else 0.0,
+                                 unit='%', better='higher'),
+                    metric_value('dns.record_changes', dns['changes'], unit='count', better='lower')
+                ],
+                host=self.db_config['host'],
+                server_version=server_version,
+                label=TEST_CONFIG['results_label'],
+                started_at=self.test_start
+            )
+            store.close()
+            print(f"Results recorded as run {run_id} in {store.path}")
+        except Exception as e:
+            print(f"Failed to record results: {e}")
+
 def main():
     start_datetime = datetime.now()
     print(f"Test started at: {start_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
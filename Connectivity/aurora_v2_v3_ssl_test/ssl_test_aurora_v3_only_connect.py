@@ -1,5 +1,14 @@
 import mysql.connector
+import os
+import ssl
+import sys
 import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from backend_distribution import BackendDistribution, fetch_backend_id
+from connection_phases import PhaseTimedConnection, TLSSessionCache
+from results_store import ResultsStore, fetch_server_version, metric_from_values, metric_value
 
 # MySQL 설정
 MYSQL_CONFIG = {
@@ -11,8 +20,73 @@ MYSQL_CONFIG = {
    'tls_versions': ['TLSv1.3'] 
 }
 
+# TLS 세션 재사용 모드
+# True: SSLContext 하나를 공유하고 warm-up 접속 후 full handshake 와 직전 세션 resumption 을 번갈아 실행 (full vs resumed 비교)
+TLS_SESSION_REUSE = False
+# 백엔드 분포 모드
+# True: 접속마다 붙은 인스턴스(@@aurora_server_id)를 조회하여 인스턴스별 접속 수 / 접속 시간 집계 (reader 엔드포인트 분포 확인)
+BACKEND_DISTRIBUTION = False
+ITERATIONS = 20      # TLS_SESSION_REUSE / BACKEND_DISTRIBUTION 모드의 접속 횟수
+
+# 결과 저장 설정
+RECORD_RESULTS = True       # 종료 시 결과를 Common/results_store.py 저장소(SQLite)에 기록
+RESULTS_LABEL = None        # 실행 구분용 라벨 (예: 'before-upgrade')
+
+TLS_VERSION_MAP = {
+    'TLSv1.2': ssl.TLSVersion.TLSv1_2,
+    'TLSv1.3': ssl.TLSVersion.TLSv1_3
+}
+
+
+def create_ssl_context():
+    """mysql.connector 와 같이 CA 만 로드하고 인증서 검증은 하지 않는 SSLContext (한 번만 생성)"""
+    tls_version = TLS_VERSION_MAP[MYSQL_CONFIG['tls_versions'][0]]
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    context.load_verify_locations(os.path.expanduser(MYSQL_CONFIG['ssl_ca']))
+    context.minimum_version = tls_version
+    context.maximum_version = tls_version
+    return context
+
+
+def record_results(mode, connector, metrics, started_at):
+    """모드별 측정값을 결과 저장소에 기록 (mode / connector 는 설정으로 저장하여 같은 조건끼리 비교)"""
+    if not RECORD_RESULTS:
+        return
+    server_version = None
+    try:
+        conn = mysql.connector.connect(**MYSQL_CONFIG)
+        server_version = fetch_server_version(conn)
+        conn.close()
+    except Exception as e:
+        print(f"Failed to get server version: {e}")
+
+    try:
+        store = ResultsStore()
+        run_id = store.record_run(
+            'ssl_test_aurora_v3_only_connect',
+            config={'mode': mode, 'iterations': ITERATIONS, 'tls_versions': MYSQL_CONFIG['tls_versions'],
+                    'connector': connector},
+            metrics=metrics,
+            host=MYSQL_CONFIG['host'],
+            server_version=server_version,
+            label=RESULTS_LABEL,
+            started_at=started_at
+        )
+        store.close()
+        print(f"Results recorded as run {run_id} in {store.path}")
+    except Exception as e:
+        print(f"Failed to record results: {e}")
+
+
+def default_connector():
+    """mysql.connector.connect() 가 사용하는 드라이버 (결과 저장소 비교용)"""
+    return 'mysql.connector C extension' if mysql.connector.HAVE_CEXT else 'mysql.connector pure python'
+
     
 def simple_test():
+    started_at = datetime.now()
     try:
         # 순수 연결 시간 측정 시작
         start_time = time.time()
@@ -23,6 +97,91 @@ def simple_test():
         print(f"연결 및 종료 소요시간: {end_time - start_time:.6f}초")
     except Exception as e:
         print(f"연결 실패: {e}")
+        return
+    record_results('simple', default_connector(),
+                   [metric_value('connect_time', (end_time - start_time) * 1000, unit='ms', better='lower')], started_at)
+
+
+def session_reuse_test():
+    """공유 SSLContext 로 ITERATIONS 번 접속하며 full handshake 와 resumed 접속의 시간 / CPU 비교
+
+    첫 접속(DNS, CA 로드, 첫 handshake 등 cold-start 비용 포함)은 warm-up 으로 집계에서 제외하고
+    이후 같은 조건에서 full / resumed 를 번갈아 접속
+    """
+    started_at = datetime.now()
+    cache = TLSSessionCache(create_ssl_context())
+    results = {'full': [], 'resumed': []}
+    for i in range(0, ITERATIONS + 1):
+        try:
+            start_time = time.time()
+            cpu_start = time.process_time()
+            conn = PhaseTimedConnection(tls_session_cache=cache, resume_session=i % 2 == 0, **MYSQL_CONFIG)
+            conn.close()
+            elapsed = time.time() - start_time
+            cpu_time = time.process_time() - cpu_start
+        except Exception as e:
+            print(f"연결 실패: {e}")
+            continue
+        kind = 'resumed' if conn.tls_resumed else 'full'
+        if i == 0:
+            print(f"[warm-up] {conn.tls_version} {kind} 연결 및 종료 소요시간: {elapsed:.6f}초 (집계 제외)")
+            continue
+        results[kind].append((elapsed, cpu_time, conn.phases.get('tls_handshake', 0)))
+        print(f"[{i:>3}] {conn.tls_version} {kind:<7} 연결 및 종료 소요시간: {elapsed:.6f}초 "
+              f"(TLS handshake {conn.phases.get('tls_handshake', 0) * 1000:.3f}ms, CPU {cpu_time * 1000:.3f}ms)")
+
+    print("\nHandshake |  Count | Connect Avg (ms) | TLS Avg (ms) | CPU Avg (ms)")
+    print("-" * 68)
+    for kind, values in results.items():
+        if not values:
+            continue
+        count = len(values)
+        print(f"{kind:<9} | {count:>6} | {sum(v[0] for v in values) / count * 1000:>16.3f} | "
+              f"{sum(v[2] for v in values) / count * 1000:>12.3f} | {sum(v[1] for v in values) / count * 1000:>12.3f}")
+    if not results['resumed']:
+        print("No resumed sessions - server did not accept the TLS session / ticket")
+
+    record_results('tls_session_reuse', 'mysql.connector pure python (PhaseTimedConnection)', [
+        metric_from_values(f"{name}.{kind}", [v[index] * 1000 for v in values], unit='ms')
+        for kind, values in results.items()
+        for index, name in ((0, 'connect_time'), (2, 'tls_handshake'), (1, 'cpu_time'))
+    ], started_at)
+
+
+def backend_distribution_test():
+    """ITERATIONS 번 접속하며 접속마다 붙은 인스턴스와 접속 시간을 기록하고 인스턴스별로 집계"""
+    started_at = datetime.now()
+    distribution = BackendDistribution()
+    connect_times = []
+    start = time.time()
+    for i in range(1, ITERATIONS + 1):
+        try:
+            start_time = time.time()
+            conn = mysql.connector.connect(**MYSQL_CONFIG)
+            connect_time = time.time() - start_time
+            backend = fetch_backend_id(conn)
+            conn.close()
+        except Exception as e:
+            print(f"연결 실패: {e}")
+            continue
+        distribution.record(backend, connect_time=connect_time)
+        connect_times.append(connect_time * 1000)
+        print(f"[{i:>3}] {backend or 'unknown'} 연결 소요시간: {connect_time:.6f}초")
+    elapsed = time.time() - start
+
+    for line in distribution.format_summary():
+        print(line)
+    print(f"Connections per second: {distribution.total_connections() / elapsed:.2f}")
+
+    record_results('backend_distribution', default_connector(), [
+        metric_from_values('connect_time', connect_times, unit='ms'),
+        metric_value('connections_per_second', distribution.total_connections() / elapsed, unit='conn/s', better='higher')
+    ], started_at)
 
 if __name__ == "__main__":
-    simple_test()
+    if BACKEND_DISTRIBUTION:
+        backend_distribution_test()
+    elif TLS_SESSION_REUSE:
+        session_reuse_test()
+    else:
+        simple_test()
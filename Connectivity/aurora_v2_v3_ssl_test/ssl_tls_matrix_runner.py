@@ -0,0 +1,390 @@
+"""
+Aurora v2 / v3 SSL 접속 매트릭스 테스트
+=======================================
+
+사용 목적:
+---------
+ssl_test_aurora_v2.py, ssl_test_aurora_v3.py, ssl_test_aurora_v3_nocursor.py 와
+../ssl_non-ssl_connection_test 의 use_ssl / non_use_ssl 스크립트로 나누어 하던 비교를
+하나의 매트릭스로 실행합니다. 모든 조합(cell)을 같은 부하 형태(쓰레드 수, 반복 횟수,
+대기 시간), 같은 warm-up, 같은 반복(repetition) 횟수로 실행한 뒤 초당 접속 수와
+지연시간 백분위를 한 표로 비교합니다.
+
+매트릭스 축 (MATRIX):
+-------------------
+- endpoints: ENDPOINTS 에 정의한 엔드포인트 이름 (예: Aurora v2 / v3 클러스터)
+- tls_versions: 'TLSv1.2', 'TLSv1.3'
+- cipher_suites: None(서버/클라이언트 기본값) 또는 cipher 이름 (tls_ciphersuites 로 전달)
+- ssl_disabled: False(SSL 사용), True(SSL 미사용 - tls_versions / cipher_suites 축은 무시)
+- cursor: True(접속 + 쿼리 실행), False(접속만 - nocursor 스크립트와 동일)
+
+실행 방식:
+---------
+- repetition 단위로 모든 cell 을 번갈아 실행하여 시간대에 따른 서버 상태 변화가
+  특정 cell 에만 몰리지 않도록 함
+- 각 cell 실행 전 쓰레드마다 warmup_iterations 회 접속 (측정 제외)
+- cell 별로 실제 협상된 TLS 버전 / cipher 를 SHOW SESSION STATUS 로 확인하며,
+  접속할 수 없는 조합(예: TLSv1.2 에 TLSv1.3 전용 cipher)은 건너뜀
+
+결과:
+----
+- 초당 접속 수: repetition 별 값의 평균 ± 표준편차
+- 지연시간: 모든 repetition 을 합친 LatencyHistogram 의 P50 / P95 / P99 / Max
+- vs base: 첫 번째 cell 대비 초당 접속 수 변화율
+- CPU us/conn: 측정 구간 동안 워커 쓰레드 CPU 시간(user + sys) / 성공한 접속 수 (클라이언트 CPU 비용)
+- DNS: 엔드포인트별 이름 해석 캐시 hit 비율, 레코드 변경 횟수, IP 별 분포 (dns_mode, Common/dns_resolver.py)
+- 결과 파일(tls_matrix_results_*.txt) 저장, 엔드포인트별로 결과 저장소에 기록
+"""
+
+import itertools
+import mysql.connector
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from client_cpu import add_usage, cpu_us_per, thread_snapshot, usage_delta
+from dns_resolver import CachingResolver
+from latency_histogram import LatencyHistogram
+from results_store import ResultsStore, fetch_server_version, metric_from_histogram, metric_from_values, metric_value
+
+# 엔드포인트 설정
+ENDPOINTS = {
+    'aurora_v2': {
+        'host': '',
+        'port': 3306,
+        'user': 'admin',
+        'password': '',
+        'database': 'test',
+        'ssl_ca': '~/ap-northeast-2-bundle.pem'
+    },
+    'aurora_v3': {
+        'host': '',
+        'port': 3306,
+        'user': 'admin',
+        'password': '',
+        'database': 'test',
+        'ssl_ca': '~/ap-northeast-2-bundle.pem'
+    }
+}
+
+# 매트릭스 설정 - 모든 축의 조합을 실행
+MATRIX = {
+    'endpoints': ['aurora_v2', 'aurora_v3'],
+    'tls_versions': ['TLSv1.2', 'TLSv1.3'],
+    'cipher_suites': [None],      # 예: [None, 'ECDHE-RSA-AES128-GCM-SHA256', 'TLS_AES_256_GCM_SHA384']
+    'ssl_disabled': [False, True],
+    'cursor': [True, False]
+}
+
+# 부하 설정 - 모든 cell 에 동일하게 적용
+LOAD_CONFIG = {
+    'num_threads': 10,          # 동시 실행할 쓰레드 수
+    'iterations': 100,          # repetition 당 각 쓰레드의 반복 횟수
+    'warmup_iterations': 5,     # 측정 전 쓰레드당 warm-up 접속 횟수
+    'repetitions': 3,           # cell 당 반복 실행 횟수
+    'sleep_time': 0.1,          # 반복 사이의 대기 시간(초)
+    'cell_pause': 2,            # cell 사이의 대기 시간(초)
+    'query': 'SELECT 1',        # cursor=True 일 때 실행할 쿼리
+    'dns_mode': 'system',       # 'system': 접속마다 이름 해석, 'cache': dns_cache_ttl 초 동안 재사용, 'pin': 수집한 IP 에 고정 (순환)
+    'dns_cache_ttl': 5,         # cache 모드: 해석 결과 재사용 시간(초) - Aurora 엔드포인트 DNS TTL 과 같음
+    'dns_pin_samples': 10,      # pin 모드: IP 수집을 위해 처음에 해석하는 횟수 (reader 엔드포인트는 조회마다 IP 가 바뀜)
+    'record_results': True,     # 결과를 Common/results_store.py 저장소(SQLite)에 기록
+    'results_label': None       # 실행 구분용 라벨 (예: 'before-upgrade')
+}
+
+
+def build_cells():
+    """MATRIX 의 조합 목록 - SSL 미사용 cell 은 TLS 버전 / cipher 축을 하나로 합침"""
+    cells = []
+    seen = set()
+    for endpoint, tls_version, cipher, ssl_disabled, cursor in itertools.product(
+            MATRIX['endpoints'], MATRIX['tls_versions'], MATRIX['cipher_suites'],
+            MATRIX['ssl_disabled'], MATRIX['cursor']):
+        if ssl_disabled:
+            tls_version, cipher = None, None
+        key = (endpoint, tls_version, cipher, ssl_disabled, cursor)
+        if key in seen:
+            continue
+        seen.add(key)
+        cells.append({
+            'endpoint': endpoint,
+            'tls_version': tls_version,
+            'cipher': cipher,
+            'ssl_disabled': ssl_disabled,
+            'cursor': cursor
+        })
+    return cells
+
+
+def cell_name(cell, with_endpoint=True):
+    parts = [cell['endpoint']] if with_endpoint else []
+    if cell['ssl_disabled']:
+        parts.append('nossl')
+    else:
+        parts.append(cell['tls_version'])
+        parts.append(cell['cipher'] or 'default')
+    parts.append('cursor' if cell['cursor'] else 'nocursor')
+    return '.'.join(parts)
+
+
+class MatrixCell:
+    def __init__(self, cell, resolver):
+        self.cell = cell
+        self.endpoint = ENDPOINTS[cell['endpoint']]
+        # 같은 엔드포인트의 cell 은 resolver 하나를 공유 (cache / pin 상태와 IP 분포를 엔드포인트 단위로 집계)
+        self.resolver = resolver
+        self.histogram = LatencyHistogram()
+        self.rates = []
+        self.attempts = 0
+        self.failed = 0
+        self.failures = []
+        self.cpu = None
+        self.actual_tls_version = None
+        self.actual_cipher = None
+        self.server_version = None
+        self.skip_reason = None
+
+    def connection_options(self, host=None):
+        options = dict(
+            host=host or self.endpoint['host'],
+            port=self.endpoint.get('port', 3306),
+            user=self.endpoint['user'],
+            password=self.endpoint['password'],
+            database=self.endpoint['database']
+        )
+        if self.cell['ssl_disabled']:
+            options['ssl_disabled'] = True
+        else:
+            options['ssl_ca'] = self.endpoint['ssl_ca']
+            options['tls_versions'] = [self.cell['tls_version']]
+            if self.cell['cipher']:
+                options['tls_ciphersuites'] = [self.cell['cipher']]
+        return options
+
+    def check_connection(self):
+        """실제 협상된 TLS 버전 / cipher 확인 - 접속할 수 없는 조합은 skip_reason 기록"""
+        try:
+            conn = mysql.connector.connect(**self.connection_options())
+            cursor = conn.cursor()
+            cursor.execute("SHOW SESSION STATUS WHERE Variable_name IN ('Ssl_version', 'Ssl_cipher')")
+            status = dict(cursor.fetchall())
+            cursor.close()
+            self.actual_tls_version = status.get('Ssl_version') or '-'
+            self.actual_cipher = status.get('Ssl_cipher') or '-'
+            self.server_version = fetch_server_version(conn)
+            conn.close()
+        except Exception as e:
+            self.skip_reason = str(e)
+
+    def connect_once(self, query):
+        """접속 1회 (이름 해석 포함, cursor 이면 쿼리 포함) 소요시간(나노초)"""
+        start = time.perf_counter_ns()
+        host, _ = self.resolver.resolve(self.endpoint['host'], self.endpoint.get('port', 3306))
+        conn = mysql.connector.connect(**self.connection_options(host))
+        if self.cell['cursor']:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            cursor.fetchall()
+            cursor.close()
+        elapsed = time.perf_counter_ns() - start
+        conn.close()
+        return elapsed
+
+    def worker(self, thread_id, warmup_iterations, iterations, barrier):
+        histogram = LatencyHistogram()
+        stats = {'attempts': 0, 'failed': 0, 'failures': []}
+        for _ in range(warmup_iterations):
+            try:
+                self.connect_once(LOAD_CONFIG['query'])
+            except Exception:
+                pass
+        # 모든 쓰레드의 warm-up 이 끝난 뒤 동시에 측정 시작
+        barrier.wait()
+        stats['start'] = time.time()
+        cpu_start = thread_snapshot()
+        for i in range(iterations):
+            stats['attempts'] += 1
+            try:
+                histogram.record(self.connect_once(LOAD_CONFIG['query']))
+            except Exception as e:
+                stats['failed'] += 1
+                stats['failures'].append(f"Thread {thread_id}, Iteration {i + 1}: {e}")
+            time.sleep(LOAD_CONFIG['sleep_time'])
+        stats['end'] = time.time()
+        stats['cpu'] = usage_delta(cpu_start, thread_snapshot())
+        return histogram, stats
+
+    def run_repetition(self):
+        """warm-up 후 한 번의 repetition 실행, 초당 접속 수 반환"""
+        num_threads = LOAD_CONFIG['num_threads']
+        barrier = threading.Barrier(num_threads)
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            futures = [
+                executor.submit(self.worker, i, LOAD_CONFIG['warmup_iterations'], LOAD_CONFIG['iterations'], barrier)
+                for i in range(num_threads)
+            ]
+            successful = 0
+            starts, ends = [], []
+            for future in futures:
+                histogram, stats = future.result()
+                self.histogram.merge(histogram)
+                successful += histogram.total_count
+                self.attempts += stats['attempts']
+                self.failed += stats['failed']
+                self.failures.extend(stats['failures'])
+                self.cpu = add_usage(self.cpu, stats['cpu'])
+                starts.append(stats['start'])
+                ends.append(stats['end'])
+        duration = max(ends) - min(starts)
+        rate = successful / duration if duration > 0 else 0
+        self.rates.append(rate)
+        return rate
+
+
+def run_matrix(cells):
+    for matrix_cell in cells:
+        matrix_cell.check_connection()
+        name = cell_name(matrix_cell.cell)
+        if matrix_cell.skip_reason:
+            print(f"Skipping {name}: {matrix_cell.skip_reason}")
+        else:
+            print(f"{name}: TLS {matrix_cell.actual_tls_version}, cipher {matrix_cell.actual_cipher}")
+
+    runnable = [c for c in cells if not c.skip_reason]
+    for repetition in range(1, LOAD_CONFIG['repetitions'] + 1):
+        print(f"\nRepetition {repetition}/{LOAD_CONFIG['repetitions']}")
+        for matrix_cell in runnable:
+            rate = matrix_cell.run_repetition()
+            p99 = matrix_cell.histogram.percentile(99) / 1e6
+            print(f"  {cell_name(matrix_cell.cell):<50} {rate:>10.2f} conn/s (cumulative P99 {p99:.3f}ms)")
+            time.sleep(LOAD_CONFIG['cell_pause'])
+
+
+def print_results(cells, resolvers):
+    runnable = [c for c in cells if not c.skip_reason and c.rates]
+    if not runnable:
+        print("No results to analyze")
+        return
+
+    base_rate = statistics.mean(runnable[0].rates)
+    result_text = []
+    result_text.append("\nTLS matrix results:")
+    result_text.append(f"Threads: {LOAD_CONFIG['num_threads']}, Iterations per thread: {LOAD_CONFIG['iterations']}, "
+                       f"Warm-up: {LOAD_CONFIG['warmup_iterations']}, Repetitions: {LOAD_CONFIG['repetitions']}, "
+                       f"Sleep: {LOAD_CONFIG['sleep_time']}s")
+    header = (f"{'Endpoint':<12} | {'TLS':<7} | {'Cipher':<28} | {'SSL':<3} | {'Cursor':<8} | "
+              f"{'Actual TLS':<10} | {'Conn/s (avg ± sd)':>19} | {'vs base':>8} | "
+              f"{'P50 (ms)':>9} | {'P95 (ms)':>9} | {'P99 (ms)':>9} | {'Max (ms)':>9} | {'CPU us/conn':>11} | {'Fail':>5}")
+    result_text.append(header)
+    result_text.append("-" * len(header))
+    for matrix_cell in runnable:
+        cell = matrix_cell.cell
+        rate = statistics.mean(matrix_cell.rates)
+        rate_sd = statistics.stdev(matrix_cell.rates) if len(matrix_cell.rates) > 1 else 0.0
+        histogram = matrix_cell.histogram
+        result_text.append(
+            f"{cell['endpoint']:<12} | {cell['tls_version'] or '-':<7} | "
+            f"{(matrix_cell.actual_cipher if not cell['ssl_disabled'] else '-'):<28} | "
+            f"{'off' if cell['ssl_disabled'] else 'on':<3} | {'cursor' if cell['cursor'] else 'nocursor':<8} | "
+            f"{matrix_cell.actual_tls_version:<10} | {rate:>10.2f} ± {rate_sd:>6.2f} | "
+            f"{(rate / base_rate - 1) * 100 if base_rate else 0:>+7.1f}% | "
+            f"{histogram.percentile(50) / 1e6:>9.3f} | {histogram.percentile(95) / 1e6:>9.3f} | "
+            f"{histogram.percentile(99) / 1e6:>9.3f} | {histogram.max_value / 1e6:>9.3f} | "
+            f"{cpu_us_per(matrix_cell.cpu, histogram.total_count):>11.1f} | {matrix_cell.failed:>5}")
+
+    skipped = [c for c in cells if c.skip_reason]
+    if skipped:
+        result_text.append("\nSkipped cells:")
+        for matrix_cell in skipped:
+            result_text.append(f"{cell_name(matrix_cell.cell)}: {matrix_cell.skip_reason}")
+
+    for endpoint, resolver in resolvers.items():
+        result_text.append(f"\n[{endpoint}]")
+        result_text.extend(resolver.format_summary())
+
+    failures = [f for c in runnable for f in c.failures]
+    if failures:
+        result_text.append("\nRecent Connection Failures (last 5):")
+        result_text.extend(failures[-5:])
+
+    print('\n'.join(result_text))
+
+    filename = f"tls_matrix_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    with open(filename, 'w') as f:
+        f.write('\n'.join(result_text))
+    print(f"\nResults saved to {filename}")
+
+
+def record_results(cells, start_time, resolvers):
+    """엔드포인트별로 실행 1건씩 기록 - metric 이름은 cell 이름 (예: TLSv1.3.default.cursor.connects_per_sec)"""
+    try:
+        store = ResultsStore()
+        for endpoint in MATRIX['endpoints']:
+            endpoint_cells = [c for c in cells if c.cell['endpoint'] == endpoint and not c.skip_reason and c.rates]
+            if not endpoint_cells:
+                continue
+            metrics = []
+            for matrix_cell in endpoint_cells:
+                name = cell_name(matrix_cell.cell, with_endpoint=False)
+                metrics.append(metric_from_values(f"{name}.connects_per_sec", matrix_cell.rates,
+                                                  unit='conn/s', better='higher'))
+                metrics.append(metric_from_histogram(f"{name}.latency", matrix_cell.histogram))
+                metrics.append(metric_value(f"{name}.client_cpu_us_per_connection",
+                                            cpu_us_per(matrix_cell.cpu, matrix_cell.histogram.total_count),
+                                            unit='us', better='lower'))
+            dns = resolvers[endpoint].stats()
+            metrics.append(metric_value('dns.cache_hit_rate', dns['cache_hits'] / dns['lookups'] * 100 if dns['lookups'] else 0.0,
+                                        unit='%', better='higher'))
+            metrics.append(metric_value('dns.record_changes', dns['changes'], unit='count', better='lower'))
+            config = dict(LOAD_CONFIG)
+            config['matrix'] = MATRIX
+            config['endpoint'] = {key: value for key, value in ENDPOINTS[endpoint].items() if key != 'password'}
+            run_id = store.record_run(
+                os.path.basename(__file__),
+                config,
+                metrics,
+                host=ENDPOINTS[endpoint]['host'],
+                server_version=endpoint_cells[0].server_version,
+                label=LOAD_CONFIG['results_label'],
+                started_at=start_time
+            )
+            print(f"Recorded {endpoint} as run {run_id} in {store.path}")
+        store.close()
+    except Exception as e:
+        print(f"Failed to record results: {e}")
+
+
+def main():
+    start_datetime = datetime.now()
+    print(f"Test started at: {start_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    resolvers = {
+        endpoint: CachingResolver(LOAD_CONFIG['dns_mode'], ttl=LOAD_CONFIG['dns_cache_ttl'],
+                                  pin_samples=LOAD_CONFIG['dns_pin_samples'])
+        for endpoint in MATRIX['endpoints']
+    }
+    cells = [MatrixCell(cell, resolvers[cell['endpoint']]) for cell in build_cells()]
+    print(f"Matrix cells: {len(cells)}")
+    run_matrix(cells)
+    print_results(cells, resolvers)
+
+    if LOAD_CONFIG['record_results']:
+        record_results(cells, start_datetime, resolvers)
+
+    end_datetime = datetime.now()
+    print(f"\nTest ended at: {end_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    duration = end_datetime - start_datetime
+    hours = duration.seconds // 3600
+    minutes = (duration.seconds % 3600) // 60
+    seconds = duration.seconds % 60
+
+    print(f"Total test duration: {hours}h {minutes}m {seconds}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,756 @@
+"""
+wait_timeout 테스트 환경 구성 (boto3, 병렬 프로비저닝)
+====================================================
+
+사용 목적:
+---------
+v1.1 과 같은 환경(파라미터 그룹, Aurora 클러스터 / 인스턴스, SSM 용 IAM 역할, Bastion)을 만들되
+단계를 의존 관계 그래프로 정의하여 서로 관계없는 단계는 동시에 실행합니다.
+- v1.1: 파라미터 그룹 -> 클러스터 -> 인스턴스 -> IAM -> Bastion -> SSM 순서 실행 (+ 고정 sleep 5/10/60/120초)
+- v1.2: IAM 역할 / Bastion / 패키지 설치를 클러스터, 인스턴스 생성과 동시에 진행하고
+        Aurora 인스턴스가 준비되면 테스트 스크립트만 배포
+
+단계 (의존 관계):
+---------------
+    cluster_parameter_group ─┐
+                             ├─ aurora_cluster ─┐
+    instance_parameter_group ┴──────────────────┴─ aurora_instance ─┐
+    iam_profile ─ bastion ─ ssm_online ─ bastion_packages ──────────┴─ bastion_scripts
+
+대기 방식:
+---------
+- 고정 sleep 대신 wait_until(): 상태 확인 간격을 initial_delay 부터 multiplier 배씩 max_delay 까지
+  늘리고(지수 backoff) 간격마다 jitter 적용, timeout 초과 시 TimeoutError
+- 생성 직후 전파 지연으로 실패하는 호출(새 인스턴스 프로파일로 run_instances,
+  삭제 중인 리소스가 사용하는 파라미터 그룹 삭제 등)은 call_with_retry() 로 같은 backoff 재시도
+- SSM 준비 확인: 에이전트 등록 후 명령 수신 여부를 probe 명령(true)으로 직접 확인
+
+SSM 명령 실행:
+------------
+- run_ssm_commands(): 서로 관계없는 명령 묶음을 한꺼번에 전송하고, 대기 중인 명령 전체의 상태를
+  list_commands 1회 호출로 확인 (명령마다 get_command_invocation 을 반복 호출하지 않음)
+- 끝난 명령의 출력은 나머지 명령을 기다리지 않고 바로 출력
+- 테스트 스크립트는 로컬에서 접속 정보를 치환한 tar.gz 를 명령 1개로 배포 (heredoc + sed 9단계 대신)
+
+사용 방법:
+---------
+1. 아래 사용자 변수(리전, VPC 보안 그룹, 서브넷, 비밀번호 등) 설정
+2. python3 wait_timeout_aws_sdk_test_v1.2.py
+   - --cleanup: 설정 완료 후 입력을 기다리지 않고 바로 리소스 정리
+   - --endpoint-url URL: AWS API 대신 로컬 endpoint 사용 (AWS_ENDPOINT_URL 환경 변수와 같음)
+
+오프라인 확인 (moto):
+-------------------
+    pip install "moto[server]"
+    MOTO_IAM_LOAD_MANAGED_POLICIES=true moto_server -p 5000 &   # AmazonSSMManagedInstanceCore 정책 포함
+    AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test \\
+        python3 wait_timeout_aws_sdk_test_v1.2.py --endpoint-url http://127.0.0.1:5000 --cleanup
+  * moto 에 없는 VPC 리소스는 사용자 변수를 moto 에서 만든 ID 로 바꿔서 실행
+  * 같은 프로세스에서 실행할 때는 moto.mock_aws() 안에서 main(['--cleanup']) 호출
+    (클라이언트는 main() 에서 생성하므로 mock 이 먼저 적용됨)
+"""
+
+import argparse
+import base64
+import io
+import json
+import random
+import tarfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import boto3
+from botocore.exceptions import ClientError
+from test_scripts import INTERACTIVE_SCRIPT, NON_INTERACTIVE_SCRIPT
+
+# AWS 리소스 설정
+AWS_REGION = "ap-northeast-2"  # 서울 리전  # 사용자 환경 변수
+DB_CLUSTER_IDENTIFIER = "mysql-test-cluster1"    # 사용자 변수
+DB_INSTANCE_IDENTIFIER = f"{DB_CLUSTER_IDENTIFIER}-instance"
+DB_CLUSTER_PARAMETER_GROUP = f"cl-{DB_CLUSTER_IDENTIFIER}"
+DB_PARAMETER_GROUP = f"pr-{DB_CLUSTER_IDENTIFIER}"
+DB_ENGINE = "aurora-mysql"
+DB_ENGINE_VERSION = "8.0.mysql_aurora.3.05.2"  # 사용자 변수
+DB_INSTANCE_CLASS = "db.t3.medium"  # 사용자 변수
+DB_NAME = "testdb"
+DB_USERNAME = 'admin'
+DB_PORT = 3306
+DB_PASSWORD = ""   # 사용자 변수
+DB_BACKUP_RETENTION_PERIOD = 1
+VPC_SECURITY_GROUP_ID = "sg-0ec74c9d52681276f"   # 사용자 환경 변수
+DB_SUBNET_GROUP_NAME = "my-dk-app-sbg"  # 사용자 환경 변수
+
+# Bastion 서버 설정
+BASTION_NAME = "mysql-test-bastion1"
+INSTANCE_TYPE = "t3.micro"
+SUBNET_ID = "subnet-006ee28d32d4c1635"    # 사용자 환경 변수
+SECURITY_GROUP_ID = "sg-0ec74c9d52681276f"   # 사용자 환경 변수
+ROLE_NAME = f"{BASTION_NAME}-role"
+INSTANCE_PROFILE_NAME = f"{BASTION_NAME}-profile"
+SSM_POLICY_ARN = 'arn:aws:iam::aws:policy/AmazonSSMManagedInstanceCore'
+TEST_DIR = "/home/ssm-user/wait_timeout_test"
+TEST_SCRIPTS = {
+    'wait_time_client_interactive_v1.0.py': INTERACTIVE_SCRIPT,
+    'wait_time_client_non_interactive_v1.0.py': NON_INTERACTIVE_SCRIPT
+}
+SSM_FINAL_STATUSES = ('Success', 'Failed', 'Cancelled', 'TimedOut')
+
+# 파라미터 그룹 설정 값
+CLUSTER_PARAMETERS = {'wait_timeout': '60', 'interactive_timeout': '30'}
+INSTANCE_PARAMETERS = {'wait_timeout': '50', 'interactive_timeout': '10'}
+
+# 대기 / 재시도 설정 (지수 backoff)
+BACKOFF = {
+    'initial_delay': 2,      # 첫 재확인 간격(초)
+    'max_delay': 30,         # 최대 재확인 간격(초)
+    'multiplier': 2,         # 간격 증가 배수
+    'timeout': 1800,         # 기본 최대 대기 시간(초)
+    'ssm_max_delay': 5       # SSM 명령 상태 확인 최대 간격(초) - 대부분 수 초 안에 끝남
+}
+TIMEOUTS = {
+    'aurora_cluster': 1800,
+    'aurora_instance': 3600,
+    'bastion': 600,
+    'ssm_online': 900,
+    'ssm_command': 900,
+    'delete': 3600
+}
+PIPELINE_WORKERS = 6   # 동시에 실행할 최대 단계 수
+
+_log_lock = threading.Lock()
+
+rds_client = None
+ec2_client = None
+ssm_client = None
+iam_client = None
+
+
+def create_clients(endpoint_url=None):
+    """AWS 클라이언트 생성 - endpoint_url 을 지정하면 로컬 endpoint(moto 등) 사용"""
+    global rds_client, ec2_client, ssm_client, iam_client
+    kwargs = {'region_name': AWS_REGION}
+    if endpoint_url:
+        kwargs['endpoint_url'] = endpoint_url
+    rds_client = boto3.client("rds", **kwargs)
+    ec2_client = boto3.client('ec2', **kwargs)
+    ssm_client = boto3.client("ssm", **kwargs)
+    iam_client = boto3.client('iam', **kwargs)
+
+
+def log(message):
+    """로깅 함수 - 파이프라인 단계에서 호출하면 단계 이름을 함께 출력"""
+    name = threading.current_thread().name
+    prefix = f"[{name}] " if name != 'MainThread' else ''
+    with _log_lock:
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {prefix}{message}")
+
+
+def error_code(e):
+    return e.response.get('Error', {}).get('Code') if isinstance(e, ClientError) else None
+
+
+def wait_until(description, check, timeout=None, max_delay=None):
+    """check() 가 None 이 아닌 값을 돌려줄 때까지 지수 backoff + jitter 간격으로 재확인하고 그 값을 반환"""
+    timeout = timeout or BACKOFF['timeout']
+    max_delay = max_delay or BACKOFF['max_delay']
+    delay = BACKOFF['initial_delay']
+    start = time.time()
+    attempts = 0
+    while True:
+        attempts += 1
+        result = check()
+        elapsed = time.time() - start
+        if result is not None:
+            log(f"{description}: 완료 (경과 시간: {int(elapsed)}초, 확인 {attempts}회)")
+            return result
+        if elapsed + delay > timeout:
+            raise TimeoutError(f"{description}: {timeout}초 안에 완료되지 않음")
+        # 여러 단계가 같은 API 를 동시에 호출하므로 간격의 절반 ~ 전체 사이에서 무작위로 대기
+        time.sleep(delay / 2 + random.uniform(0, delay / 2))
+        delay = min(delay * BACKOFF['multiplier'], max_delay)
+
+
+def call_with_retry(description, func, retry_codes, timeout=None, **kwargs):
+    """전파 지연 / 상태 충돌 오류(retry_codes)는 backoff 로 재시도하고 그 밖의 오류는 그대로 발생"""
+    def attempt():
+        try:
+            return func(**kwargs) or {}
+        except ClientError as e:
+            if error_code(e) in retry_codes:
+                log(f"{description}: {error_code(e)} - 재시도")
+                return None
+            raise
+    return wait_until(description, attempt, timeout)
+
+
+def status_check(description, fetch, ready, failed=()):
+    """fetch() 상태가 ready 가 되면 True, failed 상태면 예외 - 상태가 바뀔 때만 출력"""
+    last = {'status': None}
+
+    def check():
+        status = fetch()
+        if status != last['status']:
+            log(f"{description} 상태: {status}")
+            last['status'] = status
+        if status in failed:
+            raise RuntimeError(f"{description} 상태 {status}")
+        return True if status == ready else None
+    return check
+
+
+def run_pipeline(steps, max_workers=PIPELINE_WORKERS):
+    """steps = {이름: (함수, [선행 단계])} 를 의존 관계 순서로 병렬 실행
+
+    함수는 {선행 단계 이름: 결과} dict 를 받고, 실패한 단계에 의존하는 단계는 건너뜀
+    반환: (결과 dict, 실패 dict {이름: 사유}, 단계별 (시작, 종료) 시각)
+    """
+    results, failed, timings = {}, {}, {}
+    pending = dict(steps)
+    running = {}
+
+    def run_step(name, func, inputs):
+        threading.current_thread().name = name
+        try:
+            return func(inputs)
+        finally:
+            threading.current_thread().name = 'pipeline'
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name, (func, deps) in list(pending.items()):
+                failed_deps = [dep for dep in deps if dep in failed]
+                if failed_deps:
+                    failed[name] = f"skipped ({', '.join(failed_deps)} failed)"
+                    log(f"단계 건너뜀: {name} - 선행 단계 실패 ({', '.join(failed_deps)})")
+                    del pending[name]
+                elif all(dep in results for dep in deps):
+                    log(f"단계 시작: {name}")
+                    timings[name] = [time.time(), None]
+                    running[executor.submit(run_step, name, func, {dep: results[dep] for dep in deps})] = name
+                    del pending[name]
+            if not running:
+                if any(dep in failed for _, deps in pending.values() for dep in deps):
+                    # 방금 건너뛴 단계에 의존하는 단계는 다음 반복에서 처리
+                    continue
+                for name in pending:
+                    failed[name] = "unresolved dependency"
+                    log(f"단계 실행 불가: {name} - 선행 단계 없음")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                timings[name][1] = time.time()
+                try:
+                    results[name] = future.result()
+                    log(f"단계 완료: {name} ({timings[name][1] - timings[name][0]:.1f}초)")
+                except Exception as e:
+                    failed[name] = str(e)
+                    log(f"단계 실패: {name} - {e}")
+    return results, failed, timings
+
+
+def print_timeline(timings):
+    """단계별 시작 시점 / 소요 시간과 순차 실행 대비 절약 시간"""
+    if not timings:
+        return
+    origin = min(start for start, _ in timings.values())
+    end = max(finish for _, finish in timings.values() if finish)
+    print("\n=== 단계별 소요 시간 ===")
+    print(f"{'단계':<26} | {'시작(초)':>9} | {'소요(초)':>9}")
+    print("-" * 52)
+    for name, (start, finish) in sorted(timings.items(), key=lambda item: item[1][0]):
+        duration = f"{finish - start:9.1f}" if finish else f"{'-':>9}"
+        print(f"{name:<26} | {start - origin:9.1f} | {duration}")
+    total = sum(finish - start for start, finish in timings.values() if finish)
+    print(f"\n전체 경과 시간: {end - origin:.1f}초 (순차 실행 시 약 {total:.1f}초)")
+
+
+def create_parameter_group(kind):
+    """파라미터 그룹 생성 - kind 는 'cluster' 또는 'instance'"""
+    if kind == 'cluster':
+        name, parameters = DB_CLUSTER_PARAMETER_GROUP, CLUSTER_PARAMETERS
+        delete, create, modify = (rds_client.delete_db_cluster_parameter_group,
+                                  rds_client.create_db_cluster_parameter_group,
+                                  rds_client.modify_db_cluster_parameter_group)
+        name_key = 'DBClusterParameterGroupName'
+    else:
+        name, parameters = DB_PARAMETER_GROUP, INSTANCE_PARAMETERS
+        delete, create, modify = (rds_client.delete_db_parameter_group,
+                                  rds_client.create_db_parameter_group,
+                                  rds_client.modify_db_parameter_group)
+        name_key = 'DBParameterGroupName'
+
+    try:
+        delete(**{name_key: name})
+        log(f"기존 {kind} 파라미터 그룹 삭제됨: {name}")
+    except ClientError as e:
+        if error_code(e) not in ('DBParameterGroupNotFound', 'DBParameterGroupNotFoundFault'):
+            raise
+        log(f"신규 {kind} 파라미터 그룹을 생성합니다: {name}")
+
+    # 삭제 직후 같은 이름으로 생성하면 AlreadyExists 가 날 수 있으므로 sleep 대신 재시도
+    call_with_retry(f"{kind} 파라미터 그룹 생성", create,
+                    ('DBParameterGroupAlreadyExists', 'DBParameterGroupAlreadyExistsFault'),
+                    **{name_key: name,
+                       'DBParameterGroupFamily': 'aurora-mysql8.0',
+                       'Description': f'{kind.capitalize()} parameter group for {DB_CLUSTER_IDENTIFIER}'})
+    modify(**{name_key: name, 'Parameters': [
+        {'ParameterName': key, 'ParameterValue': value, 'ApplyMethod': 'immediate'}
+        for key, value in parameters.items()
+    ]})
+    log(f"{kind} 파라미터 그룹 설정 완료: {name} {parameters}")
+    return name
+
+
+def cluster_status():
+    return rds_client.describe_db_clusters(DBClusterIdentifier=DB_CLUSTER_IDENTIFIER)['DBClusters'][0]['Status']
+
+
+def instance_status():
+    return rds_client.describe_db_instances(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER)['DBInstances'][0]['DBInstanceStatus']
+
+
+def create_aurora_cluster(inputs):
+    """Aurora MySQL 클러스터 생성 후 available 까지 대기"""
+    rds_client.create_db_cluster(
+        DBClusterIdentifier=DB_CLUSTER_IDENTIFIER,
+        Engine=DB_ENGINE,
+        EngineVersion=DB_ENGINE_VERSION,
+        DatabaseName=DB_NAME,
+        MasterUsername=DB_USERNAME,
+        MasterUserPassword=DB_PASSWORD,
+        VpcSecurityGroupIds=[VPC_SECURITY_GROUP_ID],
+        DBSubnetGroupName=DB_SUBNET_GROUP_NAME,
+        Port=DB_PORT,
+        BackupRetentionPeriod=DB_BACKUP_RETENTION_PERIOD,
+        DBClusterParameterGroupName=inputs['cluster_parameter_group'],
+        DeletionProtection=False
+    )
+    log("Aurora 클러스터 생성 요청 완료.")
+    wait_until("Aurora 클러스터", status_check("Aurora 클러스터", cluster_status, 'available', ('failed',)),
+               TIMEOUTS['aurora_cluster'])
+    return DB_CLUSTER_IDENTIFIER
+
+
+def create_aurora_instance(inputs):
+    """Aurora 인스턴스 생성 후 available 까지 대기하고 클러스터 엔드포인트 반환"""
+    rds_client.create_db_instance(
+        DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER,
+        DBClusterIdentifier=inputs['aurora_cluster'],
+        Engine=DB_ENGINE,
+        DBInstanceClass=DB_INSTANCE_CLASS,
+        PubliclyAccessible=True,
+        DBParameterGroupName=inputs['instance_parameter_group']
+    )
+    log("Aurora 인스턴스 생성 요청 완료.")
+    wait_until("Aurora 인스턴스", status_check("Aurora 인스턴스", instance_status, 'available', ('failed',)),
+               TIMEOUTS['aurora_instance'])
+    endpoint = rds_client.describe_db_clusters(DBClusterIdentifier=DB_CLUSTER_IDENTIFIER)["DBClusters"][0]["Endpoint"]
+    log(f"Aurora 클러스터 엔드포인트: {endpoint}")
+    return endpoint
+
+
+def create_iam_profile(inputs):
+    """SSM 접근을 위한 IAM 역할과 인스턴스 프로파일 생성 (있으면 재사용)"""
+    try:
+        iam_client.get_instance_profile(InstanceProfileName=INSTANCE_PROFILE_NAME)
+        log(f"기존 인스턴스 프로파일 사용: {INSTANCE_PROFILE_NAME}")
+        return INSTANCE_PROFILE_NAME
+    except iam_client.exceptions.NoSuchEntityException:
+        log("새로운 IAM 역할 및 인스턴스 프로파일 생성")
+
+    trust_policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"Service": "ec2.amazonaws.com"},
+                "Action": "sts:AssumeRole"
+            }
+        ]
+    }
+    iam_client.create_role(RoleName=ROLE_NAME, AssumeRolePolicyDocument=json.dumps(trust_policy))
+    iam_client.attach_role_policy(RoleName=ROLE_NAME, PolicyArn=SSM_POLICY_ARN)
+    iam_client.create_instance_profile(InstanceProfileName=INSTANCE_PROFILE_NAME)
+    iam_client.add_role_to_instance_profile(InstanceProfileName=INSTANCE_PROFILE_NAME, RoleName=ROLE_NAME)
+    # IAM 은 최종 일관성 - 조회 가능해질 때까지 대기 (EC2 전파 지연은 run_instances 재시도로 처리)
+    iam_client.get_waiter('instance_profile_exists').wait(
+        InstanceProfileName=INSTANCE_PROFILE_NAME,
+        WaiterConfig={'Delay': BACKOFF['initial_delay'], 'MaxAttempts': 40}
+    )
+    log(f"IAM 설정 완료: {INSTANCE_PROFILE_NAME}")
+    return INSTANCE_PROFILE_NAME
+
+
+def find_bastions():
+    instances = ec2_client.describe_instances(
+        Filters=[
+            {'Name': 'tag:Name', 'Values': [BASTION_NAME]},
+            {'Name': 'instance-state-name', 'Values': ['pending', 'running', 'stopping', 'stopped']}
+        ]
+    )
+    return [instance['InstanceId'] for reservation in instances['Reservations'] for instance in reservation['Instances']]
+
+
+def ec2_state(instance_id):
+    return lambda: ec2_client.describe_instances(InstanceIds=[instance_id])['Reservations'][0]['Instances'][0]['State']['Name']
+
+
+def terminate_bastions():
+    """같은 이름의 기존 Bastion 종료 후 terminated 까지 대기"""
+    for instance_id in find_bastions():
+        log(f"기존 Bastion 서버 종료 요청: {instance_id}")
+        ec2_client.terminate_instances(InstanceIds=[instance_id])
+        wait_until(f"Bastion {instance_id} 종료",
+                   status_check(f"Bastion {instance_id}", ec2_state(instance_id), 'terminated'),
+                   TIMEOUTS['bastion'])
+
+
+def create_bastion(inputs):
+    """Bastion 서버 생성 후 running 까지 대기하고 인스턴스 ID 반환"""
+    terminate_bastions()
+
+    # 최신 Amazon Linux 2023 AMI 조회
+    ami_response = ec2_client.describe_images(
+        Owners=['amazon'],
+        Filters=[
+            {'Name': 'name', 'Values': ['al2023-ami-2023.*-x86_64']},
+            {'Name': 'state', 'Values': ['available']}
+        ]
+    )
+    ami_id = sorted(ami_response['Images'], key=lambda x: x['CreationDate'], reverse=True)[0]['ImageId']
+
+    # 새로 만든 인스턴스 프로파일이 EC2 에 전파되기 전이면 InvalidParameterValue - 재시도
+    response = call_with_retry(
+        "Bastion 서버 생성", ec2_client.run_instances, ('InvalidParameterValue',), TIMEOUTS['bastion'],
+        ImageId=ami_id,
+        InstanceType=INSTANCE_TYPE,
+        MaxCount=1,
+        MinCount=1,
+        SecurityGroupIds=[SECURITY_GROUP_ID],
+        SubnetId=SUBNET_ID,
+        TagSpecifications=[
+            {
+                'ResourceType': 'instance',
+                'Tags': [{'Key': 'Name', 'Value': BASTION_NAME}]
+            }
+        ],
+        IamInstanceProfile={'Name': inputs['iam_profile']}
+    )
+    instance_id = response['Instances'][0]['InstanceId']
+    log(f"Bastion 서버 생성 시작됨. 인스턴스 ID: {instance_id}")
+    wait_until("Bastion 서버 실행", status_check("Bastion 서버", ec2_state(instance_id), 'running', ('terminated',)),
+               TIMEOUTS['bastion'])
+    return instance_id
+
+
+def send_ssm_command(instance_id, commands, description):
+    """명령 목록을 invocation 1개로 전송 (set -e: 중간 명령이 실패하면 중단) - CommandId 반환"""
+    return call_with_retry(
+        f"{description} 요청", ssm_client.send_command, ('InvalidInstanceId',), TIMEOUTS['ssm_online'],
+        InstanceIds=[instance_id],
+        DocumentName="AWS-RunShellScript",
+        Comment=description[:100],
+        Parameters={"commands": ['set -e'] + list(commands)}
+    )["Command"]["CommandId"]
+
+
+def run_ssm_commands(instance_id, batch, timeout=None):
+    """batch = [(설명, [명령, ...])] 의 항목을 모두 전송한 뒤 한꺼번에 완료 대기
+
+    - 항목끼리는 SSM 에이전트에서 동시에 실행, 항목 안의 명령은 순서대로 실행
+    - 대기 중인 명령 전체의 상태를 list_commands 호출 1번으로 확인 (backoff 간격)
+    - 끝난 명령은 다른 명령을 기다리지 않고 바로 출력
+    반환: {설명: 표준 출력}, 실패한 항목이 있으면 모두 끝난 뒤 RuntimeError
+    """
+    invoked_after = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() - 60))
+    pending = {send_ssm_command(instance_id, commands, description): description
+               for description, commands in batch}
+    statuses = {}
+    results = {}
+
+    def poll():
+        paginator = ssm_client.get_paginator('list_commands')
+        for page in paginator.paginate(InstanceId=instance_id,
+                                       Filters=[{'key': 'InvokedAfter', 'value': invoked_after}]):
+            for command in page['Commands']:
+                command_id = command['CommandId']
+                if command_id not in pending:
+                    continue
+                status = command['Status']
+                if status != statuses.get(command_id):
+                    log(f"{pending[command_id]} 상태: {status}")
+                    statuses[command_id] = status
+                if status in SSM_FINAL_STATUSES:
+                    description = pending.pop(command_id)
+                    results[description] = ssm_client.get_command_invocation(CommandId=command_id, InstanceId=instance_id)
+                    print_ssm_output(description, results[description])
+        return results if not pending else None
+
+    wait_until(f"SSM 명령 {len(batch)}개", poll, timeout or TIMEOUTS['ssm_command'], BACKOFF['ssm_max_delay'])
+    failed = [description for description, result in results.items() if result['Status'] != 'Success']
+    if failed:
+        raise RuntimeError(f"SSM 명령 실패: {', '.join(failed)}")
+    return {description: result.get('StandardOutputContent', '') for description, result in results.items()}
+
+
+def print_ssm_output(description, result):
+    output = result.get('StandardOutputContent', '').strip()
+    error = result.get('StandardErrorContent', '').strip()
+    if output:
+        log(f"{description} 출력:\n{output}")
+    if error and result['Status'] != 'Success':
+        log(f"{description} 오류:\n{error}")
+
+
+def wait_ssm_online(inputs):
+    """SSM 에이전트가 등록되어 명령을 받을 수 있을 때까지 대기 (probe 명령 성공 기준)"""
+    instance_id = inputs['bastion']
+    run_ssm_commands(instance_id, [("SSM 연결 확인", ["true"])], TIMEOUTS['ssm_online'])
+    return instance_id
+
+
+def install_bastion_packages(inputs):
+    """Bastion 기본 환경 설정 - 서로 관계없는 사용자 / 패키지 준비를 동시에 실행"""
+    instance_id = inputs['ssm_online']
+    run_ssm_commands(instance_id, [
+        ("ssm-user 환경 준비", [
+            "id ssm-user || sudo useradd -m ssm-user",
+            f"sudo mkdir -p {TEST_DIR}",
+            "sudo chown -R ssm-user /home/ssm-user"
+        ]),
+        # 전체 yum update 는 테스트에 필요 없고 가장 오래 걸리므로 필요한 패키지만 설치
+        ("pip 설치", ["sudo yum install -y python3-pip"])
+    ])
+    run_ssm_commands(instance_id, [
+        ("MySQL 커넥터 설치", ["sudo -u ssm-user pip3 install --user mysql-connector-python"])
+    ])
+    return instance_id
+
+
+def build_script_archive(replacements):
+    """테스트 스크립트의 접속 정보를 로컬에서 치환하여 tar.gz 로 묶고 base64 문자열로 반환
+
+    스크립트에는 'your_password' 처럼 따옴표로 감싼 placeholder 가 있으므로 따옴표까지 repr(값) 으로 바꿈
+    (값에 ' 나 \\ 가 있어도 올바른 Python 문자열 literal 이 됨)
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for file_name, script in TEST_SCRIPTS.items():
+            for placeholder, value in replacements.items():
+                quoted = f"'{placeholder}'"
+                if quoted not in script:
+                    raise ValueError(f"{file_name}: placeholder {quoted} not found")
+                script = script.replace(quoted, repr(value))
+            data = script.encode()
+            info = tarfile.TarInfo(file_name)
+            info.size = len(data)
+            info.mode = 0o755
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(data))
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def deploy_test_scripts(inputs):
+    """Aurora 엔드포인트가 정해진 뒤 테스트 스크립트 배포
+
+    heredoc 으로 스크립트 본문을 보내고 sed 로 접속 정보를 바꾸던 명령 9개 대신
+    로컬에서 치환한 압축 파일을 명령 1개로 풀어 배포 (비밀번호의 따옴표 / 역슬래시 등도 그대로 전달)
+    """
+    instance_id = inputs['bastion_packages']
+    archive = build_script_archive({
+        'your_aurora_endpoint': inputs['aurora_instance'],
+        'your_database': DB_NAME,
+        'your_username': DB_USERNAME,
+        'your_password': DB_PASSWORD
+    })
+    run_ssm_commands(instance_id, [
+        ("테스트 스크립트 배포", [
+            f"echo '{archive}' | base64 -d | sudo tar xzf - -C {TEST_DIR}",
+            f"sudo chown -R ssm-user:ssm-user {TEST_DIR}",
+            f"ls -l {TEST_DIR}"
+        ])
+    ])
+    return instance_id
+
+
+PROVISION_STEPS = {
+    'cluster_parameter_group': (lambda inputs: create_parameter_group('cluster'), []),
+    'instance_parameter_group': (lambda inputs: create_parameter_group('instance'), []),
+    'aurora_cluster': (create_aurora_cluster, ['cluster_parameter_group']),
+    'aurora_instance': (create_aurora_instance, ['aurora_cluster', 'instance_parameter_group']),
+    'iam_profile': (create_iam_profile, []),
+    'bastion': (create_bastion, ['iam_profile']),
+    'ssm_online': (wait_ssm_online, ['bastion']),
+    'bastion_packages': (install_bastion_packages, ['ssm_online']),
+    'bastion_scripts': (deploy_test_scripts, ['bastion_packages', 'aurora_instance'])
+}
+
+
+def delete_aurora_instance(inputs):
+    try:
+        rds_client.delete_db_instance(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER, SkipFinalSnapshot=True)
+    except ClientError as e:
+        if error_code(e) == 'DBInstanceNotFound':
+            return None
+        raise
+    log(f"Aurora 인스턴스 삭제 시작: {DB_INSTANCE_IDENTIFIER}")
+
+    def deleted():
+        try:
+            instance_status()
+        except ClientError as e:
+            if error_code(e) == 'DBInstanceNotFound':
+                return True
+            raise
+        return None
+    return wait_until("Aurora 인스턴스 삭제", deleted, TIMEOUTS['delete'])
+
+
+def delete_aurora_cluster(inputs):
+    try:
+        rds_client.delete_db_cluster(DBClusterIdentifier=DB_CLUSTER_IDENTIFIER, SkipFinalSnapshot=True)
+    except ClientError as e:
+        if error_code(e) == 'DBClusterNotFoundFault':
+            return None
+        raise
+    log(f"Aurora 클러스터 삭제 시작: {DB_CLUSTER_IDENTIFIER}")
+
+    def deleted():
+        try:
+            cluster_status()
+        except ClientError as e:
+            if error_code(e) == 'DBClusterNotFoundFault':
+                return True
+            raise
+        return None
+    return wait_until("Aurora 클러스터 삭제", deleted, TIMEOUTS['delete'])
+
+
+def delete_parameter_groups(inputs):
+    """클러스터 삭제 후에도 잠시 사용 중으로 남으므로 InvalidDBParameterGroupState 는 재시도"""
+    retry = ('InvalidDBParameterGroupState', 'InvalidDBParameterGroupStateFault')
+    for description, func, kwargs in [
+        ("인스턴스 파라미터 그룹 삭제", rds_client.delete_db_parameter_group,
+         {'DBParameterGroupName': DB_PARAMETER_GROUP}),
+        ("클러스터 파라미터 그룹 삭제", rds_client.delete_db_cluster_parameter_group,
+         {'DBClusterParameterGroupName': DB_CLUSTER_PARAMETER_GROUP})
+    ]:
+        try:
+            call_with_retry(description, func, retry, TIMEOUTS['delete'], **kwargs)
+        except ClientError as e:
+            if error_code(e) not in ('DBParameterGroupNotFound', 'DBParameterGroupNotFoundFault'):
+                raise
+    return True
+
+
+def delete_bastion(inputs):
+    terminate_bastions()
+    return True
+
+
+def delete_iam_profile(inputs):
+    """Bastion 종료 후 IAM 역할 / 인스턴스 프로파일 정리"""
+    for func, kwargs in [
+        (iam_client.remove_role_from_instance_profile, {'InstanceProfileName': INSTANCE_PROFILE_NAME, 'RoleName': ROLE_NAME}),
+        (iam_client.delete_instance_profile, {'InstanceProfileName': INSTANCE_PROFILE_NAME}),
+        (iam_client.detach_role_policy, {'RoleName': ROLE_NAME, 'PolicyArn': SSM_POLICY_ARN}),
+        (iam_client.delete_role, {'RoleName': ROLE_NAME})
+    ]:
+        try:
+            func(**kwargs)
+        except iam_client.exceptions.NoSuchEntityException:
+            pass
+    log("IAM 리소스 정리 완료")
+    return True
+
+
+CLEANUP_STEPS = {
+    'delete_aurora_instance': (delete_aurora_instance, []),
+    'delete_aurora_cluster': (delete_aurora_cluster, ['delete_aurora_instance']),
+    'delete_parameter_groups': (delete_parameter_groups, ['delete_aurora_cluster']),
+    'delete_bastion': (delete_bastion, []),
+    'delete_iam_profile': (delete_iam_profile, ['delete_bastion'])
+}
+
+
+def cleanup_resources():
+    """생성된 모든 리소스 정리 - RDS 와 Bastion / IAM 정리를 동시에 진행"""
+    log("리소스 정리를 시작합니다...")
+    _, failed, timings = run_pipeline(CLEANUP_STEPS)
+    print_timeline(timings)
+    for name, reason in failed.items():
+        log(f"정리 실패: {name} - {reason}")
+    log("리소스 정리 완료")
+    return not failed
+
+
+def print_summary(aurora_endpoint, instance_id):
+    instance_info = ec2_client.describe_instances(InstanceIds=[instance_id])
+    private_ip = instance_info['Reservations'][0]['Instances'][0].get('PrivateIpAddress')
+
+    print("\n=== 설정 완료 ===")
+    print("▶ Aurora 정보")
+    print(f"  • 엔드포인트: {aurora_endpoint}")
+    print("\n▶ Bastion 서버 정보")
+    print(f"  • 인스턴스 ID: {instance_id}")
+    print(f"  • 프라이빗 IP: {private_ip}")
+
+    print("\n▶ SSM 설정 정보")
+    print("  • SSM 접속 권한: 설정 완료")
+    print(f"  • IAM 역할: {ROLE_NAME}")
+
+    print("\n▶ Bastion 서버 접속 방법")
+    print(f"  aws ssm start-session --target {instance_id} --region {AWS_REGION}")
+
+    print("\n▶ 다음 단계")
+    print("  1. Bastion 서버 접속 후 테스트 디렉토리로 이동:")
+    print("     cd /home/ssm-user/wait_timeout_test")
+    print("\n  2. 테스트 스크립트 실행:")
+    print("     python3 wait_time_client_interactive_v1.0.py")
+    print("     python3 wait_time_client_non_interactive_v1.0.py")
+
+    print("\n▶ 데이터베이스 접속 정보")
+    print(f"  • 호스트: {aurora_endpoint}")
+    print(f"  • 데이터베이스: {DB_NAME}")
+    print(f"  • 사용자: {DB_USERNAME}")
+    print("  • 비밀번호: (설정한 마스터 비밀번호)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Provision the wait_timeout test environment in parallel")
+    parser.add_argument('--endpoint-url', default=None, help="local AWS API endpoint (e.g. moto_server)")
+    parser.add_argument('--cleanup', action='store_true', help="clean up right after setup without prompting")
+    args = parser.parse_args(argv)
+
+    create_clients(args.endpoint_url)
+    try:
+        start = time.time()
+        results, failed, timings = run_pipeline(PROVISION_STEPS)
+        print_timeline(timings)
+        if failed:
+            for name, reason in failed.items():
+                log(f"실패: {name} - {reason}")
+            if args.cleanup:
+                cleanup_resources()
+            raise Exception("환경 구성 실패")
+        log(f"환경 구성 완료 ({time.time() - start:.1f}초)")
+        print_summary(results['aurora_instance'], results['bastion_scripts'])
+
+        # 테스트 완료 후 리소스 정리
+        if args.cleanup:
+            return 0 if cleanup_resources() else 1
+        while True:
+            user_input = input("\n테스트가 완료되었으면 'cleanup'을 입력하여 리소스를 정리하세요: ")
+            if user_input.lower() == 'cleanup':
+                return 0 if cleanup_resources() else 1
+            print("잘못된 입력입니다. 'cleanup'을 입력하세요.")
+
+    except Exception as e:
+        log(f"\n오류 발생: {str(e)}")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
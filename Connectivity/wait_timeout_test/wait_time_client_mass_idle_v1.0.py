@@ -0,0 +1,433 @@
+"""
+MySQL Mass Idle Connection Timeout Test Script
+==============================================
+
+사용 목적:
+---------
+wait_time_client_interactive_v1.0.py / wait_time_client_non_interactive_v1.0.py 는 커넥션 1개를
+열어 두고 wait_timeout 이 지난 뒤 SELECT 1 로 끊겼는지 확인합니다.
+이 스크립트는 실제 운영 idle 풀 크기(수천 개)의 interactive / non-interactive 커넥션을
+한 프로세스에서 열어 두고, 서버가 각 커넥션을 끊는 정확한 시각을 기록합니다.
+- timeout 이 설정 값대로 적용되는지 (커넥션별 지연 = 끊긴 시각 - (마지막 쿼리 시각 + timeout))
+- 서버가 수천 개 세션을 정리하는 데 걸리는 시간 (첫 / 마지막 끊김 간격, 초당 끊김 수)
+- 정리 동안 서버 Threads_connected / Threads_cached / Aborted_clients / processlist 크기 / CPU 곡선
+  (Common/server_thread_sampler.py, 초당 1행 CSV)
+- 클라이언트가 끊김을 받은 뒤 서버 processlist 에서 세션이 사라지기까지의 시간
+  (Common/processlist_snapshot.py - status_interval 마다 전체 세션을 한 번에 읽어 connection id 로 조회)
+
+측정 방식:
+---------
+- 접속(핸드셰이크)은 connect_concurrency 개 쓰레드에서 수행하고, 접속이 끝난 소켓은
+  이벤트 루프 1개(epoll)에 등록하여 대기 - 커넥션마다 쓰레드나 sleep 루프를 두지 않음
+- 쿼리로 확인(probe)하지 않고 소켓 읽기 이벤트로 끊김 감지
+  * MySQL 8.0.24 이상: 서버가 끊기 전에 오류 패킷(4031 ER_CLIENT_INTERACTION_TIMEOUT)을 보냄
+  * 그 이전 버전: 오류 패킷 없이 EOF
+  * 끊긴 시각 = 서버에서 처음 데이터(오류 패킷) 또는 EOF 가 도착한 시각
+- interactive 커넥션의 세션 wait_timeout 은 접속 시 interactive_timeout 값으로 초기화되므로
+  접속 직후 @@session.wait_timeout 을 커넥션별 기대 timeout 으로 사용
+
+사용 방법:
+---------
+1. 필요한 라이브러리 설치:
+   pip install mysql-connector-python
+
+2. MYSQL_CONFIG 에 접속 정보, TEST_CONFIG 에 커넥션 수 설정
+   - 서버 max_connections 가 커넥션 수 + 여유분 이상인지 확인
+   - 테스트 시간을 줄이려면 session_wait_timeout 으로 커넥션별 timeout 지정 (예: 60)
+
+3. 스크립트 실행:
+   python wait_time_client_mass_idle_v1.0.py
+
+출력 정보:
+---------
+- 종류(interactive / non-interactive)별 접속 / 끊김 / 남은 커넥션 수
+- 종류별 timeout 값과 지연(초) min / avg / P50 / P99 / max, 서버 오류 코드별 건수
+- 종류별 첫 / 마지막 끊김 간격과 최대 초당 끊김 수
+- 서버 Threads_connected 최대 / 종료 후 값, Threads_created / Aborted_clients 증가량,
+  초당 끊김이 가장 많았던 구간의 statement CPU / 정리 mutex wait
+- 커넥션별 기록 CSV (mass_idle_disconnects_YYYYMMDD_HHMMSS.csv)
+- 서버 쓰레드 곡선 CSV (mass_idle_server_threads_YYYYMMDD_HHMMSS.csv)
+
+종료:
+----
+- 모든 커넥션이 끊기거나 가장 늦은 기대 종료 시각 + grace_seconds 가 지나면 종료
+- 수동 종료: Ctrl+C (그때까지의 결과 출력)
+
+참고:
+----
+- 프로세스 파일 디스크립터 soft limit 을 hard limit 까지 올림 (커넥션 수보다 작으면 접속 실패)
+- 서버 상태 조회용 커넥션 1개를 별도로 사용 (status_interval 마다 쿼리하므로 끊기지 않음)
+- 다른 wait_timeout 스크립트와 함께 쓸 때는 샘플러만 단독 실행:
+  python3 ../../Common/server_thread_sampler.py --host HOST --user USER --password PW --seconds 600 --csv out.csv
+"""
+
+import asyncio
+import csv
+import math
+import mysql.connector
+import os
+import ssl
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from open_files_limit import raise_open_files_limit
+from processlist_snapshot import ProcesslistSnapshot
+from server_thread_sampler import ServerThreadSampler
+
+# MySQL 설정
+MYSQL_CONFIG = {
+    'host': '',
+    'database': '',
+    'user': '',
+    'password': ''
+}
+
+# 테스트 설정
+TEST_CONFIG = {
+    'interactive_connections': 1000,      # interactive 커넥션 수 (interactive_timeout 적용)
+    'non_interactive_connections': 1000,  # non-interactive 커넥션 수 (wait_timeout 적용)
+    'connect_concurrency': 50,            # 동시에 접속(핸드셰이크)하는 쓰레드 수
+    'session_wait_timeout': None,         # 지정하면 접속마다 SET SESSION wait_timeout (None 이면 서버 설정 사용)
+    'grace_seconds': 30,                  # 가장 늦은 기대 종료 시각 이후 추가로 기다리는 시간(초)
+    'sample_server': True,                # 서버 쓰레드 / CPU 곡선 샘플링 (Common/server_thread_sampler.py)
+    'status_interval': 1,                 # 서버 상태(Threads_connected 등) 조회 간격(초)
+    'print_status': False,                # 샘플마다 서버 상태 한 줄 출력
+    'track_processlist': True,            # 커넥션별 서버 세션 상태 / processlist 제거 시각 추적
+    'log_interval': 5                     # 진행 상황 출력 간격(초)
+}
+
+KINDS = ['interactive', 'non-interactive']
+
+
+def log_message(message):
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{current_time}] {message}")
+
+
+def percentile(sorted_values, pct):
+    """정렬된 목록의 nearest-rank 백분위수"""
+    return sorted_values[max(0, math.ceil(len(sorted_values) * pct / 100) - 1)]
+
+
+def parse_error_packet(data):
+    """서버가 끊기 전에 보내는 오류 패킷 (0xff, errno, #sqlstate, message) - 오류 패킷이 아니면 (None, None)"""
+    if len(data) < 7 or data[4] != 0xff:
+        return None, None
+    errno = int.from_bytes(data[5:7], 'little')
+    message = data[7:]
+    if message[:1] == b'#':
+        message = message[6:]
+    return errno, message.decode('utf-8', 'replace')
+
+
+class MassIdleTester:
+    def __init__(self, db_config):
+        self.db_config = db_config
+        self.records = []
+        self.connect_failures = {}
+        self.sampler = None
+        self.processlist = None
+        self.loop = None
+        self.open_count = 0
+        self.all_closed = None
+
+    def open_idle_connection(self, kind):
+        """접속 후 connection id 와 세션 timeout 을 확인하고 idle 상태로 둠 (접속 쓰레드에서 실행)"""
+        flag = mysql.connector.constants.ClientFlag.INTERACTIVE
+        conn = mysql.connector.connect(
+            host=self.db_config['host'],
+            database=self.db_config['database'],
+            user=self.db_config['user'],
+            password=self.db_config['password'],
+            use_pure=True,
+            client_flags=[flag if kind == 'interactive' else -flag]
+        )
+        cursor = conn.cursor()
+        if TEST_CONFIG['session_wait_timeout'] is not None:
+            cursor.execute(f"SET SESSION wait_timeout = {int(TEST_CONFIG['session_wait_timeout'])}")
+        cursor.execute("SELECT CONNECTION_ID(), @@session.wait_timeout")
+        connection_id, timeout = cursor.fetchone()
+        cursor.close()
+        # 마지막 쿼리 응답 시각부터 idle
+        idle_start = time.time()
+        return {
+            'kind': kind,
+            'conn': conn,
+            'sock': conn._socket.sock,
+            'connection_id': connection_id,
+            'timeout': int(timeout),
+            'idle_start': idle_start,
+            'disconnect': None,
+            'server_command': None,
+            'removed': None,
+            'eof': None,
+            'errno': None,
+            'message': None
+        }
+
+    def watch(self, record):
+        """소켓을 이벤트 루프에 등록 - 서버에서 데이터 또는 EOF 가 오면 on_readable 호출"""
+        record['sock'].setblocking(False)
+        self.open_count += 1
+        self.loop.add_reader(record['sock'].fileno(), self.on_readable, record)
+
+    def on_readable(self, record):
+        sock = record['sock']
+        try:
+            data = sock.recv(4096)
+        except (BlockingIOError, ssl.SSLWantReadError):
+            # TLS 레코드 일부만 도착
+            return
+        except ssl.SSLZeroReturnError:
+            data = b''
+        except OSError as e:
+            data = b''
+            record['message'] = record['message'] or str(e)
+        now = time.time()
+        if record['disconnect'] is None:
+            record['disconnect'] = now
+        if data:
+            errno, message = parse_error_packet(data)
+            if errno is not None:
+                record['errno'], record['message'] = errno, message
+            return
+        record['eof'] = now
+        self.loop.remove_reader(sock.fileno())
+        self.open_count -= 1
+        if self.open_count == 0 and self.all_closed is not None:
+            self.all_closed.set()
+
+    def monitor_connection(self):
+        """샘플러 / processlist 스냅샷 전용 커넥션"""
+        return mysql.connector.connect(
+            host=self.db_config['host'],
+            database=self.db_config['database'],
+            user=self.db_config['user'],
+            password=self.db_config['password']
+        )
+
+    def on_processlist(self, rows, taken_at):
+        """스냅샷마다 호출 - 끊긴 커넥션의 세션이 목록에서 처음 사라진 시각 기록"""
+        for record in list(self.records):
+            if record['disconnect'] is not None and record['removed'] is None \
+                    and record['connection_id'] not in rows:
+                record['removed'] = taken_at
+
+    def start_processlist(self):
+        snapshot = ProcesslistSnapshot(self.monitor_connection, interval=TEST_CONFIG['status_interval'],
+                                       on_refresh=self.on_processlist)
+        try:
+            snapshot.start()
+        except Exception as e:
+            log_message(f"Processlist tracking disabled: {e}")
+            snapshot.close()
+            return
+        self.processlist = snapshot
+
+    def inspect_sessions(self):
+        """모든 커넥션의 서버 세션 상태를 최근 스냅샷에서 조회 (커넥션당 쿼리 없음)"""
+        # 접속 직후 상태를 보기 위해 즉시 갱신 - refresh() 는 갱신 쓰레드와 lock 으로 직렬화됨
+        self.processlist.refresh()
+        for record in self.records:
+            row = self.processlist.get(record['connection_id'])
+            record['server_command'] = row['COMMAND'] if row else None
+
+    def start_sampler(self):
+        """별도 커넥션으로 서버 쓰레드 상태 샘플링 시작 - 실패해도 테스트는 계속"""
+        sampler = ServerThreadSampler(
+            self.monitor_connection,
+            interval=TEST_CONFIG['status_interval'],
+            csv_path=f"mass_idle_server_threads_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            verbose=TEST_CONFIG['print_status']
+        )
+        try:
+            sampler.start()
+        except Exception as e:
+            log_message(f"Server status sampler disabled: {e}")
+            sampler.close()
+            return
+        self.sampler = sampler
+
+    async def open_connections(self):
+        """connect_concurrency 개 쓰레드로 접속하고 끝나는 대로 이벤트 루프에 등록"""
+        counts = {'interactive': TEST_CONFIG['interactive_connections'],
+                  'non-interactive': TEST_CONFIG['non_interactive_connections']}
+        # 두 종류를 번갈아 열어 idle 시작 시각이 비슷하게 분포하도록 함
+        kinds = []
+        for i in range(max(counts.values())):
+            kinds.extend(kind for kind in KINDS if i < counts[kind])
+        with ThreadPoolExecutor(max_workers=TEST_CONFIG['connect_concurrency']) as executor:
+            futures = [self.loop.run_in_executor(executor, self.open_idle_connection, kind) for kind in kinds]
+            for done, future in enumerate(asyncio.as_completed(futures), 1):
+                try:
+                    record = await future
+                except Exception as e:
+                    self.connect_failures[str(e)] = self.connect_failures.get(str(e), 0) + 1
+                    continue
+                self.records.append(record)
+                self.watch(record)
+                if done % 500 == 0:
+                    log_message(f"Opened {len(self.records)} of {len(kinds)} connections")
+        log_message(f"Opened {len(self.records)} connections "
+                    f"({sum(self.connect_failures.values())} failed)")
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.all_closed = asyncio.Event()
+        if TEST_CONFIG['sample_server']:
+            await self.loop.run_in_executor(None, self.start_sampler)
+        if TEST_CONFIG['track_processlist']:
+            await self.loop.run_in_executor(None, self.start_processlist)
+        try:
+            await self.open_connections()
+            if not self.records:
+                return
+            if self.processlist is not None:
+                await self.loop.run_in_executor(None, self.inspect_sessions)
+                commands = {}
+                for record in self.records:
+                    commands[record['server_command']] = commands.get(record['server_command'], 0) + 1
+                log_message("Server sessions: " + ', '.join(
+                    f"{command or 'not listed'} {count}" for command, count in sorted(commands.items(), key=lambda item: -item[1])))
+            timeouts = sorted({record['timeout'] for record in self.records})
+            log_message(f"Session timeouts: {', '.join(f'{t}s' for t in timeouts)}")
+            deadline = max(r['idle_start'] + r['timeout'] for r in self.records) + TEST_CONFIG['grace_seconds']
+            log_message(f"Waiting until {datetime.fromtimestamp(deadline).strftime('%H:%M:%S')} "
+                        f"for server-side disconnects (no probing)...")
+            start = time.time()
+            while self.open_count and time.time() < deadline:
+                try:
+                    await asyncio.wait_for(self.all_closed.wait(),
+                                           min(TEST_CONFIG['log_interval'], max(0.0, deadline - time.time())))
+                except asyncio.TimeoutError:
+                    pass
+                log_message(f"Elapsed time: {int(time.time() - start)} seconds, "
+                            f"open {self.open_count}, disconnected {len(self.records) - self.open_count}")
+            if self.processlist is not None:
+                # 끊긴 세션이 processlist 에서 사라지는 것을 확인할 때까지 grace_seconds 안에서 대기
+                settle_deadline = time.time() + TEST_CONFIG['grace_seconds']
+                while time.time() < settle_deadline and any(
+                        r['disconnect'] is not None and r['removed'] is None for r in self.records):
+                    await asyncio.sleep(TEST_CONFIG['status_interval'])
+        finally:
+            if self.sampler is not None:
+                await self.loop.run_in_executor(None, self.sampler.stop)
+            if self.processlist is not None:
+                await self.loop.run_in_executor(None, self.processlist.stop)
+            for record in self.records:
+                if record['eof'] is None:
+                    self.loop.remove_reader(record['sock'].fileno())
+                    record['sock'].setblocking(True)
+                try:
+                    record['conn'].close()
+                except Exception:
+                    pass
+
+    def analyze_results(self):
+        result_text = []
+        for kind in KINDS:
+            records = [r for r in self.records if r['kind'] == kind]
+            if not records:
+                continue
+            disconnected = [r for r in records if r['disconnect'] is not None]
+            result_text.append(f"\n{kind} connections:")
+            result_text.append(f"Opened: {len(records)}, disconnected by server: {len(disconnected)}, "
+                               f"still open at end: {len(records) - len(disconnected)}")
+            timeouts = {}
+            for r in records:
+                timeouts[r['timeout']] = timeouts.get(r['timeout'], 0) + 1
+            result_text.append("Session wait_timeout: " + ', '.join(f"{t}s x {c}" for t, c in sorted(timeouts.items())))
+            if not disconnected:
+                continue
+            lags = sorted(r['disconnect'] - r['idle_start'] - r['timeout'] for r in disconnected)
+            result_text.append(f"Disconnect lag after timeout (seconds): min {lags[0]:.3f}, "
+                               f"avg {sum(lags) / len(lags):.3f}, P50 {percentile(lags, 50):.3f}, "
+                               f"P99 {percentile(lags, 99):.3f}, max {lags[-1]:.3f}")
+            early = sum(1 for lag in lags if lag < -1)
+            if early:
+                result_text.append(f"WARNING: {early} connections were closed more than 1s before their timeout")
+            errors = {}
+            for r in disconnected:
+                key = f"{r['errno']} {r['message']}" if r['errno'] is not None else 'EOF without error packet'
+                errors[key] = errors.get(key, 0) + 1
+            result_text.append("Disconnect notice:")
+            for key, count in sorted(errors.items(), key=lambda item: -item[1]):
+                result_text.append(f"  {key}: {count}")
+            times = sorted(r['disconnect'] for r in disconnected)
+            per_second = {}
+            for t in times:
+                per_second[int(t)] = per_second.get(int(t), 0) + 1
+            result_text.append(f"Disconnect spread: first to last {times[-1] - times[0]:.3f}s, "
+                               f"peak {max(per_second.values())} disconnects/sec")
+            if self.processlist is not None:
+                removed = sorted(r['removed'] - r['disconnect'] for r in disconnected if r['removed'] is not None)
+                if removed:
+                    result_text.append(f"Removed from processlist after disconnect (seconds, +-{TEST_CONFIG['status_interval']}s): "
+                                       f"avg {sum(removed) / len(removed):.3f}, P99 {percentile(removed, 99):.3f}, "
+                                       f"max {removed[-1]:.3f}")
+                lingering = len(disconnected) - len(removed)
+                if lingering:
+                    result_text.append(f"WARNING: {lingering} sessions still in processlist "
+                                       f"{TEST_CONFIG['grace_seconds']}s after the client saw the disconnect")
+
+        if self.connect_failures:
+            result_text.append("\nConnect failures:")
+            for error, count in sorted(self.connect_failures.items(), key=lambda item: -item[1]):
+                result_text.append(f"  {count} x {error}")
+
+        if self.processlist is not None:
+            result_text.extend(self.processlist.format_summary())
+
+        if self.sampler is not None and self.sampler.rows:
+            result_text.extend(self.sampler.format_summary())
+            disconnects = [r['disconnect'] for r in self.records if r['disconnect'] is not None]
+            first = self.sampler.snapshots[0]['status'].get('Threads_connected')
+            if disconnects and first is not None:
+                # 마지막 끊김 이후 Threads_connected 가 시작 값으로 돌아온 첫 샘플
+                settled = next((snapshot for snapshot in self.sampler.snapshots
+                                if snapshot['time'] >= max(disconnects)
+                                and snapshot['status'].get('Threads_connected', first) <= first), None)
+                if settled:
+                    result_text.append(f"Threads_connected back to start {settled['time'] - min(disconnects):.1f}s "
+                                       f"after the first disconnect")
+            result_text.append(f"Server thread curve saved to {self.sampler.csv_path}")
+
+        print('\n'.join(result_text))
+
+        filename = f"mass_idle_disconnects_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['kind', 'connection_id', 'timeout', 'idle_start', 'disconnect', 'lag_seconds',
+                             'server_errno', 'server_message', 'server_command', 'processlist_removed'])
+            for r in self.records:
+                writer.writerow([
+                    r['kind'], r['connection_id'], r['timeout'],
+                    datetime.fromtimestamp(r['idle_start']).isoformat(),
+                    datetime.fromtimestamp(r['disconnect']).isoformat() if r['disconnect'] else '',
+                    f"{r['disconnect'] - r['idle_start'] - r['timeout']:.3f}" if r['disconnect'] else '',
+                    r['errno'] if r['errno'] is not None else '',
+                    r['message'] or '',
+                    r['server_command'] or '',
+                    datetime.fromtimestamp(r['removed']).isoformat() if r['removed'] else ''
+                ])
+        log_message(f"Per-connection results saved to {filename}")
+
+
+def main():
+    raise_open_files_limit(log=log_message)
+    log_message(f"Opening {TEST_CONFIG['interactive_connections']} interactive and "
+                f"{TEST_CONFIG['non_interactive_connections']} non-interactive idle connections "
+                f"(pid {os.getpid()})")
+    tester = MassIdleTester(MYSQL_CONFIG)
+    try:
+        asyncio.run(tester.run())
+    except KeyboardInterrupt:
+        log_message("Script manually interrupted")
+    tester.analyze_results()
+
+
+if __name__ == "__main__":
+    main()
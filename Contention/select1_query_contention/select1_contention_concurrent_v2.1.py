@@ -7,11 +7,50 @@ MySQL 동시성 부하 테스트 스크립트 v2
 주요 기능:
 - ThreadPoolExecutor를 사용한 멀티스레드 쿼리 실행
 - Barrier와 Event를 통한 정확한 동시 실행 제어
+- Closed loop / Open loop 부하 발생 모드:
+  * closed: 응답을 받은 즉시 다음 쿼리 실행 (기존 방식)
+  * open: 목표 도착률(fixed, poisson, step)에 맞춰 쿼리 발행,
+    지연시간을 예정 발행 시각부터 측정하여 coordinated omission 보정
+- 실행 엔진 선택 (TEST_CONFIG['engine']):
+  * thread: 커넥션당 OS 스레드 하나 (기존 방식)
+  * asyncio: 하나의 이벤트 루프에서 aiomysql 로 수천 개 커넥션 구동
+  * process: N 개 프로세스가 각각 M 개 커넥션(스레드)을 담당하여 GIL 영향 제거,
+    프로세스 간 Barrier/Event 로 동시 시작 후 카운터와 히스토그램을 부모에서 병합
+- 프로토콜 비교 (TEST_CONFIG['protocols']):
+  * text: 일반 cursor, 매 실행마다 SQL 전송 및 파싱 (COM_QUERY)
+  * binary: server-side prepared statement (COM_STMT_PREPARE/EXECUTE) 와 binary result protocol
+  * 여러 프로토콜 지정 시 순서대로 실행하고 QPS, 지연시간을 나란히 출력
+- Multi-statement 배치 (TEST_CONFIG['batch_sizes']):
+  * K 개의 쿼리를 하나의 multi-statement 패킷으로 묶어 round trip 당 K 개 실행
+  * round trip 지연시간과 statement 당 지연시간(round trip / K)을 함께 출력
+  * 여러 K 를 지정하면 순서대로 실행하여 처리량 증가가 멈추는 배치 크기 확인
+- 구간별 처리량 타임라인 (Common/throughput_timeline.py):
+  * 워커가 lock-free ring buffer 에 구간(기본 1초)별 완료 수와 지연시간 합을 기록
+  * 테스트 도중 CSV 또는 JSON lines 로 기록하여 QPS 저하 시점을 Aurora 이벤트와 비교
+- 클라이언트 측 지연시간 히스토그램 (Common/latency_histogram.py):
+  * 워커별 고정 메모리 로그 버킷 히스토그램에 wall-clock 지연시간 기록
+  * 종료 후 병합한 p50/p99/p999/max 를 Performance Schema 결과와 함께 출력
+- Warm-up 과 steady-state 감지 (Common/steady_state.py):
+  * 워커별 처음 warmup_iterations 회 / warmup_seconds 초는 히스토그램에서 제외
+  * 이후 슬라이딩 윈도우의 변동계수가 steady_cv 이하로 내려간 시점부터 히스토그램에 기록
+  * 타임라인에는 warm-up 을 포함한 모든 요청을 기록
+- Performance Schema delta 샘플링 (Common/perf_schema_sampler.py):
+  * 요약 테이블을 TRUNCATE 하지 않음 - 공유 클러스터의 다른 사용자 데이터 보존
+  * statements digest / waits / stages 요약을 주기적으로 스냅샷하여 클라이언트에서 delta 계산
+  * 구간별 서버 측 지연시간과 상위 wait/stage, pass 별 및 전체 실행 delta 출력
+- 백엔드 인스턴스별 분포 (Common/backend_distribution.py):
+  * 워커 접속 시 @@aurora_server_id (Aurora 가 아니면 @@hostname) 와 접속 시간을 기록
+  * reader 엔드포인트 사용 시 인스턴스별 접속 수, 접속 시간, QPS, 지연시간 p50/p99 와 치우침 출력
+- 결과 저장소 (Common/results_store.py):
+  * pass 별 QPS, 워커별 QPS 분포, 지연시간 요약을 로컬 SQLite 에 기록
+  * python3 Common/results_store.py compare BASE NEW 로 이전 실행과 회귀 비교
 - MySQL Performance Schema를 통한 상세 성능 분석:
   * 쿼리 실행 지연시간 (평균, 최소, 최대, p95, p99, p999)
   * 스레드별 QPS (Queries Per Second) 분석
   * 단계별(Stage) 성능 분석
   * 대기(Wait) 이벤트 분석
+  * Stage/Wait 분석은 워커가 수집한 performance_schema THREAD_ID 로 한정
+    (다른 클라이언트 트래픽 제외, 서버 부하와 관계없이 분석 비용 일정)
 
 설정:
 - MYSQL_CONFIG: 데이터베이스 연결 정보
@@ -24,6 +63,23 @@ MySQL 동시성 부하 테스트 스크립트 v2
   * num_threads: 동시 실행 스레드 수
   * iterations: 각 스레드당 쿼리 실행 횟수
   * query: 실행할 쿼리문
+  * engine: 'thread', 'asyncio' 또는 'process'
+  * num_processes: process 엔진의 프로세스 수 (N)
+  * connections_per_process: process 엔진의 프로세스당 커넥션 수 (M)
+  * protocols: 실행할 프로토콜 목록 (['text'], ['binary'], ['text', 'binary'])
+  * batch_sizes: round trip 당 statement 수 목록 (예: [1, 2, 4, 8, 16], text 프로토콜만 지원)
+  * timeline_interval: 타임라인 구간 길이(초)
+  * timeline_format: 'csv', 'jsonl' 또는 None (기록 안 함)
+  * load_mode: 'closed' 또는 'open'
+  * arrival_pattern: open 모드 도착 간격 ('fixed', 'poisson', 'step')
+  * target_qps: open 모드 전체 목표 QPS (fixed, poisson)
+  * step_ramps: step 모드 구간 목록 [(지속 시간(초), 전체 목표 QPS), ...]
+  * ps_sample_interval: Performance Schema 스냅샷 간격(초), None 이면 샘플링 안 함
+  * warmup_iterations / warmup_seconds: 워커별 warm-up 횟수 / 시간(초) - iterations 에 포함
+  * steady_window / steady_cv: steady-state 감지 윈도우(round trip 수, 0 이면 warm-up 만 적용)와 변동계수 기준
+  * track_backends: 워커 접속마다 붙은 인스턴스를 조회하여 인스턴스별 분포 출력
+  * record_results: 결과 저장소(Common/results_store.py) 기록 여부
+  * results_label: 저장소에 함께 기록할 실행 라벨
 
 사용방법:
 1. MYSQL_CONFIG에 데이터베이스 접속 정보 설정
@@ -32,7 +88,8 @@ MySQL 동시성 부하 테스트 스크립트 v2
 
 요구사항:
 - Python 3.6+
-- mysql-connector-python
+- mysql-connector-python (9.2 미만 - batch_sizes 의 K > 1 배치가 9.2 에서 제거된 cursor.execute(..., multi=True) 사용)
+- aiomysql (engine = 'asyncio' 사용 시, Python 3.7+)
 - Performance Schema 접근 권한
 
 주의사항: 
@@ -42,11 +99,31 @@ MySQL 동시성 부하 테스트 스크립트 v2
 """
 
 
+import asyncio
+import multiprocessing
 import mysql.connector
+import os
+import random
+import sys
 import time
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from threading import Barrier, Event
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from threading import Barrier, BrokenBarrierError, Event
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from backend_distribution import BACKEND_QUERIES, BackendDistribution, fetch_backend_id
+from latency_histogram import LatencyHistogram
+from open_files_limit import raise_open_files_limit
+from perf_schema_sampler import PerformanceSchemaSampler
+from steady_state import SteadyStateFilter, format_steady_state, merge_steady_state
+from results_store import ResultsStore, fetch_server_version, metric_from_histogram, metric_from_values, metric_value
+from throughput_timeline import ThroughputTimeline
+
+try:
+    import aiomysql
+    from pymysql.constants import CLIENT
+except ImportError:
+    aiomysql = None
 
 # MySQL 접속 설정
 MYSQL_CONFIG = {
@@ -60,18 +137,158 @@ MYSQL_CONFIG = {
 TEST_CONFIG = {
     'num_threads': 10,
     'iterations': 10000,
-    'query': 'SELECT 1'
+    'query': 'SELECT 1',
+    'engine': 'thread',             # 'thread': 커넥션당 스레드, 'asyncio': 단일 이벤트 루프 (aiomysql 필요), 'process': 멀티 프로세스
+    'num_processes': 4,             # process 엔진: 프로세스 수
+    'connections_per_process': 8,   # process 엔진: 프로세스당 커넥션(스레드) 수
+    'process_ready_timeout': 300,   # process 엔진: 모든 커넥션이 준비될 때까지 기다리는 최대 시간(초)
+    'protocols': ['text'],          # 'text': COM_QUERY, 'binary': prepared statement. ['text', 'binary'] 는 비교 실행
+    'batch_sizes': [1],             # round trip 당 statement 수(K). [1, 2, 4, 8, 16] 처럼 지정하면 순서대로 실행
+    'timeline_interval': 1.0,       # 처리량 타임라인 구간(초)
+    'timeline_format': 'csv',       # 'csv', 'jsonl', None (타임라인 기록 안 함)
+    'load_mode': 'closed',          # 'closed': 응답 후 즉시 다음 쿼리, 'open': 목표 도착률로 쿼리 발행
+    'arrival_pattern': 'fixed',     # open 모드 도착 간격: 'fixed', 'poisson', 'step'
+    'target_qps': 1000,             # open 모드 전체 목표 QPS (fixed, poisson 에서 사용)
+    'step_ramps': [(10, 500), (10, 1000), (10, 2000)],  # step 모드: (지속 시간(초), 전체 목표 QPS)
+    'ps_sample_interval': 5,        # Performance Schema delta 스냅샷 간격(초), None 이면 샘플링 안 함
+    'warmup_iterations': 100,       # 워커별 warm-up round trip 수 (iterations 에 포함, 지연시간 통계 제외)
+    'warmup_seconds': 0,            # 워커별 warm-up 시간(초)
+    'steady_window': 200,           # steady-state 감지 윈도우(round trip 수), 0 이면 warm-up 만 적용
+    'steady_cv': 0.5,               # 윈도우 변동계수가 이 값 이하가 되면 steady-state 로 판단
+    'track_backends': True,         # 워커 접속마다 @@aurora_server_id 조회 - reader 엔드포인트의 인스턴스별 분포 출력
+    'record_results': True,         # 결과를 Common/results_store.py 저장소(SQLite)에 기록
+    'results_label': None           # 실행 구분용 라벨 (예: 'before-upgrade'), 비교 시 표시
 }
 
+# 워커 커넥션의 performance_schema THREAD_ID 조회
+PS_THREAD_ID_QUERY = "SELECT THREAD_ID FROM performance_schema.threads WHERE PROCESSLIST_ID = CONNECTION_ID()"
+
+
+def total_workers():
+    """엔진에 따른 전체 워커(커넥션) 수"""
+    if TEST_CONFIG['engine'] == 'process':
+        return TEST_CONFIG['num_processes'] * TEST_CONFIG['connections_per_process']
+    return TEST_CONFIG['num_threads']
+
+
+def arrival_schedule(thread_id):
+    """open 모드에서 워커별 예정 발행 시각(테스트 시작 기준, 초)을 순서대로 생성
+
+    전체 목표 QPS를 워커 수로 나누어 각 워커가 담당하고,
+    fixed/step 모드는 워커마다 시작 위상을 엇갈리게 두어 전체 도착 간격이 균일하도록 한다.
+    poisson 모드는 워커별 독립 포아송 과정의 합이 전체 포아송 과정이 된다.
+    """
+    num_threads = total_workers()
+    pattern = TEST_CONFIG['arrival_pattern']
+
+    if pattern == 'step':
+        phase_start = 0.0
+        for duration, total_qps in TEST_CONFIG['step_ramps']:
+            interval = num_threads / total_qps
+            offset = phase_start + interval * thread_id / num_threads
+            while offset < phase_start + duration:
+                yield offset
+                offset += interval
+            phase_start += duration
+        return
+
+    rate = TEST_CONFIG['target_qps'] / num_threads
+    if pattern == 'poisson':
+        rng = random.Random()
+        offset = 0.0
+        for _ in range(TEST_CONFIG['iterations']):
+            offset += rng.expovariate(rate)
+            yield offset
+    elif pattern == 'fixed':
+        interval = 1.0 / rate
+        offset = interval * thread_id / num_threads
+        for _ in range(TEST_CONFIG['iterations']):
+            yield offset
+            offset += interval
+    else:
+        raise ValueError(f"Unknown arrival_pattern: {pattern}")
+
+
 class ConnectionTester:
     def __init__(self, db_config):
         self.db_config = db_config
         self.barrier = None
         self.start_event = Event()
+        self.async_start_event = None
+        self.schedule_origin = None
+        self.shared_schedule_origin = None
+        self.protocol = 'text'
+        self.batch_size = 1
+        self.timeline = None
+        self.timeline_path = None
+        self.pass_results = []
+        self.sampler = None
+        self.thread_ids = set()
 
     def create_connection(self):
         return mysql.connector.connect(**self.db_config)
 
+    def create_cursor(self, conn):
+        """binary 프로토콜은 prepared cursor 로 첫 실행 시 한 번 PREPARE 후 EXECUTE 만 반복"""
+        if self.protocol == 'binary':
+            return conn.cursor(prepared=True)
+        return conn.cursor()
+
+    def batch_statement(self, query):
+        """batch_size 개의 쿼리를 하나의 multi-statement 문자열로 결합"""
+        return '; '.join([query] * self.batch_size)
+
+    def execute_round_trip(self, cursor, statement):
+        """한 번의 round trip 으로 statement 실행 - batch_size > 1 이면 모든 결과셋을 읽음"""
+        if self.batch_size > 1:
+            # multi=True 는 mysql-connector-python 9.2 에서 제거됨 - 9.2 미만 버전 필요
+            for result in cursor.execute(statement, multi=True):
+                if result.with_rows:
+                    result.fetchall()
+        else:
+            cursor.execute(statement)
+            cursor.fetchall()
+
+    async def async_execute_round_trip(self, cursor, statement):
+        await cursor.execute(statement)
+        await cursor.fetchall()
+        while await cursor.nextset():
+            await cursor.fetchall()
+
+    def fetch_ps_thread_id(self, conn):
+        """현재 커넥션의 performance_schema THREAD_ID - 분석 쿼리를 이 테스트의 스레드로 한정하기 위해 수집"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(PS_THREAD_ID_QUERY)
+            rows = cursor.fetchall()
+            return rows[0][0] if rows else None
+        except Exception as e:
+            print(f"Failed to get performance_schema thread id: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    async def async_fetch_backend_id(self, cursor):
+        """fetch_backend_id 의 aiomysql 버전"""
+        for query in BACKEND_QUERIES:
+            try:
+                await cursor.execute(query)
+                rows = await cursor.fetchall()
+                if rows and rows[0][0]:
+                    return rows[0][0]
+            except Exception:
+                continue
+        return None
+
+    async def async_fetch_ps_thread_id(self, cursor):
+        try:
+            await cursor.execute(PS_THREAD_ID_QUERY)
+            rows = await cursor.fetchall()
+            return rows[0][0] if rows else None
+        except Exception as e:
+            print(f"Failed to get performance_schema thread id: {e}")
+            return None
+
     def setup_performance_schema(self):
         try:
             conn = self.create_connection()
@@ -95,14 +312,8 @@ class ConnectionTester:
                       NAME LIKE '%waits%'
             """)
             
-            # 모든 관련 테이블 초기화
-            cursor.execute("TRUNCATE TABLE performance_schema.events_statements_summary_by_digest")
-            cursor.execute("TRUNCATE TABLE performance_schema.events_statements_history_long")
-            cursor.execute("TRUNCATE TABLE performance_schema.events_stages_history_long")
-            cursor.execute("TRUNCATE TABLE performance_schema.events_waits_history_long")
-            cursor.execute("TRUNCATE TABLE performance_schema.events_statements_history")
-            cursor.execute("TRUNCATE TABLE performance_schema.events_stages_history")
-            cursor.execute("TRUNCATE TABLE performance_schema.events_waits_history")
+            # 요약/히스토리 테이블은 TRUNCATE 하지 않음 (공유 클러스터의 다른 사용자 데이터 보존)
+            # 테스트 구간 값은 PerformanceSchemaSampler 스냅샷 delta 로 계산
             
             # 설정 확인
             cursor.execute("""
@@ -123,47 +334,168 @@ class ConnectionTester:
         except Exception as e:
             print(f"Failed to setup performance schema: {e}")
 
+    def current_schedule_origin(self):
+        """open 모드 기준 시각 - process 엔진에서는 부모 프로세스가 공유 메모리에 기록한 값을 읽음
+
+        perf_counter_ns 는 Linux/macOS 에서 시스템 전체 monotonic clock 이므로 프로세스 간 비교 가능
+        """
+        if self.shared_schedule_origin is not None:
+            return self.shared_schedule_origin.value
+        return self.schedule_origin
+
     def connection_worker(self, thread_id, query, iterations, barrier):
         try:
+            connect_start = time.perf_counter()
             conn = self.create_connection()
-            cursor = conn.cursor()
-            
+            # 접속 시간은 접속 직후에 측정 (백엔드 조회 쿼리 시간은 제외)
+            connect_time = time.perf_counter() - connect_start
+            backend = None
+            if TEST_CONFIG['track_backends']:
+                backend = (fetch_backend_id(conn), connect_time)
+            ps_thread_id = self.fetch_ps_thread_id(conn)
+            cursor = self.create_cursor(conn)
+        except Exception as e:
+            # 접속 실패 시에도 Barrier 에 참여해야 나머지 워커가 대기 상태로 남지 않음
+            print(f"Thread {thread_id} failed to connect: {e}")
+            barrier.wait()
+            return 0, 0, LatencyHistogram(), 0, None, None, None
+
+        try:
             print(f"Thread {thread_id} ready")
             barrier.wait()
             
             self.start_event.wait()
+            schedule_origin = self.current_schedule_origin()
+            statement = self.batch_statement(query)
             
             success_count = 0
+            late_count = 0
+            histogram = LatencyHistogram()
+            steady = self.create_steady_filter()
             start_time = time.time()
             
-            for i in range(iterations):
-                cursor.execute(query)
-                cursor.fetchall()
-                success_count += 1
+            if TEST_CONFIG['load_mode'] == 'open':
+                # 예정 발행 시각을 기준으로 지연시간을 측정해 서버 포화 시 대기 시간까지 포함
+                for scheduled in arrival_schedule(thread_id):
+                    send_at = schedule_origin + int(scheduled * 1e9)
+                    now = time.perf_counter_ns()
+                    if now < send_at:
+                        time.sleep((send_at - now) / 1e9)
+                    else:
+                        late_count += 1
+                    self.execute_round_trip(cursor, statement)
+                    end = time.perf_counter_ns()
+                    for latency in steady.add(end - send_at):
+                        histogram.record(latency)
+                    if self.timeline is not None:
+                        self.timeline.record(thread_id, end, end - send_at, self.batch_size)
+                    success_count += self.batch_size
+            else:
+                for i in range(iterations):
+                    query_start = time.perf_counter_ns()
+                    self.execute_round_trip(cursor, statement)
+                    end = time.perf_counter_ns()
+                    for latency in steady.add(end - query_start):
+                        histogram.record(latency)
+                    if self.timeline is not None:
+                        self.timeline.record(thread_id, end, end - query_start, self.batch_size)
+                    success_count += self.batch_size
             
             duration = time.time() - start_time
             
             cursor.close()
             conn.close()
             
-            return success_count, duration
+            return success_count, duration, histogram, late_count, ps_thread_id, steady.summary(), backend
                 
         except Exception as e:
             print(f"Thread {thread_id} failed: {e}")
-            return 0, 0
+            return 0, 0, LatencyHistogram(), 0, None, None, None
 
-    def run_test(self):
-        print(f"\nStarting test with {TEST_CONFIG['num_threads']} threads")
-        print(f"Each thread will execute query {TEST_CONFIG['iterations']} times")
-        print(f"Total executions will be: {TEST_CONFIG['num_threads'] * TEST_CONFIG['iterations']}")
-        
-        # Performance Schema 설정
-        self.setup_performance_schema()
-        
+    async def async_connection_worker(self, thread_id, query, iterations, ready_queue):
+        try:
+            connect_start = time.perf_counter()
+            conn = await aiomysql.connect(
+                host=self.db_config['host'],
+                port=self.db_config.get('port', 3306),
+                user=self.db_config['user'],
+                password=self.db_config['password'],
+                db=self.db_config['database'],
+                client_flag=CLIENT.MULTI_STATEMENTS if self.batch_size > 1 else 0
+            )
+            # 접속 시간은 접속 직후에 측정 (cursor 생성 / 백엔드 조회 쿼리 시간은 제외)
+            connect_time = time.perf_counter() - connect_start
+            cursor = await conn.cursor()
+            backend = None
+            if TEST_CONFIG['track_backends']:
+                backend = (await self.async_fetch_backend_id(cursor), connect_time)
+            ps_thread_id = await self.async_fetch_ps_thread_id(cursor)
+        except Exception as e:
+            print(f"Task {thread_id} failed to connect: {e}")
+            ready_queue.put_nowait(thread_id)
+            return 0, 0, LatencyHistogram(), 0, None, None, None
+
+        try:
+            ready_queue.put_nowait(thread_id)
+            await self.async_start_event.wait()
+            statement = self.batch_statement(query)
+            
+            success_count = 0
+            late_count = 0
+            histogram = LatencyHistogram()
+            steady = self.create_steady_filter()
+            start_time = time.time()
+            
+            if TEST_CONFIG['load_mode'] == 'open':
+                for scheduled in arrival_schedule(thread_id):
+                    send_at = self.schedule_origin + int(scheduled * 1e9)
+                    now = time.perf_counter_ns()
+                    if now < send_at:
+                        await asyncio.sleep((send_at - now) / 1e9)
+                    else:
+                        late_count += 1
+                    await self.async_execute_round_trip(cursor, statement)
+                    end = time.perf_counter_ns()
+                    for latency in steady.add(end - send_at):
+                        histogram.record(latency)
+                    if self.timeline is not None:
+                        self.timeline.record(thread_id, end, end - send_at, self.batch_size)
+                    success_count += self.batch_size
+            else:
+                for i in range(iterations):
+                    query_start = time.perf_counter_ns()
+                    await self.async_execute_round_trip(cursor, statement)
+                    end = time.perf_counter_ns()
+                    for latency in steady.add(end - query_start):
+                        histogram.record(latency)
+                    if self.timeline is not None:
+                        self.timeline.record(thread_id, end, end - query_start, self.batch_size)
+                    success_count += self.batch_size
+            
+            duration = time.time() - start_time
+            
+            await cursor.close()
+            conn.close()
+            
+            return success_count, duration, histogram, late_count, ps_thread_id, steady.summary(), backend
+
+        except Exception as e:
+            print(f"Task {thread_id} failed: {e}")
+            conn.close()
+            return 0, 0, LatencyHistogram(), 0, None, None, None
+
+    def create_steady_filter(self):
+        return SteadyStateFilter(
+            warmup_iterations=TEST_CONFIG['warmup_iterations'],
+            warmup_seconds=TEST_CONFIG['warmup_seconds'],
+            window=TEST_CONFIG['steady_window'],
+            cv_threshold=TEST_CONFIG['steady_cv']
+        )
+
+    def run_thread_workers(self):
+        """커넥션당 스레드 방식으로 워커 실행, (워커 결과 목록, 실행 시간) 반환"""
         self.barrier = Barrier(TEST_CONFIG['num_threads'])
-        
-        total_success = 0
-        thread_results = []
+        self.start_event = Event()
 
         with ThreadPoolExecutor(max_workers=TEST_CONFIG['num_threads']) as executor:
             futures = [
@@ -181,30 +513,367 @@ class ConnectionTester:
             print("\nAll threads ready, executing queries simultaneously...")
             
             start_time = time.time()
+            self.schedule_origin = time.perf_counter_ns()
+            self.start_timeline(self.schedule_origin)
             self.start_event.set()
             
+            worker_results = []
             for future in futures:
                 try:
-                    queries, duration = future.result()
-                    total_success += queries
-                    thread_results.append((queries, duration))
+                    worker_results.append(future.result())
                 except Exception as e:
                     print(f"Thread execution failed: {e}")
             
-            end_time = time.time()
-            execution_time = end_time - start_time
-            
-            per_thread_qps = [queries/duration for queries, duration in thread_results if duration > 0]
-            
-            print(f"\nTest completed:")
-            print(f"Total successful queries: {total_success:,}")
-            print(f"Total time: {execution_time:.2f} seconds")
-            print(f"Average QPS: {total_success/execution_time:.2f}")
-            
-            if per_thread_qps:
-                print(f"Average QPS per thread: {sum(per_thread_qps)/len(per_thread_qps):.2f}")
-                print(f"Min QPS per thread: {min(per_thread_qps):.2f}")
-                print(f"Max QPS per thread: {max(per_thread_qps):.2f}")
+            return worker_results, time.time() - start_time
+
+    @property
+    def process_context(self):
+        return multiprocessing.get_context('spawn')
+
+    def create_timeline(self):
+        """패스별 처리량 타임라인 생성 (timeline_format 이 None 이면 사용 안 함)"""
+        if not TEST_CONFIG['timeline_format']:
+            return None
+        ctx = self.process_context if TEST_CONFIG['engine'] == 'process' else None
+        return ThroughputTimeline(total_workers(), TEST_CONFIG['timeline_interval'], ctx=ctx)
+
+    def start_timeline(self, origin_ns):
+        """워커 시작 직전 타임라인 기준 시각을 설정하고 파일 기록 시작"""
+        if self.timeline is None:
+            return
+        self.timeline.start(origin_ns)
+        self.timeline.start_writer(self.timeline_path, TEST_CONFIG['timeline_format'])
+        print(f"Writing throughput timeline to {self.timeline_path}")
+
+    def run_process_workers(self):
+        """N 개 프로세스 x M 개 커넥션으로 워커 실행, (워커 결과 목록, 실행 시간) 반환"""
+        num_processes = TEST_CONFIG['num_processes']
+        per_process = TEST_CONFIG['connections_per_process']
+
+        ctx = self.process_context
+        # 모든 자식 워커 + 부모가 참여하는 프로세스 간 Barrier, 시작 신호 Event
+        barrier = ctx.Barrier(num_processes * per_process + 1)
+        start_event = ctx.Event()
+        schedule_origin = ctx.RawValue('q', 0)
+
+        with ProcessPoolExecutor(
+            max_workers=num_processes,
+            mp_context=ctx,
+            initializer=init_process_worker,
+            initargs=(barrier, start_event, schedule_origin, self.timeline, TEST_CONFIG)
+        ) as executor:
+            futures = [
+                executor.submit(process_worker, p, self.db_config, self.protocol, self.batch_size)
+                for p in range(num_processes)
+            ]
+
+            # 자식 프로세스가 Barrier 에 도달하기 전에 죽으면(import 오류, OOM kill, BrokenProcessPool)
+            # 부모가 영원히 기다리지 않도록 Barrier 대기와 자식 future 를 함께 감시
+            self.wait_process_barrier(executor, barrier, futures)
+
+            print(f"\nAll {num_processes} processes ready, executing queries simultaneously...")
+
+            start_time = time.time()
+            schedule_origin.value = time.perf_counter_ns()
+            self.start_timeline(schedule_origin.value)
+            start_event.set()
+
+            worker_results = []
+            for future in futures:
+                try:
+                    worker_results.extend(future.result())
+                except Exception as e:
+                    print(f"Process execution failed: {e}")
+
+            return worker_results, time.time() - start_time
+
+    def wait_process_barrier(self, executor, barrier, futures):
+        """부모의 Barrier 대기 - 시작 전에 끝난 자식이 있거나 timeout 이면 Barrier 를 깨고 자식 오류를 출력한 뒤 RuntimeError"""
+        timeout = TEST_CONFIG['process_ready_timeout']
+        with ThreadPoolExecutor(max_workers=1) as waiter:
+            ready = waiter.submit(barrier.wait, timeout)
+            wait(futures + [ready], return_when=FIRST_COMPLETED)
+            if not ready.done():
+                # 시작 신호 전에 자식이 끝났음 = 준비 중 실패 - 남은 워커가 대기하지 않도록 Barrier 해제
+                barrier.abort()
+            try:
+                ready.result()
+                return
+            except BrokenBarrierError:
+                pass
+
+        # abort / timeout 으로 Barrier 가 깨지면 대기 중이던 자식 워커도 BrokenBarrierError 로 종료됨
+        done, not_done = wait(futures, timeout=timeout)
+        print("Processes failed before start:")
+        for process_id, future in enumerate(futures):
+            if future not in done:
+                print(f"  Process {process_id}: still not ready after {timeout}s, terminating")
+            elif future.exception() is not None:
+                print(f"  Process {process_id}: {type(future.exception()).__name__}: {future.exception()}")
+        if not_done:
+            # 멈춘 자식이 있으면 executor 종료(shutdown(wait=True))도 끝나지 않으므로 강제 종료
+            for process in (getattr(executor, '_processes', None) or {}).values():
+                process.terminate()
+        raise RuntimeError("process workers did not become ready - aborting test")
+
+    async def run_async_workers(self):
+        """단일 이벤트 루프에서 모든 커넥션을 구동, (워커 결과 목록, 실행 시간) 반환"""
+        num_workers = TEST_CONFIG['num_threads']
+        self.async_start_event = asyncio.Event()
+        ready_queue = asyncio.Queue()
+
+        tasks = [
+            asyncio.ensure_future(self.async_connection_worker(
+                i,
+                TEST_CONFIG['query'],
+                TEST_CONFIG['iterations'],
+                ready_queue
+            )) for i in range(num_workers)
+        ]
+
+        # 모든 커넥션이 연결(또는 실패)될 때까지 대기 - 스레드 엔진의 Barrier 역할
+        for _ in range(num_workers):
+            await ready_queue.get()
+
+        print("\nAll connections ready, executing queries simultaneously...")
+
+        start_time = time.time()
+        self.schedule_origin = time.perf_counter_ns()
+        self.start_timeline(self.schedule_origin)
+        self.async_start_event.set()
+
+        worker_results = await asyncio.gather(*tasks, return_exceptions=True)
+        execution_time = time.time() - start_time
+
+        results = []
+        for result in worker_results:
+            if isinstance(result, Exception):
+                print(f"Task execution failed: {result}")
+            else:
+                results.append(result)
+        return results, execution_time
+
+    def run_test(self):
+        if TEST_CONFIG['engine'] == 'process':
+            print(f"\nStarting test with {TEST_CONFIG['num_processes']} processes x "
+                  f"{TEST_CONFIG['connections_per_process']} connections")
+        else:
+            print(f"\nStarting test with {TEST_CONFIG['num_threads']} {'connections' if TEST_CONFIG['engine'] == 'asyncio' else 'threads'}")
+        print(f"Engine: {TEST_CONFIG['engine']}")
+        print(f"Load mode: {TEST_CONFIG['load_mode']}")
+        if TEST_CONFIG['load_mode'] == 'open' and TEST_CONFIG['arrival_pattern'] == 'step':
+            for duration, total_qps in TEST_CONFIG['step_ramps']:
+                print(f"Step: {total_qps} QPS for {duration} seconds")
+        else:
+            if TEST_CONFIG['load_mode'] == 'open':
+                print(f"Arrival pattern: {TEST_CONFIG['arrival_pattern']}, target QPS: {TEST_CONFIG['target_qps']}")
+            print(f"Each thread will execute query {TEST_CONFIG['iterations']} times")
+            print(f"Total executions will be: {total_workers() * TEST_CONFIG['iterations']}")
+        
+        print(f"Protocols: {', '.join(TEST_CONFIG['protocols'])}")
+        print(f"Batch sizes (statements per round trip): {', '.join(str(k) for k in TEST_CONFIG['batch_sizes'])}")
+        
+        # Performance Schema 설정
+        self.setup_performance_schema()
+        
+        if TEST_CONFIG['engine'] == 'asyncio':
+            if aiomysql is None:
+                print("engine 'asyncio' requires aiomysql (pip install aiomysql)")
+                return
+            raise_open_files_limit()
+        
+        self.start_sampler()
+        try:
+            self.run_passes()
+        finally:
+            self.stop_sampler()
+        
+        if len(self.pass_results) > 1:
+            print("\nPass comparison:")
+            print("Protocol | Batch | Statements | Stmt QPS | QPS gain | RT/s | RT Avg (ms) | RT P50 (ms) | RT P99 (ms) | Stmt Avg (ms)")
+            print("-" * 130)
+            previous = {}
+            for result in self.pass_results:
+                histogram = result['histogram']
+                batch_size = result['batch_size']
+                gain = ''
+                if result['protocol'] in previous and previous[result['protocol']] > 0:
+                    gain = f"{(result['qps'] / previous[result['protocol']] - 1) * 100:+.1f}%"
+                previous[result['protocol']] = result['qps']
+                print(f"{result['protocol']:<8} | {batch_size:>5} | {result['queries']:>10,} | {result['qps']:>10.2f} | "
+                      f"{gain:>8} | {result['steady']['samples'] / result['duration'] if result['duration'] > 0 else 0:>10.2f} | "
+                      f"{histogram.mean() / 1e6:>11.6f} | {histogram.percentile(50) / 1e6:>11.6f} | "
+                      f"{histogram.percentile(99) / 1e6:>11.6f} | {histogram.mean() / batch_size / 1e6:>13.6f}")
+
+    def run_passes(self):
+        """설정된 프로토콜 x 배치 크기 조합을 순서대로 실행"""
+        for protocol in TEST_CONFIG['protocols']:
+            if protocol == 'binary' and TEST_CONFIG['engine'] == 'asyncio':
+                print("\nSkipping binary protocol: aiomysql does not support server-side prepared statements")
+                continue
+            for batch_size in TEST_CONFIG['batch_sizes']:
+                if protocol == 'binary' and batch_size > 1:
+                    print(f"\nSkipping binary protocol with batch size {batch_size}: "
+                          f"prepared statements cannot be sent as multi-statement packets")
+                    continue
+                self.pass_results.append(self.run_pass(protocol, batch_size))
+
+    def start_sampler(self):
+        """Performance Schema delta 샘플러 시작 - 실패해도 부하 테스트는 계속 진행"""
+        self.sampler = None
+        if not TEST_CONFIG['ps_sample_interval']:
+            return
+        sampler = PerformanceSchemaSampler(
+            self.create_connection,
+            interval=TEST_CONFIG['ps_sample_interval'],
+            schema=self.db_config.get('database'),
+            query=TEST_CONFIG['query']
+        )
+        try:
+            sampler.start()
+            self.sampler = sampler
+        except Exception as e:
+            print(f"Failed to start performance schema sampler: {e}")
+            sampler.close()
+
+    def stop_sampler(self):
+        if self.sampler is None:
+            return
+        try:
+            self.sampler.stop()
+        except Exception as e:
+            print(f"Failed to stop performance schema sampler: {e}")
+
+    def sampler_checkpoint(self):
+        """pass 경계 스냅샷 - 샘플러가 없거나 실패하면 None"""
+        if self.sampler is None:
+            return None
+        try:
+            return self.sampler.snapshot()
+        except Exception as e:
+            print(f"Performance schema snapshot failed: {e}")
+            return None
+
+    def run_pass(self, protocol, batch_size):
+        """지정한 프로토콜과 배치 크기로 한 번 부하를 실행하고 결과 요약(dict) 반환"""
+        self.protocol = protocol
+        self.batch_size = batch_size
+        self.timeline = self.create_timeline()
+        self.timeline_path = (f"timeline_{protocol}_batch{batch_size}_"
+                              f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.{TEST_CONFIG['timeline_format']}")
+        print(f"\n[{protocol}, batch {batch_size}] Running with "
+              f"{'prepared statements (binary protocol)' if protocol == 'binary' else 'text protocol'}")
+        
+        ps_before = self.sampler_checkpoint()
+        if TEST_CONFIG['engine'] == 'asyncio':
+            worker_results, execution_time = asyncio.run(self.run_async_workers())
+        elif TEST_CONFIG['engine'] == 'process':
+            worker_results, execution_time = self.run_process_workers()
+        else:
+            worker_results, execution_time = self.run_thread_workers()
+        
+        if self.timeline is not None:
+            self.timeline.stop_writer()
+        ps_after = self.sampler_checkpoint()
+        
+        total_success = 0
+        late_count = 0
+        total_histogram = LatencyHistogram()
+        thread_results = []
+        steady_summary = merge_steady_state(result[5] for result in worker_results)
+        backends = BackendDistribution()
+        for queries, duration, histogram, late, ps_thread_id, _, backend in worker_results:
+            if ps_thread_id is not None:
+                self.thread_ids.add(str(ps_thread_id))
+            if backend is not None:
+                backend_id, connect_time = backend
+                backends.record(backend_id, connect_time=connect_time, queries=queries,
+                                duration=duration, histogram=histogram)
+            total_success += queries
+            thread_results.append((queries, duration))
+            total_histogram.merge(histogram)
+            late_count += late
+        
+        per_thread_qps = [queries/duration for queries, duration in thread_results if duration > 0]
+        
+        print(f"\nTest completed ({protocol}, batch {batch_size}):")
+        print(f"Total successful queries: {total_success:,}")
+        if batch_size > 1:
+            print(f"Total round trips: {steady_summary['samples']:,}")
+        print(f"Total time: {execution_time:.2f} seconds")
+        print(f"Average QPS: {total_success/execution_time:.2f}")
+        print(format_steady_state(steady_summary))
+        
+        if per_thread_qps:
+            print(f"Average QPS per thread: {sum(per_thread_qps)/len(per_thread_qps):.2f}")
+            print(f"Min QPS per thread: {min(per_thread_qps):.2f}")
+            print(f"Max QPS per thread: {max(per_thread_qps):.2f}")
+        
+        if backends.backends:
+            for line in backends.format_summary():
+                print(line)
+        
+        ps_delta = None
+        if ps_before is not None and ps_after is not None:
+            ps_delta = self.sampler.delta(ps_before, ps_after)
+            server_count, server_avg_ms = self.sampler.digest_summary(ps_delta)
+            print(f"Server-side statements (performance_schema delta): {server_count:,}, "
+                  f"avg latency: {server_avg_ms:.6f}ms")
+        
+        return {
+            'protocol': protocol,
+            'batch_size': batch_size,
+            'queries': total_success,
+            'duration': execution_time,
+            'qps': total_success / execution_time if execution_time > 0 else 0,
+            'histogram': total_histogram,
+            'late_count': late_count,
+            'ps_delta': ps_delta,
+            'per_worker_qps': per_thread_qps,
+            'steady': steady_summary,
+            'backends': backends
+        }
+
+
+# process 엔진: 자식 프로세스 전역 상태 (ProcessPoolExecutor initializer 에서 설정)
+_process_barrier = None
+_process_start_event = None
+_process_schedule_origin = None
+_process_timeline = None
+
+
+def init_process_worker(barrier, start_event, schedule_origin, timeline, test_config):
+    """자식 프로세스 초기화 - 동기화 객체와 공유 메모리는 프로세스 생성 시점에만 전달 가능"""
+    global _process_barrier, _process_start_event, _process_schedule_origin, _process_timeline
+    _process_barrier = barrier
+    _process_start_event = start_event
+    _process_schedule_origin = schedule_origin
+    _process_timeline = timeline
+    TEST_CONFIG.update(test_config)
+
+
+def process_worker(process_id, db_config, protocol, batch_size):
+    """자식 프로세스에서 connections_per_process 개의 커넥션을 스레드로 실행하고 워커 결과 목록 반환"""
+    per_process = TEST_CONFIG['connections_per_process']
+    tester = ConnectionTester(db_config)
+    tester.protocol = protocol
+    tester.batch_size = batch_size
+    tester.start_event = _process_start_event
+    tester.shared_schedule_origin = _process_schedule_origin
+    tester.timeline = _process_timeline
+
+    with ThreadPoolExecutor(max_workers=per_process) as executor:
+        futures = [
+            executor.submit(
+                tester.connection_worker,
+                process_id * per_process + i,
+                TEST_CONFIG['query'],
+                TEST_CONFIG['iterations'],
+                _process_barrier
+            ) for i in range(per_process)
+        ]
+        return [future.result() for future in futures]
+
 
 def main():
     start_time = time.time()
@@ -218,12 +887,35 @@ def main():
         conn = mysql.connector.connect(**MYSQL_CONFIG)
         cursor = conn.cursor()
 
-        # 조회 전 테이블 초기화
-      #  cursor.execute("TRUNCATE TABLE performance_schema.events_statements_history_long")
-      #  cursor.execute("TRUNCATE TABLE performance_schema.events_stages_history_long")
-      #  cursor.execute("TRUNCATE TABLE performance_schema.events_waits_history_long")
+        # 테스트 구간 delta (TRUNCATE 없이 샘플러 첫/마지막 스냅샷 차이)
+        sampler = tester.sampler
+        run_count = None
+        if sampler is not None and len(sampler.snapshots) >= 2:
+            run_delta = sampler.delta(sampler.snapshots[0], sampler.snapshots[-1])
+            run_count, run_avg_ms = sampler.digest_summary(run_delta)
+            print("\nPerformance Schema Delta Results (this run):")
+            print(f"Execution count: {run_count:,}")
+            print(f"Avg latency: {run_avg_ms:.6f}ms")
+            for pass_result in tester.pass_results:
+                if pass_result['ps_delta'] is None:
+                    continue
+                pass_count, pass_avg_ms = sampler.digest_summary(pass_result['ps_delta'])
+                print(f"[{pass_result['protocol']}, batch {pass_result['batch_size']}] "
+                      f"execution count: {pass_count:,}, avg latency: {pass_avg_ms:.6f}ms")
+            
+            print("\nTop wait events (this run):")
+            print("Wait Event | Count | Avg (ms) | Total (ms)")
+            print("-" * 100)
+            for name, count, avg_ms, total_ms in sampler.top(run_delta['waits'], 10):
+                print(f"{name:<60} | {count:>10,} | {avg_ms:>10.6f} | {total_ms:>12.3f}")
+            
+            print("\nTop stage events (this run):")
+            print("Stage Event | Count | Avg (ms) | Total (ms)")
+            print("-" * 100)
+            for name, count, avg_ms, total_ms in sampler.top(run_delta['stages'], 10):
+                print(f"{name:<60} | {count:>10,} | {avg_ms:>10.6f} | {total_ms:>12.3f}")
 
-        # Summary by digest 결과
+        # Summary by digest 결과 (누적 값 - QUANTILE 은 delta 계산이 불가능)
         cursor.execute("""
             SELECT 
                 COUNT_STAR as execution_count,
@@ -242,7 +934,7 @@ def main():
         result = cursor.fetchone()
         
         if result:
-            print("\nPerformance Schema Results:")
+            print("\nPerformance Schema Results (cumulative since last reset):")
             print(f"Execution count: {result[0]:,}")
             print(f"Avg latency: {result[1]:.6f}ms")
             print(f"Min latency: {result[2]:.6f}ms")
@@ -253,11 +945,55 @@ def main():
             
             total_time = time.time() - start_time
             print(f"\nTotal test duration: {total_time:.2f} seconds")
-            print(f"Overall Average QPS: {result[0]/total_time:.2f}")
+            if run_count is not None:
+                print(f"Overall Average QPS: {run_count/total_time:.2f}")
+
+        # 클라이언트 측 지연시간 (네트워크, 드라이버 오버헤드 포함)
+        for pass_result in tester.pass_results:
+            histogram = pass_result['histogram']
+            batch_size = pass_result['batch_size']
+            if not histogram.total_count:
+                continue
+            label = f"{pass_result['protocol']}, batch {batch_size}"
+            if TEST_CONFIG['load_mode'] == 'open':
+                print(f"\nClient-side Results [{label}] (latency from scheduled send time):")
+                print(f"Late sends (behind schedule): {pass_result['late_count']:,} "
+                      f"({pass_result['late_count'] / pass_result['steady']['samples'] * 100:.2f}% of all sends)")
+            else:
+                print(f"\nClient-side Results [{label}]:")
+            print(f"Latency statistics from steady-state samples only: {histogram.total_count:,} of "
+                  f"{pass_result['steady']['samples']:,} round trips")
+            if batch_size > 1:
+                print(f"Round trip count: {histogram.total_count:,} ({batch_size} statements each)")
+            else:
+                print(f"Execution count: {histogram.total_count:,}")
+            print(f"Avg latency: {histogram.mean() / 1e6:.6f}ms")
+            print(f"Min latency: {histogram.min_value / 1e6:.6f}ms")
+            print(f"P50 latency: {histogram.percentile(50) / 1e6:.6f}ms")
+            print(f"P99 latency: {histogram.percentile(99) / 1e6:.6f}ms")
+            print(f"P999 latency: {histogram.percentile(99.9) / 1e6:.6f}ms")
+            print(f"Max latency: {histogram.max_value / 1e6:.6f}ms")
+            if batch_size > 1:
+                print(f"Per-statement avg latency (round trip / {batch_size}): "
+                      f"{histogram.mean() / batch_size / 1e6:.6f}ms")
 
+        # Stage / Wait 분석은 이 테스트 워커의 THREAD_ID 로 한정 (다른 세션의 이벤트는 집계에서 제외)
+        # history_long 테이블에는 인덱스가 없어 THREAD_ID 조건이 있어도 전체 스캔이며,
+        # 조회 비용은 performance_schema_events_*_history_long_size (테이블당 최대 행 수) 에 비례
+        # (JOIN 은 MySQL 8.0.18+ 에서 hash join, 그 이전은 두 테이블 크기의 곱만큼 비교)
+        if not tester.thread_ids:
+            print("\nNo performance_schema thread IDs collected, skipping stage/wait analysis")
+            cursor.close()
+            conn.close()
+            record_results(tester, start_time)
+            return
+        
+        thread_ids_str = ','.join(sorted(tester.thread_ids, key=int))
+        print(f"\nAnalyzing stage/wait events for {len(tester.thread_ids)} test threads")
+        
         # Stage events 결과
         print("\nStage Events Analysis:")
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 g.EVENT_NAME as stage_event,
                 COUNT(*) as count,
@@ -266,11 +1002,14 @@ def main():
                 MAX(g.TIMER_WAIT)/1000000000 as max_duration_ms
             FROM performance_schema.events_statements_history_long s
             JOIN performance_schema.events_stages_history_long g 
-                ON s.EVENT_ID = g.NESTING_EVENT_ID
-            WHERE s.SQL_TEXT = 'select 1'
+                ON g.THREAD_ID = s.THREAD_ID
+                AND g.NESTING_EVENT_ID = s.EVENT_ID
+            WHERE s.THREAD_ID IN ({thread_ids_str})
+            AND g.THREAD_ID IN ({thread_ids_str})
+            AND s.SQL_TEXT = %s
             GROUP BY g.EVENT_NAME
             ORDER BY avg_duration_ms DESC
-        """)
+        """, (TEST_CONFIG['query'],))
         
         stage_results = cursor.fetchall()
         if stage_results:
@@ -282,7 +1021,7 @@ def main():
 
         # Wait events 결과
         print("\nWait Events Analysis:")
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT 
                 w.EVENT_NAME as wait_event,
                 COUNT(*) as count,
@@ -293,11 +1032,14 @@ def main():
                 w.OBJECT_NAME
             FROM performance_schema.events_statements_history_long s
             JOIN performance_schema.events_waits_history_long w
-                ON s.EVENT_ID = w.NESTING_EVENT_ID
-            WHERE s.SQL_TEXT = 'select 1'
+                ON w.THREAD_ID = s.THREAD_ID
+                AND w.NESTING_EVENT_ID = s.EVENT_ID
+            WHERE s.THREAD_ID IN ({thread_ids_str})
+            AND w.THREAD_ID IN ({thread_ids_str})
+            AND s.SQL_TEXT = %s
             GROUP BY w.EVENT_NAME, w.OPERATION, w.OBJECT_NAME
             ORDER BY avg_duration_ms DESC
-        """)
+        """, (TEST_CONFIG['query'],))
         
         wait_results = cursor.fetchall()
         if wait_results:
@@ -313,6 +1055,53 @@ def main():
             
     except Exception as e:
         print(f"Failed to get performance schema results: {e}")
+    
+    record_results(tester, start_time)
+
+
+def record_results(tester, start_time):
+    """pass 별 결과를 결과 저장소에 기록"""
+    if not TEST_CONFIG['record_results'] or not tester.pass_results:
+        return
+    
+    server_version = None
+    try:
+        conn = mysql.connector.connect(**MYSQL_CONFIG)
+        server_version = fetch_server_version(conn)
+        conn.close()
+    except Exception as e:
+        print(f"Failed to get server version: {e}")
+    
+    metrics = []
+    for pass_result in tester.pass_results:
+        prefix = f"{pass_result['protocol']}.batch{pass_result['batch_size']}"
+        metrics.append(metric_value(f"{prefix}.qps", pass_result['qps'], unit='qps', better='higher'))
+        metrics.append(metric_from_values(f"{prefix}.qps_per_worker", pass_result['per_worker_qps'],
+                                          unit='qps', better='higher'))
+        metrics.append(metric_from_histogram(f"{prefix}.latency", pass_result['histogram']))
+        qps_imbalance = pass_result['backends'].imbalance('qps')
+        if qps_imbalance is not None:
+            metrics.append(metric_value(f"{prefix}.backend_qps_imbalance", qps_imbalance, unit='x', better='lower'))
+        if pass_result['ps_delta'] is not None:
+            server_count, server_avg_ms = tester.sampler.digest_summary(pass_result['ps_delta'])
+            if server_count:
+                metrics.append(metric_value(f"{prefix}.server_avg_latency", server_avg_ms, unit='ms', better='lower'))
+    
+    try:
+        store = ResultsStore()
+        run_id = store.record_run(
+            'select1_contention_concurrent',
+            config=TEST_CONFIG,
+            metrics=metrics,
+            host=MYSQL_CONFIG['host'],
+            server_version=server_version,
+            label=TEST_CONFIG['results_label'],
+            started_at=datetime.fromtimestamp(start_time)
+        )
+        store.close()
+        print(f"\nResults recorded as run {run_id} in {store.path}")
+    except Exception as e:
+        print(f"Failed to record results: {e}")
 
 if __name__ == "__main__":
     main()
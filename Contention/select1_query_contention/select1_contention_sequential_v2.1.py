@@ -11,10 +11,12 @@ Performance Schema를 통해 성능을 분석합니다.
   * 지연시간 메트릭 (평균, 최소, 최대, p95, p99, p999)
   * 단계별 성능 분석
   * 대기 이벤트 분석
+- 워커별 warm-up 제외와 steady-state 감지 (Common/steady_state.py) 후 클라이언트 지연시간 / steady-state QPS 출력
+- 결과 저장소 (Common/results_store.py) 에 QPS 와 스레드별 QPS 분포 기록
 
 설정:
 - MYSQL_CONFIG: 데이터베이스 연결 파라미터
-- TEST_CONFIG: 테스트 파라미터 (스레드 수, 반복 횟수, 쿼리)
+- TEST_CONFIG: 테스트 파라미터 (스레드 수, 반복 횟수, 쿼리, warm-up / steady-state 기준, 결과 저장 여부와 라벨)
 
 사용방법:
 1. MYSQL_CONFIG에 올바른 데이터베이스 자격 증명 설정
@@ -34,10 +36,17 @@ Performance Schema를 통해 성능을 분석합니다.
 
 
 import mysql.connector
+import os
+import sys
 import time
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from latency_histogram import LatencyHistogram
+from results_store import ResultsStore, fetch_server_version, metric_from_histogram, metric_from_values, metric_value
+from steady_state import SteadyStateFilter, format_steady_state, merge_steady_state
+
 # MySQL 접속 설정
 MYSQL_CONFIG = {
     'host': '~~',          # Aurora 엔드포인트
@@ -50,13 +59,22 @@ MYSQL_CONFIG = {
 TEST_CONFIG = {
     'num_threads': 100,
     'iterations': 1000,
-    'query': 'SELECT 1'
+    'query': 'SELECT 1',
+    'warmup_iterations': 100,   # 스레드별 warm-up 쿼리 수 (iterations 에 포함, 지연시간 통계 제외)
+    'warmup_seconds': 0,        # 스레드별 warm-up 시간(초)
+    'steady_window': 100,       # steady-state 감지 윈도우(쿼리 수), 0 이면 warm-up 만 적용
+    'steady_cv': 0.5,           # 윈도우 변동계수가 이 값 이하가 되면 steady-state 로 판단
+    'record_results': True,     # 결과를 Common/results_store.py 저장소(SQLite)에 기록
+    'results_label': None       # 실행 구분용 라벨 (예: 'before-upgrade')
 }
 
 class ConnectionTester:
     def __init__(self, db_config):
         self.db_config = db_config
         self.thread_ids = set()
+        self.thread_results = []
+        self.histogram = LatencyHistogram()
+        self.steady_qps = 0
 
     def create_connection(self):
         return mysql.connector.connect(**self.db_config)
@@ -136,11 +154,21 @@ class ConnectionTester:
             print(f"Thread {thread_id} running with performance_schema thread_id: {current_thread_id}")
             
             success_count = 0
+            histogram = LatencyHistogram()
+            steady = SteadyStateFilter(
+                warmup_iterations=TEST_CONFIG['warmup_iterations'],
+                warmup_seconds=TEST_CONFIG['warmup_seconds'],
+                window=TEST_CONFIG['steady_window'],
+                cv_threshold=TEST_CONFIG['steady_cv']
+            )
             start_time = time.time()
             
             for i in range(TEST_CONFIG['iterations']):
+                query_start = time.perf_counter_ns()
                 cursor.execute(TEST_CONFIG['query'])
                 cursor.fetchall()
+                for latency in steady.add(time.perf_counter_ns() - query_start):
+                    histogram.record(latency)
                 success_count += 1
             
             duration = time.time() - start_time
@@ -148,11 +176,11 @@ class ConnectionTester:
             cursor.close()
             conn.close()
             
-            return success_count, duration
+            return success_count, duration, histogram, steady.summary()
             
         except Exception as e:
             print(f"Thread {thread_id} failed: {e}")
-            return 0, 0
+            return 0, 0, LatencyHistogram(), None
 
     def run_test(self):
         print(f"\nStarting test with {TEST_CONFIG['num_threads']} threads")
@@ -164,6 +192,7 @@ class ConnectionTester:
         
         total_success = 0
         thread_results = []
+        steady_summaries = []
         start_time = time.time()
         
         with ThreadPoolExecutor(max_workers=TEST_CONFIG['num_threads']) as executor:
@@ -174,19 +203,31 @@ class ConnectionTester:
             
             for future in futures:
                 try:
-                    queries, duration = future.result()
+                    queries, duration, histogram, steady_summary = future.result()
                     total_success += queries
                     thread_results.append((queries, duration))
+                    steady_summaries.append(steady_summary)
+                    self.histogram.merge(histogram)
+                    # 스레드마다 커넥션 1개로 순차 실행하므로 steady-state QPS = 1 / 평균 지연시간
+                    if histogram.total_sum:
+                        self.steady_qps += histogram.total_count / (histogram.total_sum / 1e9)
                 except Exception as e:
                     print(f"Thread execution failed: {e}")
         
         end_time = time.time()
         total_duration = end_time - start_time
+        self.thread_results = thread_results
         
         print(f"\nTest completed:")
         print(f"Total successful queries: {total_success:,}")
         print(f"Total time: {total_duration:.2f} seconds")
         print(f"Average QPS: {total_success/total_duration:.2f}")
+        print(format_steady_state(merge_steady_state(steady_summaries)))
+        if self.histogram.total_count:
+            print(f"Steady-state QPS: {self.steady_qps:.2f}")
+            print(f"Steady-state latency: avg {self.histogram.mean() / 1e6:.6f}ms, "
+                  f"P50 {self.histogram.percentile(50) / 1e6:.6f}ms, P99 {self.histogram.percentile(99) / 1e6:.6f}ms, "
+                  f"P999 {self.histogram.percentile(99.9) / 1e6:.6f}ms, max {self.histogram.max_value / 1e6:.6f}ms")
         
         return total_success, total_duration
 
@@ -287,11 +328,47 @@ def analyze_performance(thread_ids_str):
     except Exception as e:
         print(f"Failed to analyze performance: {e}")
 
+def record_results(tester, start_time, total_queries, total_duration):
+    """QPS, 스레드별 QPS 분포와 steady-state 지연시간을 결과 저장소에 기록"""
+    if not TEST_CONFIG['record_results'] or total_duration <= 0:
+        return
+    
+    server_version = None
+    try:
+        conn = mysql.connector.connect(**MYSQL_CONFIG)
+        server_version = fetch_server_version(conn)
+        conn.close()
+    except Exception as e:
+        print(f"Failed to get server version: {e}")
+    
+    per_thread_qps = [queries / duration for queries, duration in tester.thread_results if duration > 0]
+    try:
+        store = ResultsStore()
+        run_id = store.record_run(
+            'select1_contention_sequential',
+            config=TEST_CONFIG,
+            metrics=[
+                metric_value('qps', total_queries / total_duration, unit='qps', better='higher'),
+                metric_from_values('qps_per_thread', per_thread_qps, unit='qps', better='higher'),
+                metric_value('steady_qps', tester.steady_qps, unit='qps', better='higher'),
+                metric_from_histogram('latency', tester.histogram)
+            ],
+            host=MYSQL_CONFIG['host'],
+            server_version=server_version,
+            label=TEST_CONFIG['results_label'],
+            started_at=datetime.fromtimestamp(start_time)
+        )
+        store.close()
+        print(f"\nResults recorded as run {run_id} in {store.path}")
+    except Exception as e:
+        print(f"Failed to record results: {e}")
+
 def main():
     start_time = time.time()
     
     tester = ConnectionTester(MYSQL_CONFIG)
     total_queries, total_duration = tester.run_test()
+    record_results(tester, start_time, total_queries, total_duration)
     
     time.sleep(2)  # 성능 데이터가 수집될 시간을 주기 위해 대기
     
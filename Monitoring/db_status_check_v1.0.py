@@ -12,11 +12,19 @@ AWS RDS 인스턴스의 상태를 실시간으로 모니터링하고 로깅하
 2. 상태 변경 사항을 로그 파일에 기록
 3. 특별한 상태(storage-config-upgrade, storage-initialization)의 진행률 표시
 4. 인스턴스가 'available' 상태가 되면 자동 종료
+5. 장애 조치(failover) 프로버 모드 (PROBE_MODE = True):
+   - 클러스터(writer) / reader 엔드포인트에 커넥션을 하나씩 유지하며 PROBE_CONFIG['interval'] 간격(기본 50ms)으로
+     heartbeat 쓰기(UPSERT) / 읽기(SELECT) 실행
+   - 실패하면 커넥션을 버리고 지수 backoff 로 재접속, 쓰기 불가 / 읽기 불가 구간(시작, 종료, 길이)을 ms 단위로 기록
+   - 재접속할 때마다 접속한 인스턴스(@@aurora_server_id)를 기록하여 writer 전환 시점 확인
+   - 읽기 프로버는 heartbeat 행의 시각으로 복제 지연(replica lag)도 측정
+   - RDS 상태 조회와 같은 로그 파일에 기록하므로 상태 변화와 불가 구간을 시간순으로 비교 가능
 
 사용 방법:
 ---------
 1. 필요한 라이브러리 설치:
    pip install boto3
+   pip install mysql-connector-python   (PROBE_MODE 사용 시)
 
 2. AWS 자격 증명 설정:
    - AWS CLI 구성 또는
@@ -64,10 +72,25 @@ AWS RDS 인스턴스의 상태를 실시간으로 모니터링하고 로깅하
 - 파일명 형식: rds_status_[인스턴스ID]_[날짜시간].log
 - 모든 상태 변경 및 오류가 시간과 함께 기록됨
 
+프로버 모드 출력:
+--------------
+   2024-03-15 14:30:22.120 UTC - probe writer connected to aurora-writer (after 0 attempts)
+   2024-03-15 14:31:05.871 UTC - probe writer DOWN: 2013 (HY000): Lost connection to MySQL server during query
+   2024-03-15 14:31:18.402 UTC - probe writer UP on aurora-reader after 12.531s down (37 reconnect attempts)
+   ...
+   Probe writer (write, cluster.endpoint): 1,234 ok, 250 failed
+     Unavailable 14:31:05.871 -> 14:31:18.402 UTC (12.531s, since last success 12.580s)
+     Total unavailable: 12.531s, instances: aurora-writer -> aurora-reader
+
+- 불가 구간 길이: 첫 실패 시각부터 복구 후 첫 성공 시각까지
+- since last success: 직전 성공 시각부터 계산한 상한값 (probe 간격만큼 더 김)
+- heartbeat 테이블(PROBE_CONFIG['heartbeat_table'])은 시작 시 writer 에 생성, 프로세스별 행 하나만 사용
+
 종료:
 ----
-- 자동 종료: 인스턴스가 'available' 상태가 되면 자동 종료
+- 자동 종료: 인스턴스가 'available' 상태가 되면 자동 종료 (PROBE_MODE 에서는 계속 실행)
 - 수동 종료: Ctrl+C를 통한 수동 종료 가능
+- PROBE_MODE: PROBE_CONFIG['duration'] 초가 지나거나 Ctrl+C 로 종료하면 구간 요약 출력
 
 오류 처리:
 --------
@@ -77,13 +100,78 @@ AWS RDS 인스턴스의 상태를 실시간으로 모니터링하고 로깅하
 
 
 import boto3
+import os
+import random
+import socket
+import threading
 import time
 from datetime import datetime
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from backend_distribution import fetch_backend_id
+
+try:
+    import mysql.connector   # PROBE_MODE 에서만 사용
+    from mysql.connector.connection import MySQLConnection
+except ImportError:
+    mysql = None
+    MySQLConnection = object
+
 # DB 인스턴스 ID 
 DB_INSTANCE_ID = "aurora-reader"  # 여기에 RDS 인스턴스 이름을 입력하세요
 
+# 장애 조치 프로버 모드 - True 이면 RDS 상태 조회와 함께 heartbeat 쓰기 / 읽기 프로버 실행
+PROBE_MODE = False
+
+PROBE_CONFIG = {
+    'user': '',
+    'password': '',
+    'database': 'test',
+    'probes': [
+        # type 'write': heartbeat UPSERT + COMMIT, 'read': heartbeat SELECT (복제 지연 측정)
+        {'name': 'writer', 'host': '', 'type': 'write'},     # 클러스터(writer) 엔드포인트
+        {'name': 'reader', 'host': '', 'type': 'read'}       # reader 엔드포인트
+    ],
+    'interval': 0.05,           # heartbeat 간격(초)
+    'timeout': 1,               # 접속 / 쿼리 timeout(초) - 응답 없는 커넥션을 이 시간 안에 실패로 판단
+    'backoff_initial': 0.05,    # 재접속 대기 시작 값(초), 실패할 때마다 2배
+    'backoff_max': 2,           # 재접속 대기 최대 값(초)
+    'duration': None,           # 실행 시간(초), None 이면 Ctrl+C 까지
+    'status_interval': 1,       # RDS 상태 조회 간격(초)
+    'heartbeat_table': 'failover_heartbeat'
+}
+
+# 프로세스별 heartbeat 행 - 여러 프로버를 동시에 실행해도 서로 덮어쓰지 않음
+HEARTBEAT_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+log_lock = threading.Lock()
+
+
+def utc_now():
+    """프로버 간격이 1초보다 짧으므로 ms 까지 표시"""
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] + ' UTC'
+
+
+def utc_time(timestamp):
+    return datetime.utcfromtimestamp(timestamp).strftime('%H:%M:%S.%f')[:-3]
+
+
+def log(log_filename, message):
+    """콘솔 출력과 로그 파일 기록 (프로버 쓰레드와 상태 조회가 함께 사용)"""
+    with log_lock:
+        print(message)
+        with open(log_filename, 'a') as f:
+            f.write(message + '\n')
+
+
+def format_status(instance):
+    """describe_db_instances 결과 한 건의 상태 문자열 (진행률이 있으면 함께 표시)"""
+    status = instance['DBInstanceStatus']
+    if status in ['storage-config-upgrade', 'storage-initialization'] and 'PercentProgress' in instance:
+        return f"{DB_INSTANCE_ID} {status} (Progress: {instance['PercentProgress']}%)"
+    return f"{DB_INSTANCE_ID} {status}"
+
 
 
 def monitor_rds_status():
@@ -112,13 +200,7 @@ def monitor_rds_status():
                 current_time = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
                 
                 # 로그 메시지 생성
-                if status in ['storage-config-upgrade', 'storage-initialization']:
-                    if 'PercentProgress' in instance:
-                        log_entry = f"{current_time} - {DB_INSTANCE_ID} {status} (Progress: {instance['PercentProgress']}%)"
-                    else:
-                        log_entry = f"{current_time} - {DB_INSTANCE_ID} {status}"
-                else:
-                    log_entry = f"{current_time} - {DB_INSTANCE_ID} {status}"
+                log_entry = f"{current_time} - {format_status(instance)}"
                 
                 # 콘솔 출력 및 파일 기록
                 print(log_entry)
@@ -143,5 +225,235 @@ def monitor_rds_status():
     except KeyboardInterrupt:
         print("\nMonitoring stopped by user")
         
+
+class ProbeConnection(MySQLConnection):
+    """인증 이후에도 소켓 timeout 을 유지하는 pure python 연결
+
+    connection_timeout 은 접속 / 인증까지만 적용되고 인증이 끝나면 소켓 timeout 이 None 으로 바뀜
+    (이후 autocommit 설정 쿼리와 heartbeat 가 응답 없는 writer 에서 TCP timeout(수 분)까지 멈춤)
+    _post_connection 의 첫 쿼리 전에 PROBE_CONFIG['timeout'] 을 다시 설정
+    """
+
+    def _post_connection(self):
+        self._socket.sock.settimeout(PROBE_CONFIG['timeout'])
+        super()._post_connection()
+
+
+class FailoverProber:
+    """엔드포인트 하나에 커넥션을 유지하며 heartbeat 를 실행하고 불가 구간을 기록"""
+
+    def __init__(self, probe, log_filename, stop_event):
+        self.name = probe['name']
+        self.host = probe['host']
+        self.type = probe['type']
+        self.log_filename = log_filename
+        self.stop_event = stop_event
+        self.conn = None
+        self.seq = 0
+        self.ok = 0
+        self.failed = 0
+        self.last_success = None
+        self.outage = None          # 진행 중인 불가 구간 {'start', 'last_success', 'error', 'attempts'}
+        self.windows = []
+        self.backends = []
+        self.max_lag = None
+        self.thread = threading.Thread(target=self.run, name=f"probe-{self.name}", daemon=True)
+
+    def connect(self):
+        # connection_timeout 은 접속 / 인증 timeout, 이후 쿼리 timeout 은 ProbeConnection 이 설정
+        self.conn = ProbeConnection(
+            host=self.host,
+            user=PROBE_CONFIG['user'],
+            password=PROBE_CONFIG['password'],
+            database=PROBE_CONFIG['database'],
+            connection_timeout=PROBE_CONFIG['timeout'],
+            autocommit=self.type == 'read'
+        )
+        backend = fetch_backend_id(self.conn) or 'unknown'
+        if not self.backends or self.backends[-1] != backend:
+            self.backends.append(backend)
+        return backend
+
+    def heartbeat(self):
+        cursor = self.conn.cursor()
+        try:
+            if self.type == 'write':
+                self.seq += 1
+                cursor.execute(
+                    f"INSERT INTO {PROBE_CONFIG['heartbeat_table']} (id, seq, ts) VALUES (%s, %s, NOW(6)) "
+                    f"ON DUPLICATE KEY UPDATE seq = VALUES(seq), ts = VALUES(ts)",
+                    (HEARTBEAT_ID, self.seq)
+                )
+                self.conn.commit()
+            else:
+                cursor.execute(
+                    f"SELECT TIMESTAMPDIFF(MICROSECOND, ts, NOW(6)) FROM {PROBE_CONFIG['heartbeat_table']} WHERE id = %s",
+                    (HEARTBEAT_ID,)
+                )
+                rows = cursor.fetchall()
+                if rows and rows[0][0] is not None:
+                    # writer 의 마지막 heartbeat 이후 경과 시간 - interval 만큼은 항상 포함
+                    lag = rows[0][0] / 1e6
+                    self.max_lag = lag if self.max_lag is None else max(self.max_lag, lag)
+        finally:
+            cursor.close()
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+
+    def mark_failure(self, error):
+        self.failed += 1
+        self.close()
+        if self.outage is None:
+            self.outage = {'start': time.time(), 'last_success': self.last_success, 'error': error, 'attempts': 0}
+            log(self.log_filename, f"{utc_now()} - probe {self.name} DOWN: {error}")
+
+    def mark_success(self, backend):
+        now = time.time()
+        self.ok += 1
+        self.last_success = now
+        if self.outage is not None:
+            window = dict(self.outage, end=now, backend=backend)
+            self.windows.append(window)
+            self.outage = None
+            log(self.log_filename, f"{utc_now()} - probe {self.name} UP on {backend} after "
+                                   f"{window['end'] - window['start']:.3f}s down ({window['attempts']} reconnect attempts)")
+
+    def run(self):
+        backoff = PROBE_CONFIG['backoff_initial']
+        backend = None
+        while not self.stop_event.is_set():
+            started = time.time()
+            try:
+                if self.conn is None:
+                    if self.outage is not None:
+                        self.outage['attempts'] += 1
+                    backend = self.connect()
+                    if self.outage is None:
+                        log(self.log_filename, f"{utc_now()} - probe {self.name} connected to {backend}")
+                self.heartbeat()
+                self.mark_success(backend)
+                backoff = PROBE_CONFIG['backoff_initial']
+                wait = PROBE_CONFIG['interval'] - (time.time() - started)
+            except Exception as e:
+                self.mark_failure(str(e))
+                # 여러 프로버가 같은 순간에 재접속하지 않도록 jitter 추가
+                wait = backoff * random.uniform(0.5, 1.0)
+                backoff = min(backoff * 2, PROBE_CONFIG['backoff_max'])
+            if wait > 0:
+                self.stop_event.wait(wait)
+        self.close()
+
+    def summary(self):
+        """종료 시 구간 요약 - 종료 시점까지 복구되지 않은 구간은 종료 시각까지로 계산"""
+        windows = list(self.windows)
+        if self.outage is not None:
+            windows.append(dict(self.outage, end=time.time(), backend=None))
+        lines = [f"\nProbe {self.name} ({self.type}, {self.host}): {self.ok:,} ok, {self.failed:,} failed"]
+        for window in windows:
+            since_last = (f", since last success {window['end'] - window['last_success']:.3f}s"
+                          if window['last_success'] is not None else '')
+            unresolved = '' if window['backend'] is not None else ' - not recovered'
+            lines.append(f"  Unavailable {utc_time(window['start'])} -> {utc_time(window['end'])} UTC "
+                         f"({window['end'] - window['start']:.3f}s{since_last}){unresolved}: {window['error']}")
+        total = sum(window['end'] - window['start'] for window in windows)
+        lines.append(f"  Total unavailable: {total:.3f}s in {len(windows)} window(s), "
+                     f"instances: {' -> '.join(str(b) for b in self.backends) or '-'}")
+        if self.max_lag is not None:
+            lines.append(f"  Max heartbeat age on reader (replica lag + interval): {self.max_lag * 1000:.1f}ms")
+        return lines
+
+
+def create_heartbeat_table():
+    """writer 프로버 엔드포인트에 heartbeat 테이블 생성 - 읽기 프로버가 처음부터 테이블을 찾을 수 있도록 먼저 실행"""
+    writer = next((probe for probe in PROBE_CONFIG['probes'] if probe['type'] == 'write'), None)
+    if writer is None:
+        return
+    conn = mysql.connector.connect(
+        host=writer['host'],
+        user=PROBE_CONFIG['user'],
+        password=PROBE_CONFIG['password'],
+        database=PROBE_CONFIG['database'],
+        connection_timeout=PROBE_CONFIG['timeout']
+    )
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PROBE_CONFIG['heartbeat_table']} (
+            id VARCHAR(128) PRIMARY KEY,
+            seq BIGINT NOT NULL,
+            ts DATETIME(6) NOT NULL
+        )
+    """)
+    cursor.execute(
+        f"INSERT INTO {PROBE_CONFIG['heartbeat_table']} (id, seq, ts) VALUES (%s, 0, NOW(6)) "
+        f"ON DUPLICATE KEY UPDATE seq = 0, ts = NOW(6)",
+        (HEARTBEAT_ID,)
+    )
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+def run_failover_probe():
+    """프로버 쓰레드를 실행하고 메인 쓰레드에서 RDS 상태를 같은 로그 파일에 기록"""
+    if mysql is None:
+        print("PROBE_MODE requires mysql-connector-python (pip install mysql-connector-python)")
+        return
+    log_filename = f"rds_failover_probe_{DB_INSTANCE_ID}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.log"
+    print(f"Starting failover probe. Logging to {log_filename}")
+    print("Press Ctrl+C to stop.")
+    
+    try:
+        create_heartbeat_table()
+    except Exception as e:
+        print(f"Failed to create heartbeat table: {e}")
+        return
+    
+    stop_event = threading.Event()
+    probers = [FailoverProber(probe, log_filename, stop_event) for probe in PROBE_CONFIG['probes']]
+    for prober in probers:
+        prober.thread.start()
+    
+    try:
+        rds = boto3.client('rds')
+    except Exception as e:
+        # 자격 증명 / 리전 설정이 없어도 프로버는 계속 실행
+        log(log_filename, f"{utc_now()} - Error: {str(e)} (RDS status will not be logged)")
+        rds = None
+    last_status = None
+    deadline = time.time() + PROBE_CONFIG['duration'] if PROBE_CONFIG['duration'] else None
+    try:
+        while deadline is None or time.time() < deadline:
+            try:
+                if rds is None:
+                    time.sleep(PROBE_CONFIG['status_interval'])
+                    continue
+                response = rds.describe_db_instances(DBInstanceIdentifier=DB_INSTANCE_ID)
+                status = format_status(response['DBInstances'][0])
+                # 프로버 로그 사이에서 눈에 띄도록 상태가 바뀔 때만 기록
+                if status != last_status:
+                    log(log_filename, f"{utc_now()} - {status}")
+                    last_status = status
+            except Exception as e:
+                log(log_filename, f"{utc_now()} - Error: {str(e)}")
+            time.sleep(PROBE_CONFIG['status_interval'])
+    except KeyboardInterrupt:
+        print("\nMonitoring stopped by user")
+    
+    stop_event.set()
+    for prober in probers:
+        prober.thread.join()
+    for prober in probers:
+        for line in prober.summary():
+            log(log_filename, line)
+
 if __name__ == "__main__":
-    monitor_rds_status()
+    if PROBE_MODE:
+        run_failover_probe()
+    else:
+        monitor_rds_status()
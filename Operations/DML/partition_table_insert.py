@@ -1,11 +1,16 @@
 import mysql.connector
 from datetime import datetime, timedelta
+import os
 import threading
 import time
 import random
 import signal
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from latency_histogram import LatencyHistogram
+from results_store import ResultsStore, fetch_server_version, metric_from_histogram, metric_from_values, metric_value
+
 # 데이터베이스 연결 정보
 HOST = "  "
 USER = "  "
@@ -17,6 +22,14 @@ STOP_THREADS = False
 NUM_THREADS = 10
 START_DATE = datetime(1980, 1, 1)
 
+# 결과 저장 설정
+RECORD_RESULTS = True       # 종료 시 결과를 Common/results_store.py 저장소(SQLite)에 기록
+RESULTS_LABEL = None        # 실행 구분용 라벨 (예: 'before-upgrade')
+TEST_STARTED_AT = None
+TEST_STOPPED_AT = None
+THREAD_HISTOGRAMS = {}          # thread_id -> INSERT 지연시간 히스토그램 (커밋된 건만 기록)
+THREAD_COMMIT_HISTOGRAMS = {}   # thread_id -> COMMIT 지연시간 히스토그램
+
 def calculate_partition_value(date, is_hourly):
     """파티션 값 계산"""
     if is_hourly:
@@ -43,6 +56,10 @@ def insert_worker(thread_id):
         autocommit=False
     )
     cursor = conn.cursor()
+    histogram = LatencyHistogram()
+    commit_histogram = LatencyHistogram()
+    THREAD_HISTOGRAMS[thread_id] = histogram
+    THREAD_COMMIT_HISTOGRAMS[thread_id] = commit_histogram
 
     try:
         while not STOP_THREADS:
@@ -75,9 +92,16 @@ def insert_worker(thread_id):
                     f"test_data_{random.randint(1, 1000)}"
                 )
 
+                insert_start = time.perf_counter_ns()
                 cursor.execute(sql, values)
+                insert_latency = time.perf_counter_ns() - insert_start
                 time.sleep(0.5)  # ref_count 유지
+                # ref_count 유지용 sleep 은 제외하고 INSERT 와 COMMIT 을 각각 기록
+                commit_start = time.perf_counter_ns()
                 conn.commit()
+                commit_latency = time.perf_counter_ns() - commit_start
+                histogram.record(insert_latency)
+                commit_histogram.record(commit_latency)
                 
                 print(f"Thread-{thread_id}: Inserted into {table_name}, date: {insert_date}, partition value: {partition_value}")
 
@@ -94,14 +118,60 @@ def insert_worker(thread_id):
         conn.close()
 
 def signal_handler(signum, frame):
-    """Ctrl+C 처리"""
+    """Ctrl+C 처리 - 종료 플래그만 설정하고 워커 join / 결과 기록은 메인 스레드에서 수행"""
     global STOP_THREADS
     STOP_THREADS = True
     print("\nStopping insert operations...")
-    sys.exit(0)
+
+def record_results():
+    """INSERT / COMMIT 지연시간과 스레드별 커밋 처리량을 결과 저장소에 기록 (워커 join 후 호출)"""
+    if TEST_STARTED_AT is None or not THREAD_HISTOGRAMS:
+        return
+    elapsed = ((TEST_STOPPED_AT or datetime.now()) - TEST_STARTED_AT).total_seconds()
+    total = LatencyHistogram()
+    for histogram in THREAD_HISTOGRAMS.values():
+        total.merge(histogram)
+    commit_total = LatencyHistogram()
+    for histogram in THREAD_COMMIT_HISTOGRAMS.values():
+        commit_total.merge(histogram)
+    if not total.total_count or elapsed <= 0:
+        return
+
+    server_version = None
+    try:
+        conn = mysql.connector.connect(host=HOST, user=USER, password=PASSWORD, database=DATABASE)
+        server_version = fetch_server_version(conn)
+        conn.close()
+    except Exception as e:
+        print(f"Failed to get server version: {e}")
+
+    try:
+        store = ResultsStore()
+        run_id = store.record_run(
+            'partition_table_insert',
+            config={'num_threads': NUM_THREADS, 'start_date': START_DATE},
+            metrics=[
+                metric_from_histogram('insert_latency', total),
+                metric_from_histogram('commit_latency', commit_total),
+                metric_from_values('commits_per_sec_per_thread',
+                                   [h.total_count / elapsed for h in THREAD_HISTOGRAMS.values()],
+                                   unit='txn/s', better='higher'),
+                metric_value('commits_per_sec', total.total_count / elapsed, unit='txn/s', better='higher')
+            ],
+            host=HOST,
+            server_version=server_version,
+            label=RESULTS_LABEL,
+            started_at=TEST_STARTED_AT
+        )
+        store.close()
+        print(f"Results recorded as run {run_id} in {store.path}")
+    except Exception as e:
+        print(f"Failed to record results: {e}")
 
 def run_insert_test():
     """여러 스레드로 INSERT 테스트 실행"""
+    global TEST_STARTED_AT, TEST_STOPPED_AT
+    TEST_STARTED_AT = datetime.now()
     threads = []
     
     for i in range(NUM_THREADS):
@@ -110,14 +180,15 @@ def run_insert_test():
         t.start()
         threads.append(t)
         
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        STOP_THREADS = True
-        
+    while not STOP_THREADS:
+        time.sleep(1)
+    TEST_STOPPED_AT = datetime.now()
+
+    # 진행 중인 트랜잭션이 끝난 뒤 기록하도록 워커 종료를 기다림
     for t in threads:
         t.join()
+    if RECORD_RESULTS:
+        record_results()
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
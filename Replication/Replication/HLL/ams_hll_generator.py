@@ -17,14 +17,20 @@ Aurora MySQL의 MVCC(다중 버전 동시성 제어) 동작을 테스트하고 
 NUM_WRITER_THREADS와 SLEEP_TIME 변수를 조절하여 HLL 증가 속도를 제어할 수 있습니다.
 스크립트를 실행하고 출력을 모니터링하여 HLL 증가를 관찰하세요.
 스크립트를 중지하려면 Ctrl+C를 사용하세요.
+중지 시 HLL 증가 속도(초당)와 최종 HLL 값을 결과 저장소(Common/results_store.py)에 기록합니다.
 
 """
 
+import os
+import sys
 import time
 import mysql.connector
 import threading
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'Common'))
+from results_store import ResultsStore, fetch_server_version, metric_from_values, metric_value
+
 # Aurora DB 접속 정보
 WRITER_ENDPOINT = '~~~~'
 READER_ENDPOINT = '~~~'
@@ -36,6 +42,10 @@ DB_NAME = 'test'
 NUM_WRITER_THREADS = 10      # Writer 스레드 개수 (많을수록 HLL 빠르게 증가)
 SLEEP_TIME = 0.001          # 대기 시간 (작을수록 HLL 빠르게 증가)
 
+# 결과 저장 설정
+RECORD_RESULTS = True       # 종료 시 결과를 Common/results_store.py 저장소(SQLite)에 기록
+RESULTS_LABEL = None        # 실행 구분용 라벨 (예: 'before-upgrade')
+
 def execute_multi_query(connection, query):
     """
     여러 개의 SQL 쿼리를 순차적으로 실행하는 함수
@@ -252,6 +262,12 @@ def monitor_hll_length(reader_conn, reader_cursor):
     )
     writer_cursor = writer_conn.cursor()
     
+    started_at = datetime.now()
+    server_version = fetch_server_version(writer_conn)
+    growth_rates = []       # 모니터링 구간별 HLL 증가 속도 (초당)
+    previous = None
+    last_hll = None
+    
     try:
         while True:
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -263,16 +279,44 @@ def monitor_hll_length(reader_conn, reader_cursor):
             result = writer_cursor.fetchone()
             if result:
                 print(f"[{current_time}] [HLL] trx_rseg_history_len: {result[0]}")
+                now = time.time()
+                last_hll = result[0]
+                if previous is not None:
+                    growth_rates.append((last_hll - previous[1]) / (now - previous[0]))
+                previous = (now, last_hll)
             time.sleep(5)
             
     except KeyboardInterrupt:
         print("Monitoring stopped by user.")
     finally:
+        if RECORD_RESULTS and last_hll is not None:
+            record_results(started_at, server_version, growth_rates, last_hll)
         writer_cursor.close()
         writer_conn.close()
         reader_cursor.close()
         reader_conn.close()
 
+def record_results(started_at, server_version, growth_rates, last_hll):
+    """HLL 증가 속도와 최종 HLL 값을 결과 저장소에 기록"""
+    try:
+        store = ResultsStore()
+        run_id = store.record_run(
+            'ams_hll_generator',
+            config={'num_writer_threads': NUM_WRITER_THREADS, 'sleep_time': SLEEP_TIME},
+            metrics=[
+                metric_from_values('hll_growth_per_sec', growth_rates, unit='undo/s', better='higher'),
+                metric_value('hll_final', last_hll, unit='undo', better='higher')
+            ],
+            host=WRITER_ENDPOINT,
+            server_version=server_version,
+            label=RESULTS_LABEL,
+            started_at=started_at
+        )
+        store.close()
+        print(f"Results recorded as run {run_id} in {store.path}")
+    except Exception as e:
+        print(f"Failed to record results: {e}")
+
 if __name__ == "__main__":
     # 1. 초기 설정 및 Reader 트랜잭션 시작
     reader_conn, reader_cursor = setup_writer_and_start_reader_transaction()
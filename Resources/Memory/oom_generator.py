@@ -5,13 +5,20 @@ Changes:
 - 메모리 테이블 설정 개선
 - 테이블 가득 참 에러 처리
 - 세션 변수 설정 방식 개선
+- 종료(Ctrl+C) 시 워커별 INSERT 속도와 목표 도달 시간을 결과 저장소(Common/results_store.py)에 기록
 """
 
 import mysql.connector
+import os
+import sys
 import threading
 import time
+from datetime import datetime
 from queue import Queue
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Common'))
+from results_store import ResultsStore, fetch_server_version, metric_from_values, metric_value
+
 # 💡 메모리 사용량 설정
 TARGET_DATA_GB = 4          # 목표 사용 메모리 크기 (GB)
 NUMBER_OF_WORKERS = 10        # 워커(세션) 수
@@ -34,6 +41,13 @@ USER = "  "
 PASSWORD = "   "
 DATABASE = "   "
 
+# 결과 저장 설정
+RECORD_RESULTS = True       # 종료 시 결과를 Common/results_store.py 저장소(SQLite)에 기록
+RESULTS_LABEL = None        # 실행 구분용 라벨 (예: 'before-upgrade')
+
+# 워커별 진행 상황 (worker_id -> rows, insert_seconds, target_seconds) - 워커는 자신의 항목만 갱신
+WORKER_STATS = {}
+
 
 def set_oom_session(cursor):
     # 먼저 현재 값 확인
@@ -91,6 +105,9 @@ def stress_worker(worker_id, error_queue):
         row_count = 0
         filler = 'A' * FILLER_SIZE
         insert_stopped = False
+        stats = {'rows': 0, 'insert_seconds': 0.0, 'target_seconds': None}
+        WORKER_STATS[worker_id] = stats
+        insert_start = time.time()
 
         while True:
             if not insert_stopped:
@@ -101,6 +118,8 @@ def stress_worker(worker_id, error_queue):
                     )
                     conn.commit()
                     row_count += ROWS_PER_INSERT
+                    stats['rows'] = row_count
+                    stats['insert_seconds'] = time.time() - insert_start
 
                     total_bytes = row_count * FILLER_SIZE
                     print(f"[Worker {worker_id}] rows: {row_count:,}, "
@@ -111,6 +130,7 @@ def stress_worker(worker_id, error_queue):
                         print(f"[Worker {worker_id}] 🚫 INSERT 중단: "
                               f"목표 데이터 크기 {MEMORY_PER_WORKER_GB:.2f}GB 도달")
                         insert_stopped = True
+                        stats['target_seconds'] = stats['insert_seconds']
 
                 except mysql.connector.Error as err:
                     if err.errno == 1114:  # 테이블 가득 참 에러
@@ -139,6 +159,7 @@ def main():
     print(f"예상 총 메모리 사용량: {(MEMORY_PER_WORKER_GB + BUFFER_OVERHEAD_PER_WORKER_GB) * NUMBER_OF_WORKERS:.2f}GB")
     print("=" * 50 + "\n")
     
+    started_at = datetime.now()
     error_queue = Queue()
     threads = []
     for i in range(NUMBER_OF_WORKERS):
@@ -158,6 +179,54 @@ def main():
             time.sleep(1)
     except KeyboardInterrupt:
         print("\n=== 테스트 종료 요청됨 ===")
+        if RECORD_RESULTS:
+            record_results(started_at)
+
+
+def record_results(started_at):
+    """워커별 INSERT 속도와 목표 도달 시간을 결과 저장소에 기록"""
+    stats = list(WORKER_STATS.values())
+    if not stats:
+        return
+    
+    server_version = None
+    try:
+        conn = mysql.connector.connect(host=HOST, user=USER, password=PASSWORD, database=DATABASE)
+        server_version = fetch_server_version(conn)
+        conn.close()
+    except Exception as e:
+        print(f"Failed to get server version: {e}")
+    
+    total_rows = sum(s['rows'] for s in stats)
+    try:
+        store = ResultsStore()
+        run_id = store.record_run(
+            'oom_generator',
+            config={
+                'target_data_gb': TARGET_DATA_GB,
+                'number_of_workers': NUMBER_OF_WORKERS,
+                'filler_size': FILLER_SIZE,
+                'rows_per_insert': ROWS_PER_INSERT,
+                'sleep_interval': SLEEP_INTERVAL
+            },
+            metrics=[
+                metric_from_values('insert_rows_per_sec_per_worker',
+                                   [s['rows'] / s['insert_seconds'] for s in stats if s['insert_seconds'] > 0],
+                                   unit='rows/s', better='higher'),
+                metric_from_values('seconds_to_target',
+                                   [s['target_seconds'] for s in stats if s['target_seconds'] is not None],
+                                   unit='s', better='lower'),
+                metric_value('data_gb', total_rows * FILLER_SIZE / 1024 / 1024 / 1024, unit='GB', better='higher')
+            ],
+            host=HOST,
+            server_version=server_version,
+            label=RESULTS_LABEL,
+            started_at=started_at
+        )
+        store.close()
+        print(f"Results recorded as run {run_id} in {store.path}")
+    except Exception as e:
+        print(f"Failed to record results: {e}")
 
 if __name__ == "__main__":
     main()